@@ -1,7 +1,7 @@
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
-import networkx as nx
+import io
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Optional, TextIO
 
 # ---------------------------
 # 1) Problema de Representação
@@ -19,6 +19,72 @@ class Instance:
     p: List[float]
     s: List[List[float]]
     d: List[List[float]]  # Matriz de atrasos de precedência (nxn)
+    _preds: Optional[List[List[Tuple[int, float]]]] = field(default=None, init=False, repr=False, compare=False)
+    _succs: Optional[List[List[Tuple[int, float]]]] = field(default=None, init=False, repr=False, compare=False)
+    _neighbors: Dict[int, Tuple[List[array], List[array]]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _arrays: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)  # dados do kernel compilado (avaliacao.py)
+    _layers: Optional[List[List[int]]] = field(default=None, init=False, repr=False, compare=False)
+
+    def predecessors(self) -> List[List[Tuple[int, float]]]:
+        """
+        Lista de predecessores de cada job: preds[j] = [(i, d_ij), ...] para d[i][j] != -1.
+        Calculada uma vez por instância (evita varrer a coluna inteira de d a cada avaliação).
+        """
+        if self._preds is None:
+            self._preds = [[(i, self.d[i][j]) for i in range(self.n) if self.d[i][j] != -1]
+                           for j in range(self.n)]
+        return self._preds
+
+    def successors(self) -> List[List[Tuple[int, float]]]:
+        """Lista de sucessores de cada job: succs[i] = [(j, d_ij), ...] (calculada uma vez)."""
+        if self._succs is None:
+            self._succs = [[(j, self.d[i][j]) for j in range(self.n) if self.d[i][j] != -1]
+                           for i in range(self.n)]
+        return self._succs
+
+    def precedence_layers(self) -> List[List[int]]:
+        """
+        Camadas topológicas (Kahn) dos arcos de atraso, calculadas uma vez por instância:
+        layers[0] = jobs sem predecessores, layers[k] = jobs cujos predecessores estão todos
+        nas camadas anteriores. Se houver ciclo, os jobs restantes formam uma última camada
+        (e a ordem das camadas deixa de ser topológica).
+        """
+        if self._layers is None:
+            succs = self.successors()
+            indeg = [len(pr) for pr in self.predecessors()]
+            current = [j for j in range(self.n) if indeg[j] == 0]
+            layers = []
+            while current:
+                layers.append(current)
+                nxt = []
+                for i in current:
+                    for j, _d in succs[i]:
+                        indeg[j] -= 1
+                        if indeg[j] == 0:
+                            nxt.append(j)
+                current = sorted(nxt)
+            placed = sum(len(layer) for layer in layers)
+            if placed < self.n:
+                seen = {j for layer in layers for j in layer}
+                layers.append([j for j in range(self.n) if j not in seen])
+            self._layers = layers
+        return self._layers
+
+    def setup_neighbors(self, k: int) -> Tuple[List[array], List[array]]:
+        """
+        Listas de candidatos pelos k setups mais baratos, calculadas uma vez por (instância, k):
+          - succ[j]: os k jobs i != j com menor s[j][i] (melhores sucessores de j);
+          - pred[j]: os k jobs i != j com menor s[i][j] (melhores predecessores de j).
+        Cada lista é um array('i') ordenado pelo setup (empates pelo índice).
+        """
+        if k not in self._neighbors:
+            k_eff = min(k, self.n - 1)
+            succ = [array("i", sorted((i for i in range(self.n) if i != j), key=lambda i: self.s[j][i])[:k_eff])
+                    for j in range(self.n)]
+            pred = [array("i", sorted((i for i in range(self.n) if i != j), key=lambda i: self.s[i][j])[:k_eff])
+                    for j in range(self.n)]
+            self._neighbors[k] = (succ, pred)
+        return self._neighbors[k]
 
     def check_basic_shapes(self) -> None:
         # assert len(self.p) == self.n, "p deve ter índices 0..n+1 (com p[0]=p[n+1]=0)."
@@ -50,33 +116,43 @@ def load_instance_from_txt(file_path: str) -> Instance:
     O arquivo deve estar no formato fornecido (R, Pj, A, Sij).
     """
     with open(file_path, 'r') as f:
-        # Lendo o número de jobs (R) e removendo o prefixo "R="
-        R_line = f.readline().strip()
-        R = int(R_line.split('=')[1])
-        
-        # Lendo o vetor de tempos de processamento Pj (Pi=...)
-        Pj_line = f.readline().strip()
-        Pj = list(map(int, Pj_line.split('=')[1].strip('()').split(',')))
-        
-        # Lendo a matriz de precedências atrasadas A
-        dij = [[-1 for _ in range(R)] for _ in range(R)]  # Matriz de atrasos (inicializa com -1)
-        
+        return read_instance(f)
+
+
+def parse_instance(text: str) -> Instance:
+    """Mesmo formato de load_instance_from_txt, a partir do conteúdo (ex.: instância enviada inline)."""
+    return read_instance(io.StringIO(text))
+
+
+def read_instance(f: TextIO) -> Instance:
+    """Lê uma instância (formato R, Pj, A, Sij) de um arquivo já aberto."""
+    # Lendo o número de jobs (R) e removendo o prefixo "R="
+    R_line = f.readline().strip()
+    R = int(R_line.split('=')[1])
+    
+    # Lendo o vetor de tempos de processamento Pj (Pi=...)
+    Pj_line = f.readline().strip()
+    Pj = list(map(int, Pj_line.split('=')[1].strip('()').split(',')))
+    
+    # Lendo a matriz de precedências atrasadas A
+    dij = [[-1 for _ in range(R)] for _ in range(R)]  # Matriz de atrasos (inicializa com -1)
+    
+    line = f.readline().strip()
+    if line != 'A=':
+        raise ValueError("Formato inválido: Esperado 'A=' após Pj.")
+    while True:
         line = f.readline().strip()
-        if line != 'A=':
-            raise ValueError("Formato inválido: Esperado 'A=' após Pj.")
-        while True:
-            line = f.readline().strip()
-            
-            if line == 'Sij=':  # Fim da seção de A
-                break
-            i, j, d_ij = map(int, line.split(','))
-            dij[i - 1][j - 1] = d_ij  # Preenche a matriz com o atraso de precedência
         
-        # Lendo a matriz de setups Sij
-        Sij = []
-        for i in range(R):
-            line = list(map(int, f.readline().strip().split(',')))
-            Sij.append(line)
+        if line == 'Sij=':  # Fim da seção de A
+            break
+        i, j, d_ij = map(int, line.split(','))
+        dij[i - 1][j - 1] = d_ij  # Preenche a matriz com o atraso de precedência
+    
+    # Lendo a matriz de setups Sij
+    Sij = []
+    for i in range(R):
+        line = list(map(int, f.readline().strip().split(',')))
+        Sij.append(line)
     
     # Criando a instância no formato correto
     inst = Instance(
@@ -88,6 +164,96 @@ def load_instance_from_txt(file_path: str) -> Instance:
     
     return inst
 
+# ---------------------------
+# 2.1) Contração de cadeias de precedência em macro-jobs
+# ---------------------------
+def find_contractible_chains(inst: Instance) -> List[List[int]]:
+    """
+    Encontra cadeias i1 -> i2 -> ... -> ik (k >= 2) seguras para contrair.
+
+    Um arco i -> j entra na cadeia quando:
+      - d[i][j] == 0 (atraso nulo),
+      - i não tem outro sucessor e j não tem outro predecessor.
+    Assim, arcos que entram na cadeia chegam só no primeiro job e arcos que saem
+    partem só do último, e rodar a cadeia em sequência contígua dá exatamente
+    b[j] = c[i] + s[i][j] para cada par interno (o atraso 0 nunca é o limitante).
+    Observação: fixar a cadeia como contígua restringe o espaço de busca (um job de
+    fora nunca é intercalado nela), mas toda solução reduzida expande para uma factível.
+    """
+    n = inst.n
+    succ = inst.successors()
+    preds = inst.predecessors()
+
+    nxt = [-1] * n
+    has_prev = [False] * n
+    for i in range(n):
+        if len(succ[i]) == 1:
+            j = succ[i][0][0]
+            if inst.d[i][j] == 0 and len(preds[j]) == 1:
+                nxt[i] = j
+                has_prev[j] = True
+
+    chains = []
+    for i in range(n):
+        if nxt[i] != -1 and not has_prev[i]:  # início de cadeia
+            chain = [i]
+            while nxt[chain[-1]] != -1:
+                chain.append(nxt[chain[-1]])
+            chains.append(chain)
+    return chains
+
+
+def contract_chains(inst: Instance) -> Tuple[Instance, List[List[int]]]:
+    """
+    Constrói a instância reduzida em que cada cadeia contraível vira um macro-job.
+
+    Retorna (inst_reduzida, groups), onde groups[k] é a lista de jobs originais do
+    macro-job k (jobs fora de cadeias viram grupos unitários). Para o macro-job:
+      - p = soma dos p da cadeia + setups internos;
+      - s[A][B] = s[último(A)][primeiro(B)];
+      - d[A][B] = d[último(A)][primeiro(B)].
+    Use expand_solution para voltar à sequência original.
+    """
+    chains = find_contractible_chains(inst)
+    in_chain = {j: ch for ch in chains for j in ch}
+
+    groups = []
+    for j in range(inst.n):
+        if j not in in_chain:
+            groups.append([j])
+        elif in_chain[j][0] == j:
+            groups.append(in_chain[j])
+
+    m = len(groups)
+    p = []
+    for g in groups:
+        total = inst.p[g[0]]
+        for a, b in zip(g, g[1:]):
+            total += inst.s[a][b] + inst.p[b]
+        p.append(total)
+    s = [[0 if A == B else inst.s[groups[A][-1]][groups[B][0]] for B in range(m)] for A in range(m)]
+    d = [[-1 if A == B else inst.d[groups[A][-1]][groups[B][0]] for B in range(m)] for A in range(m)]
+
+    return Instance(n=m, p=p, s=s, d=d), groups
+
+
+def expand_solution(groups: List[List[int]], seq: List[int]) -> List[int]:
+    """Expande uma sequência de macro-jobs para a sequência de jobs originais."""
+    return [j for k in seq for j in groups[k]]
+
+
+def contract_solution(groups: List[List[int]], seq: List[int]) -> Optional[List[int]]:
+    """
+    Projeta uma sequência de jobs originais na instância contraída: macro-jobs na ordem em que
+    o primeiro job de cada grupo aparece em 'seq'. Inverso de expand_solution quando as cadeias
+    já aparecem contíguas; caso contrário o resultado deve ser reverificado. None se 'seq' não
+    contém todos os grupos.
+    """
+    group_of = {group[0]: k for k, group in enumerate(groups)}
+    out = [group_of[j] for j in seq if j in group_of]
+    return out if len(out) == len(groups) and len(set(out)) == len(groups) else None
+
+
 # ---------------------------
 # 3) Verificar e calcular a solução, sendo ela total ou parcial
 # ---------------------------
@@ -186,110 +352,548 @@ def verify_solution_ori(inst: Instance, seq: List[int]) -> Dict:
     }
 
 
+# Nº de avaliações (verify_solution + evaluate_suffix) feitas neste processo;
+# lido pelo traço de convergência (resultados.ConvergenceTrace)
+_evaluations = 0
 
 
-def verify_solution(inst, seq: List[int], verbose: bool) -> Dict:
+def evaluation_count() -> int:
+    """Total de avaliações de sequência feitas até agora neste processo."""
+    return _evaluations
+
+
+def count_evaluations(k: int = 1) -> None:
+    """Soma k avaliações feitas fora deste módulo (ex.: pelo kernel compilado)."""
+    global _evaluations
+    _evaluations += k
+
+
+class Resultado:
     """
-    Verifica (parcial ou total) uma sequência de jobs 0-based para 1 | s_ij, prec(d_ij) | Cmax.
+    Resultado compacto de verify_solution.
 
-    Regras de precedência (fortes) na parcial:
-      - Se j está na parcial e existe i com d[i][j] >= 0, então i DEVE estar na parcial
-        e deve aparecer antes de j (pos[i] < pos[j]).
+    Guarda apenas factibilidade e C_max; o cronograma (b, c) e as mensagens de violação
+    só são calculados quando algum consumidor pede (ex.: view.plot_gantt, relatório final).
+    Na busca local a maioria dos resultados é descartada logo após comparar C_max, então
+    não vale a pena montar listas de tamanho n a cada avaliação.
+
+    Mantém o acesso no estilo dicionário usado no resto do código:
+      res["feasible"], res["C_max"], res["b"], res["c"], res["violations"],
+      res["sequence_normalized"], res.get("feasible", False)
     """
-    if verbose:
-        print("\n=== Iniciando verificação da solução ===")
-        print(f"Sequência original: {seq}")
+    __slots__ = ("feasible", "C_max", "sequence_normalized", "_inst", "_b", "_c", "_binding", "_violations")
+
+    _KEYS = ("feasible", "violations", "C_max", "b", "c", "sequence_normalized")
+
+    def __init__(self, inst, seq: List[int], feasible: bool, C_max: Optional[float],
+                 violations: Optional[List[str]] = None):
+        self.feasible = feasible
+        self.C_max = C_max
+        self.sequence_normalized = seq
+        self._inst = inst
+        self._b = None
+        self._c = None
+        self._binding = None
+        self._violations = violations
+
+    # ---- materialização sob demanda ----
+    def _materialize(self) -> None:
+        self._b, self._c, self._binding = compute_schedule(self._inst, self.sequence_normalized, with_binding=True)
+
+    @property
+    def b(self) -> Optional[List[Optional[float]]]:
+        if self._b is None and self.feasible:
+            self._materialize()
+        return self._b
+
+    @property
+    def c(self) -> Optional[List[Optional[float]]]:
+        if self._c is None and self.feasible:
+            self._materialize()
+        return self._c
+
+    @property
+    def binding(self) -> Optional[List[Optional[Tuple[str, int]]]]:
+        """
+        Restrição que determinou cada b[j]: ("setup", job anterior) pela Eq. 7,
+        ("delay", i) pelo arco i -> j da Eq. 8, ou None para o primeiro job.
+        """
+        if self._binding is None and self.feasible:
+            self._materialize()
+        return self._binding
+
+    @property
+    def violations(self) -> List[str]:
+        if self._violations is None:
+            self._violations = [] if self.feasible else _diagnose_violations(self._inst, self.sequence_normalized)
+        return self._violations
+
+    # ---- compatibilidade com o antigo dicionário ----
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self._KEYS:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEYS
+
+    def to_dict(self) -> Dict:
+        """Dicionário completo (materializa o cronograma)."""
+        return {key: getattr(self, key) for key in self._KEYS}
+
+    def __repr__(self) -> str:
+        return f"Resultado(feasible={self.feasible}, C_max={self.C_max}, n={len(self.sequence_normalized)})"
+
+
+def compute_schedule(inst, seq: List[int], with_binding: bool = False):
+    """
+    Cronograma b (inícios) e c (términos) de uma sequência já verificada como factível.
+    Listas de tamanho inst.n indexadas pelo job; jobs fora da sequência ficam com None.
+    Com with_binding=True devolve também (b, c, binding), com a restrição que
+    determinou cada início (ver Resultado.binding). Em empate, o setup prevalece.
+    """
+    preds = inst.predecessors()
+    b = [None] * inst.n
+    c = [None] * inst.n
+    binding = [None] * inst.n
+    prev = -1
+    for j in seq:
+        if prev == -1:
+            start = 0.0
+            why = None
+        else:
+            start = c[prev] + inst.s[prev][j]  # Eq. 7
+            why = ("setup", prev)
+        for i, d in preds[j]:                  # Eq. 8
+            if c[i] + d > start:
+                start = c[i] + d
+                why = ("delay", i)
+        b[j] = start
+        c[j] = start + inst.p[j]
+        binding[j] = why
+        prev = j
+    if with_binding:
+        return b, c, binding
+    return b, c
+
+
+def evaluate_suffix(inst, seq: List[int], lo: int, c: List[Optional[float]]) -> Optional[float]:
+    """
+    Avaliação incremental: refaz a agenda só a partir da posição 'lo'.
 
+    'c' (indexado pelo job, como em compute_schedule) deve conter os términos corretos
+    dos jobs de seq[:lo] e None para os jobs fora da sequência; é atualizado in place
+    para os jobs de seq[lo:]. Retorna o C_max, ou None se algum job de seq[lo:] tiver
+    predecessor ausente ou posterior a ele (o prefixo é suposto factível).
+    """
+    global _evaluations
+    _evaluations += 1
+    preds = inst.predecessors()
+    for r in range(lo, len(seq)):
+        c[seq[r]] = None  # ainda não agendado: serve de marcador na checagem de precedência
+
+    t = c[seq[lo - 1]] if lo > 0 else None
+    prev = seq[lo - 1] if lo > 0 else -1
+    for r in range(lo, len(seq)):
+        j = seq[r]
+        start = t + inst.s[prev][j] if prev != -1 else 0.0
+        for i, d in preds[j]:
+            ci = c[i]
+            if ci is None:
+                return None
+            if ci + d > start:
+                start = ci + d
+        t = start + inst.p[j]
+        c[j] = t
+        prev = j
+    return t if seq else 0.0
+
+
+class ArraySequence:
+    """
+    Sequência mutável para a busca local: array('i') com índice de posições (pos[job]).
+
+    Os movimentos (swap, move, move_block) são aplicados in place, sem criar listas novas,
+    e registrados num log para que undo() desfaça um movimento rejeitado. evaluate()
+    reaproveita os términos (c) da última avaliação factível e refaz a agenda só a partir
+    da primeira posição alterada desde então.
+    """
+    __slots__ = ("seq", "pos", "_view", "_tmp", "_c", "_valid", "_hi", "_cmax", "_log")
+
+    def __init__(self, seq: List[int]):
+        n = len(seq)
+        self.seq = array("i", seq)
+        size = max(seq) + 1 if n else 0
+        self.pos = array("i", [-1]) * size  # job -> posição
+        for r, j in enumerate(self.seq):
+            self.pos[j] = r
+        self._view = memoryview(self.seq)
+        self._tmp = memoryview(array("i", [0]) * n)  # área auxiliar dos movimentos de bloco
+        self._c: List[Optional[float]] = [None] * size
+        self._valid = 0  # posições [0, _valid) têm c correto para a sequência atual
+        self._hi = n      # fim (exclusivo) da faixa de posições alterada desde a última avaliação
+        self._cmax: Optional[float] = None
+        self._log: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def __getitem__(self, r):
+        return self.seq[r]
+
+    def __iter__(self):
+        return iter(self.seq)
+
+    def to_list(self) -> List[int]:
+        return self.seq.tolist()
+
+    def _touch(self, lo: int, hi: int) -> None:
+        if lo < self._valid:
+            self._valid = lo
+        if hi > self._hi:
+            self._hi = hi
+
+    def swap(self, i: int, j: int, log: bool = True) -> None:
+        """Troca os jobs das posições i e j."""
+        seq, pos = self.seq, self.pos
+        a, b = seq[i], seq[j]
+        seq[i], seq[j] = b, a
+        pos[b], pos[a] = i, j
+        if i < j:
+            self._touch(i, j + 1)
+        else:
+            self._touch(j, i + 1)
+        if log:
+            self._log.append((0, i, j))
+
+    def move_block(self, i: int, size: int, j: int, log: bool = True) -> None:
+        """
+        Move o bloco seq[i:i+size] para começar na posição j da sequência final
+        (j em [0, n - size]); os jobs entre as duas posições deslizam 'size' casas.
+        """
+        if i != j:
+            v, tmp = self._view, self._tmp
+            tmp[:size] = v[i:i + size]
+            if j < i:
+                v[j + size:i + size] = v[j:i]  # memoryview: cópia com sobreposição (memmove)
+            else:
+                v[i:j] = v[i + size:j + size]
+            v[j:j + size] = tmp[:size]
+
+            lo, hi = (j, i + size) if j < i else (i, j + size)
+            seq, pos = self.seq, self.pos
+            for r in range(lo, hi):
+                pos[seq[r]] = r
+            self._touch(lo, hi)
+        if log:
+            self._log.append((1, i, size, j))
+
+    def move(self, i: int, j: int, log: bool = True) -> None:
+        """Remove o job da posição i e o reinsere de modo que fique na posição j."""
+        self.move_block(i, 1, j, log)
+
+    def undo(self) -> None:
+        """Desfaz o último movimento registrado."""
+        move = self._log.pop()
+        if move[0] == 0:
+            self.swap(move[1], move[2], log=False)
+        else:
+            _kind, i, size, j = move
+            self.move_block(j, size, i, log=False)
+
+    def commit(self) -> None:
+        """Aceita os movimentos aplicados (esvazia o log de undo)."""
+        self._log.clear()
+
+    def evaluate(self, inst) -> Optional[float]:
+        """C_max da sequência atual, ou None se violar precedência."""
+        lo = self._valid
+        n = len(self.seq)
+        if lo >= n and n:
+            return self._cmax  # nada mudou desde a última avaliação factível
+
+        global _evaluations
+        _evaluations += 1
+
+        # Só pares dentro da faixa alterada podem ter trocado de ordem desde a última
+        # sequência factível: basta checar a precedência deles pelo índice de posições
+        seq, pos = self.seq, self.pos
+        preds = inst.predecessors()
+        for r in range(lo, min(self._hi, n)):
+            for i, _d in preds[seq[r]]:
+                if not 0 <= pos[i] < r:
+                    return None
+        if not n:
+            return 0.0
+
+        # Agenda a partir de 'lo' (mesmas equações de verify_solution); c do prefixo é reaproveitado
+        c, p, s = self._c, inst.p, inst.s
+        if lo == 0:
+            prev = seq[0]
+            t = 0.0 + p[prev]
+            c[prev] = t
+            lo = 1
+        else:
+            prev = seq[lo - 1]
+            t = c[prev]
+        for r in range(lo, n):
+            j = seq[r]
+            start = t + s[prev][j]
+            for i, d in preds[j]:
+                if c[i] + d > start:
+                    start = c[i] + d
+            t = start + p[j]
+            c[j] = t
+            prev = j
+
+        self._valid = n
+        self._hi = 0
+        self._cmax = t
+        return t
+
+
+class HeadTailSchedule:
+    """
+    Decomposição cabeça/cauda da agenda de uma sequência factível (a incumbente da busca local).
+
+      - c[r]: término do job da posição r (cabeça: passada direta, como em verify_solution);
+      - L[r]: caminho mais longo do término da posição r até o C_max (cauda: passada reversa
+        sobre os setups consecutivos e os arcos de atraso);
+      - B[k]: maior caminho até o C_max que cruza o corte entre as posições k-1 e k por um
+        arco de atraso (c[i] + d_ij + p_j + L[pos j]).
+    Para todo corte k: C_max = max(c[k-1] + s[k-1][k] + p[k] + L[k], B[k]).
+
+    Um movimento só reordena as posições [a, e]; o prefixo (c) e o sufixo (L) não mudam.
+    Se nenhum job de [a, e] tem arco de atraso, a região é agendada só por setups e o C_max
+    do vizinho sai em O(1) de somas prefixadas de p e de setups. Caso contrário, o mesmo
+    cálculo dá um limite inferior do C_max do vizinho (a região sem os atrasos).
+    """
+
+    def __init__(self, inst, seq: List[int]):
+        n = len(seq)
+        p, s = inst.p, inst.s
+        preds, succs = inst.predecessors(), inst.successors()
+        self.inst = inst
+        self.seq = list(seq)
+        self.n = n
+        pos = [-1] * inst.n
+        for r, j in enumerate(seq):
+            pos[j] = r
+
+        # cabeça (término por posição), somas prefixadas de p e de setups consecutivos
+        c = [0.0] * n
+        P = [0.0] * (n + 1)
+        SS = [0.0] * max(n, 1)
+        NF = [0] * (n + 1)  # nº de jobs com arcos de atraso nas posições [0, r)
+        t = 0.0
+        for r, j in enumerate(seq):
+            if r == 0:
+                start = 0.0
+            else:
+                setup = s[seq[r - 1]][j]
+                SS[r] = SS[r - 1] + setup
+                start = t + setup
+            for i, d in preds[j]:
+                if c[pos[i]] + d > start:
+                    start = c[pos[i]] + d
+            t = start + p[j]
+            c[r] = t
+            P[r + 1] = P[r] + p[j]
+            NF[r + 1] = NF[r] + (1 if preds[j] or succs[j] else 0)
+
+        # cauda
+        L = [0.0] * n
+        for r in range(n - 2, -1, -1):
+            j, nxt = seq[r], seq[r + 1]
+            best = s[j][nxt] + p[nxt] + L[r + 1]
+            for q, d in succs[j]:
+                if pos[q] > r and d + p[q] + L[pos[q]] > best:
+                    best = d + p[q] + L[pos[q]]
+            L[r] = best
+
+        # cortes cruzados por arcos de atraso
+        B = [float("-inf")] * (n + 1)
+        for j in seq:
+            for i, d in preds[j]:
+                v = c[pos[i]] + d + p[j] + L[pos[j]]
+                for k in range(pos[i] + 1, pos[j] + 1):
+                    if v > B[k]:
+                        B[k] = v
+
+        self.pos, self.c, self.L, self.B = pos, c, L, B
+        self._P, self._SS, self._NF = P, SS, NF
+        self.C_max = c[-1] if n else 0.0
+
+    def latest_finish(self) -> List[Optional[float]]:
+        """Maior término de cada job (indexado pelo job) que não aumenta o C_max: C_max - L."""
+        lft: List[Optional[float]] = [None] * len(self.pos)
+        for r, j in enumerate(self.seq):
+            lft[j] = self.C_max - self.L[r]
+        return lft
+
+    def _region(self, a: int, e: int, pieces) -> Tuple[float, bool]:
+        """
+        C_max (ou limite inferior) da sequência em que as posições [a, e] são substituídas
+        pelos trechos 'pieces' ((u, v) da sequência atual, em ordem). Retorna (valor, exato).
+        """
+        seq, s, p = self.seq, self.inst.s, self.inst.p
+        SS = self._SS
+        prev = seq[a - 1] if a > 0 else -1
+        cost = 0.0
+        for u, v in pieces:
+            if prev != -1:
+                cost += s[prev][seq[u]]
+            cost += SS[v] - SS[u]
+            prev = seq[v]
+
+        ce = (self.c[a - 1] if a > 0 else 0.0) + cost + self._P[e + 1] - self._P[a]
+        if e < self.n - 1:
+            nxt = seq[e + 1]
+            ce = ce + s[prev][nxt] + p[nxt] + self.L[e + 1]
+        exact = self._NF[e + 1] == self._NF[a]
+        if exact and e < self.n - 1 and self.B[e + 1] > ce:
+            ce = self.B[e + 1]
+        return ce, exact
+
+    def swap(self, i: int, j: int) -> Tuple[float, bool]:
+        """(C_max, exato) da troca das posições i e j; exato=False: limite inferior."""
+        if i == j:
+            return self.C_max, True
+        if i > j:
+            i, j = j, i
+        if j == i + 1:
+            return self._region(i, j, ((j, j), (i, i)))
+        return self._region(i, j, ((j, j), (i + 1, j - 1), (i, i)))
+
+    def move_block(self, i: int, size: int, j: int) -> Tuple[float, bool]:
+        """(C_max, exato) de mover o bloco [i, i+size) para começar na posição j (como ArraySequence.move_block)."""
+        if i == j:
+            return self.C_max, True
+        if j < i:
+            return self._region(j, i + size - 1, ((i, i + size - 1), (j, i - 1)))
+        return self._region(i, j + size - 1, ((i + size, j + size - 1), (i, i + size - 1)))
+
+
+def critical_path(res: Resultado) -> List[int]:
+    """
+    Caminho crítico (jobs, em ordem) de uma solução factível: parte do último job e volta
+    pela restrição que fixou cada início. Só movimentos que tocam esses jobs podem reduzir C_max;
+    os jobs fora do caminho têm folga.
+    """
+    seq = res.sequence_normalized
+    if not res.feasible or not seq:
+        return []
+    binding = res.binding
+    path = [seq[-1]]
+    while binding[path[-1]] is not None:
+        path.append(binding[path[-1]][1])
+    path.reverse()
+    return path
+
+
+def critical_blocks(res: Resultado) -> List[Tuple[int, int]]:
+    """
+    Blocos críticos: trechos maximais de posições consecutivas [ini, fim] do caminho
+    crítico ligados por setup. Um arco de atraso (delay) no caminho separa blocos.
+    """
+    path = critical_path(res)
+    if not path:
+        return []
+    pos = {job: r for r, job in enumerate(res.sequence_normalized)}
+    binding = res.binding
+
+    blocks = []
+    start = pos[path[0]]
+    for job in path[1:]:
+        if binding[job][0] == "delay":
+            blocks.append((start, pos[binding[job][1]]))
+            start = pos[job]
+    blocks.append((start, pos[path[-1]]))
+    return blocks
+
+
+def _diagnose_violations(inst, seq: List[int]) -> List[str]:
+    """Mensagens textuais das violações de uma sequência (só calculadas quando pedidas)."""
     n_all = inst.n
     if len(set(seq)) != len(seq):
-        return {"feasible": False, "violations": ["Sequência contém jobs repetidos."],
-                "C_max": None, "b": None, "c": None, "sequence_normalized": seq}
-
-    # Sanidade de IDs
+        return ["Sequência contém jobs repetidos."]
     if any((j < 0 or j >= n_all) for j in seq):
-        return {"feasible": False, "violations": ["IDs fora do intervalo 0..n-1."],
-                "C_max": None, "b": None, "c": None, "sequence_normalized": seq}
+        return ["IDs fora do intervalo 0..n-1."]
 
     pos = {job: idx for idx, job in enumerate(seq)}
     violations = []
-
-    # -------- 1) Precedência estrutural (ordem) com verificação de predecessores ausentes --------
-    #
     # Regra: para cada j presente na parcial, todos os i com d[i][j] >= 0 precisam:
     #   (a) estar na parcial, e
     #   (b) aparecer antes de j.
-    #
     for j in seq:
-        for i in range(n_all):
-            d = inst.d[i][j]
-            if d != -1:  # existe i -> j
-                if i not in pos:
-                    violations.append(f"Predecessor ausente: {i} deve vir antes de {j}.")
-                else:
-                    if pos[i] > pos[j]:
-                        violations.append(f"Ordem de precedência violada: {i} deve vir antes de {j}.")
-
-    if violations:
-        return {"feasible": False, "violations": violations,
-                "C_max": None, "b": None, "c": None, "sequence_normalized": seq}
-
-    # -------- 2) Agenda parcial em ordem da sequência --------
-    b = [None] * n_all
-    c = [None] * n_all
+        for i, _d in inst.predecessors()[j]:
+            if i not in pos:
+                violations.append(f"Predecessor ausente: {i} deve vir antes de {j}.")
+            elif pos[i] > pos[j]:
+                violations.append(f"Ordem de precedência violada: {i} deve vir antes de {j}.")
+    return violations
 
-    if not seq:
-        return {"feasible": True, "violations": [], "C_max": 0.0,
-                "b": b, "c": c, "sequence_normalized": seq}
 
-    # Primeiro job da sequência
-    j0 = seq[0]
-    b[j0] = 0.0
-    c[j0] = b[j0] + inst.p[j0]
+def verify_solution(inst, seq: List[int], verbose: bool = False) -> Resultado:
+    """
+    Verifica (parcial ou total) uma sequência de jobs 0-based para 1 | s_ij, prec(d_ij) | Cmax.
 
-    # Demais
-    for r in range(1, len(seq)):
-        j = seq[r]
-        i_prev = seq[r-1]
+    Regras de precedência (fortes) na parcial:
+      - Se j está na parcial e existe i com d[i][j] >= 0, então i DEVE estar na parcial
+        e deve aparecer antes de j (pos[i] < pos[j]).
 
-        # Setup imediato (Eq. 7)
-        cand_setup = c[i_prev] + inst.s[i_prev][j]
+    Retorna um Resultado com factibilidade e C_max; b, c e as violações são
+    materializados apenas se forem acessados.
+    """
+    global _evaluations
+    _evaluations += 1
+    if verbose:
+        print("\n=== Iniciando verificação da solução ===")
+        print(f"Sequência original: {seq}")
 
-        # Releases por predecessores já agendados (Eq. 8)
-        rel = 0.0
-        for i in seq[:r]:
-            d = inst.d[i][j]
-            if d != -1:
-                rel = max(rel, c[i] + d)
+    n_all = inst.n
+    preds = inst.predecessors()
 
-        b[j] = max(cand_setup, rel)
-        c[j] = b[j] + inst.p[j]
+    # -------- 1) IDs, repetições e precedência estrutural (ordem) --------
+    pos = [-1] * n_all
+    for r, j in enumerate(seq):
+        if j < 0 or j >= n_all:
+            return Resultado(inst, seq, False, None, ["IDs fora do intervalo 0..n-1."])
+        if pos[j] != -1:
+            return Resultado(inst, seq, False, None, ["Sequência contém jobs repetidos."])
+        pos[j] = r
 
-        # Checagens explícitas
-        if b[j] + 1e-9 < c[i_prev] + inst.s[i_prev][j]:
-            violations.append(
-                f"(7) violada em {i_prev}->{j}: b[{j}]={b[j]:.3f} < c[{i_prev}]({c[i_prev]:.3f}) + s={inst.s[i_prev][j]}"
-            )
-        for i in seq[:r]:
-            d = inst.d[i][j]
-            if d != -1:
-                req = c[i] + d
-                if b[j] + 1e-9 < req:
-                    violations.append(
-                        f"Delay insuficiente em {i}->{j}: b[{j}]={b[j]:.3f} < c[{i}]({c[i]:.3f})+d({d[i][j]})={req:.3f}"
-                    )
-
-    if violations:
-        return {"feasible": False, "violations": violations,
-                "C_max": None, "b": b, "c": c, "sequence_normalized": seq}
+    for j in seq:
+        pj = pos[j]
+        for i, _d in preds[j]:
+            # predecessor ausente (pos = -1) ou depois de j
+            if not (0 <= pos[i] < pj):
+                return Resultado(inst, seq, False, None)
 
-    # C_max parcial: término do último job da sequência
-    C_max = c[seq[-1]]
+    if not seq:
+        return Resultado(inst, seq, True, 0.0)
+
+    # -------- 2) Agenda em ordem da sequência --------
+    # Os inícios b[j] = max(c[prev] + s[prev][j] (Eq. 7), max_i c[i] + d[i][j] (Eq. 8))
+    # satisfazem (7) e (8) por construção; aqui só o C_max é guardado.
+    c = pos  # reaproveita a lista: depois da checagem, pos[j] passa a guardar c[j]
+    prev = seq[0]
+    t = 0.0 + inst.p[prev]
+    c[prev] = t
+    for r in range(1, len(seq)):
+        j = seq[r]
+        start = t + inst.s[prev][j]
+        for i, d in preds[j]:
+            if c[i] + d > start:
+                start = c[i] + d
+        t = start + inst.p[j]
+        c[j] = t
+        prev = j
 
-    return {
-        "feasible": True,
-        "violations": [],
-        "C_max": C_max,
-        "b": b,
-        "c": c,
-        "sequence_normalized": seq
-    }
+    # C_max parcial: término do último job da sequência
+    return Resultado(inst, seq, True, t)
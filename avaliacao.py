@@ -0,0 +1,356 @@
+import os
+import random
+from typing import List, Optional
+
+import Modelagem as md
+from Modelagem import Instance, ArraySequence
+
+# ******************************** KERNEL COMPILADO DE AVALIAÇÃO (OPCIONAL) ********************************
+#
+# A recorrência da agenda (b[j] = max(c[prev] + s[prev][j], max_i c[i] + d[i][j]), c[j] = b[j] + p[j])
+# é um laço numérico apertado. Com numba instalado, este módulo oferece versões compiladas
+# (njit) da avaliação completa, da avaliação por sufixo, da sequência in place (ArraySequence)
+# e da avaliação em lote, sobre arrays numpy da instância.
+#
+# O backend é escolhido em tempo de execução (set_backend: "python" | "numba" | "auto").
+# A implementação em Python puro de Modelagem continua sendo o padrão, o fallback e a
+# referência: warmup() compila os kernels uma vez por processo e cross_check() compara
+# os resultados com verify_solution antes de o backend compilado ser usado.
+# A escolha vai para a variável de ambiente TIC_KERNEL, herdada pelos processos de trabalho.
+
+try:
+    import numpy as np
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numpy/numba são opcionais: sem eles só existe o backend Python
+    np = None
+    HAS_NUMBA = False
+
+BACKENDS = ("python", "numba", "auto")
+_BACKEND = "python"
+_WARMED = False
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _nb_makespan(seq, p, s, ptr, idx, dl, pos, c):
+        """verify_solution compilado: C_max, ou -1.0 se a sequência for inválida/infactível."""
+        n = seq.shape[0]
+        nj = pos.shape[0]
+        for k in range(nj):
+            pos[k] = -1
+        for r in range(n):
+            j = seq[r]
+            if j < 0 or j >= nj or pos[j] != -1:
+                return -1.0
+            pos[j] = r
+        for r in range(n):
+            j = seq[r]
+            for k in range(ptr[j], ptr[j + 1]):
+                pi = pos[idx[k]]
+                if pi < 0 or pi >= r:
+                    return -1.0
+        if n == 0:
+            return 0.0
+
+        prev = seq[0]
+        t = p[prev]
+        c[prev] = t
+        for r in range(1, n):
+            j = seq[r]
+            start = t + s[prev, j]
+            for k in range(ptr[j], ptr[j + 1]):
+                v = c[idx[k]] + dl[k]
+                if v > start:
+                    start = v
+            t = start + p[j]
+            c[j] = t
+            prev = j
+        return t
+
+    @njit(cache=True)
+    def _nb_suffix(seq, lo, p, s, ptr, idx, dl, c):
+        """md.evaluate_suffix compilado (NaN em c faz o papel de None); -1.0 se infactível."""
+        n = seq.shape[0]
+        for r in range(lo, n):
+            c[seq[r]] = np.nan
+        if n == 0:
+            return 0.0
+
+        prev = -1
+        t = 0.0
+        if lo > 0:
+            prev = seq[lo - 1]
+            t = c[prev]
+        for r in range(lo, n):
+            j = seq[r]
+            start = 0.0
+            if prev != -1:
+                start = t + s[prev, j]
+            for k in range(ptr[j], ptr[j + 1]):
+                ci = c[idx[k]]
+                if np.isnan(ci):
+                    return -1.0
+                if ci + dl[k] > start:
+                    start = ci + dl[k]
+            t = start + p[j]
+            c[j] = t
+            prev = j
+        return t
+
+    @njit(cache=True)
+    def _nb_sequence(seq, pos, lo, hi, p, s, ptr, idx, dl, c):
+        """ArraySequence.evaluate compilado: checa precedência em [lo, hi) e agenda a partir de lo."""
+        n = seq.shape[0]
+        if hi > n:
+            hi = n
+        for r in range(lo, hi):
+            j = seq[r]
+            for k in range(ptr[j], ptr[j + 1]):
+                pi = pos[idx[k]]
+                if pi < 0 or pi >= r:
+                    return -1.0
+        if n == 0:
+            return 0.0
+
+        if lo == 0:
+            prev = seq[0]
+            t = p[prev]
+            c[prev] = t
+            lo = 1
+        else:
+            prev = seq[lo - 1]
+            t = c[prev]
+        for r in range(lo, n):
+            j = seq[r]
+            start = t + s[prev, j]
+            for k in range(ptr[j], ptr[j + 1]):
+                v = c[idx[k]] + dl[k]
+                if v > start:
+                    start = v
+            t = start + p[j]
+            c[j] = t
+            prev = j
+        return t
+
+    @njit(cache=True)
+    def _nb_batch(seqs, p, s, ptr, idx, dl, out):
+        """C_max de cada linha de 'seqs' (inf se infactível)."""
+        nj = p.shape[0]
+        pos = np.empty(nj, np.intc)
+        c = np.empty(nj, np.float64)
+        for b in range(seqs.shape[0]):
+            v = _nb_makespan(seqs[b], p, s, ptr, idx, dl, pos, c)
+            out[b] = v if v >= 0.0 else np.inf
+
+
+def instance_arrays(inst: Instance) -> tuple:
+    """
+    Dados da instância em arrays numpy, calculados uma vez por instância:
+    (p, s, ptr, idx, dl, pos, c) — predecessores em formato CSR (preds de j em
+    idx[ptr[j]:ptr[j+1]], atrasos em dl) e áreas de trabalho pos/c.
+    """
+    if inst._arrays is None:
+        preds = inst.predecessors()
+        ptr = np.zeros(inst.n + 1, dtype=np.intc)
+        for j in range(inst.n):
+            ptr[j + 1] = ptr[j] + len(preds[j])
+        idx = np.array([i for j in range(inst.n) for i, _d in preds[j]], dtype=np.intc)
+        dl = np.array([d for j in range(inst.n) for _i, d in preds[j]], dtype=np.float64)
+        inst._arrays = (
+            np.asarray(inst.p, dtype=np.float64),
+            np.asarray(inst.s, dtype=np.float64),
+            ptr, idx, dl,
+            np.empty(inst.n, dtype=np.intc),
+            np.empty(inst.n, dtype=np.float64),
+        )
+    return inst._arrays
+
+
+# ---------------------------
+# Escolha do backend e aquecimento
+# ---------------------------
+def set_backend(name: str) -> str:
+    """
+    Seleciona o backend de avaliação ("python", "numba" ou "auto" = numba se disponível).
+    Retorna o backend efetivo. "numba" sem numba/numpy instalados gera RuntimeError.
+    """
+    global _BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {name}. Opções: {BACKENDS}")
+    if name == "auto":
+        name = "numba" if HAS_NUMBA else "python"
+    if name == "numba" and not HAS_NUMBA:
+        raise RuntimeError("Backend 'numba' pedido, mas numba/numpy não estão instalados.")
+    _BACKEND = name
+    os.environ["TIC_KERNEL"] = name  # processos de trabalho herdam a escolha
+    return name
+
+
+def backend() -> str:
+    return _BACKEND
+
+
+def _toy_instance() -> Instance:
+    """Instância de 3 jobs (com um arco de atraso) só para disparar a compilação."""
+    return Instance(n=3, p=[1.0, 2.0, 3.0],
+                    s=[[0.0, 1.0, 2.0], [1.0, 0.0, 1.0], [2.0, 1.0, 0.0]],
+                    d=[[-1, 4.0, -1], [-1, -1, -1], [-1, -1, -1]])
+
+
+def cross_check(inst: Instance, samples: int = 20, seed: int = 0) -> bool:
+    """
+    Compara o backend atual com a referência em Python (verify_solution / evaluate_suffix)
+    em 'samples' ordens topológicas aleatórias e nas mesmas com uma troca (em geral infactível).
+    """
+    rng = random.Random(seed)
+    preds = inst.predecessors()
+    succs = inst.successors()
+    for _ in range(samples):
+        missing = [len(preds[j]) for j in range(inst.n)]
+        ready = [j for j in range(inst.n) if missing[j] == 0]
+        seq = []
+        while ready:
+            j = ready.pop(rng.randrange(len(ready)))
+            seq.append(j)
+            for q, _d in succs[j]:
+                missing[q] -= 1
+                if missing[q] == 0:
+                    ready.append(q)
+        trial = seq[:]
+        if len(trial) > 1:
+            a, b = rng.sample(range(len(trial)), 2)
+            trial[a], trial[b] = trial[b], trial[a]
+
+        for cand in (seq, trial):
+            ref = md.verify_solution(inst, cand, verbose=False)
+            expected = ref.C_max if ref.feasible else None
+            if makespan(inst, cand) != expected:
+                return False
+            buf = new_sequence(cand)
+            if buf.evaluate(inst) != expected:
+                return False
+            lo = rng.randrange(len(cand) + 1)
+            c = completion_buffer(inst)
+            if evaluate_suffix(inst, cand, 0, c) != expected:
+                return False
+            if expected is not None and evaluate_suffix(inst, cand, lo, c) != expected:
+                return False
+    return True
+
+
+def warmup(inst: Optional[Instance] = None) -> None:
+    """
+    Compila os kernels (uma vez por processo; numba também guarda em cache no disco) e,
+    se 'inst' for dada, confere o backend contra a referência em Python nessa instância.
+    Em caso de divergência volta para o backend Python. Sem efeito no backend Python.
+    """
+    global _WARMED
+    if _BACKEND != "numba":
+        return
+    if not _WARMED:
+        toy = _toy_instance()
+        makespans(toy, [[0, 1, 2], [1, 0, 2]])
+        evaluate_suffix(toy, [0, 2, 1], 1, completion_buffer(toy))
+        new_sequence([0, 2, 1]).evaluate(toy)
+        _WARMED = True
+        if not cross_check(toy):
+            print("[avaliacao] Kernel compilado diverge da referência; usando o backend Python.")
+            set_backend("python")
+            return
+    if inst is not None and not cross_check(inst, samples=5):
+        print("[avaliacao] Kernel compilado diverge da referência nesta instância; usando o backend Python.")
+        set_backend("python")
+
+
+def init_worker(name: Optional[str] = None) -> None:
+    """Inicializador de pools de processos: aplica o backend e aquece os kernels no processo."""
+    set_backend(name or os.environ.get("TIC_KERNEL", "python"))
+    warmup()
+
+
+# ---------------------------
+# Avaliação (despacha para o backend atual)
+# ---------------------------
+def makespan(inst: Instance, seq: List[int]) -> Optional[float]:
+    """C_max da sequência, ou None se inválida/infactível (mesmo critério de verify_solution)."""
+    if _BACKEND == "numba":
+        p, s, ptr, idx, dl, pos, c = instance_arrays(inst)
+        md.count_evaluations()
+        v = _nb_makespan(np.asarray(seq, dtype=np.intc), p, s, ptr, idx, dl, pos, c)
+        return None if v < 0 else v
+    r = md.verify_solution(inst, seq, verbose=False)
+    return r.C_max if r.feasible else None
+
+
+def makespans(inst: Instance, seqs: List[List[int]]) -> List[float]:
+    """C_max de um lote de sequências (inf se infactível), numa única chamada ao kernel."""
+    if _BACKEND == "numba" and seqs and all(len(q) == len(seqs[0]) for q in seqs):
+        p, s, ptr, idx, dl, _pos, _c = instance_arrays(inst)
+        out = np.empty(len(seqs), dtype=np.float64)
+        md.count_evaluations(len(seqs))
+        _nb_batch(np.asarray(seqs, dtype=np.intc), p, s, ptr, idx, dl, out)
+        return out.tolist()
+    values = []
+    for seq in seqs:
+        v = makespan(inst, seq)
+        values.append(float("inf") if v is None else v)
+    return values
+
+
+def completion_buffer(inst: Instance):
+    """Vetor de términos (indexado pelo job) no formato que evaluate_suffix do backend espera."""
+    if _BACKEND == "numba":
+        return np.full(inst.n, np.nan)
+    return [None] * inst.n
+
+
+def evaluate_suffix(inst: Instance, seq: List[int], lo: int, c) -> Optional[float]:
+    """md.evaluate_suffix no backend atual ('c' criado por completion_buffer)."""
+    if _BACKEND == "numba":
+        p, s, ptr, idx, dl, _pos, _c = instance_arrays(inst)
+        md.count_evaluations()
+        v = _nb_suffix(np.asarray(seq, dtype=np.intc), lo, p, s, ptr, idx, dl, c)
+        return None if v < 0 else v
+    return md.evaluate_suffix(inst, seq, lo, c)
+
+
+class KernelSequence(ArraySequence):
+    """ArraySequence cuja avaliação roda no kernel compilado (arrays numpy sobre os mesmos buffers)."""
+    __slots__ = ("_nseq", "_npos", "_nc")
+
+    def __init__(self, seq: List[int]):
+        super().__init__(seq)
+        self._nseq = np.frombuffer(self.seq, dtype=np.intc)  # sem cópia: enxerga os movimentos in place
+        self._npos = np.frombuffer(self.pos, dtype=np.intc)
+        self._nc = np.zeros(len(self.pos), dtype=np.float64)
+
+    def evaluate(self, inst) -> Optional[float]:
+        lo = self._valid
+        n = len(self.seq)
+        if lo >= n and n:
+            return self._cmax
+        p, s, ptr, idx, dl, _pos, _c = instance_arrays(inst)
+        md.count_evaluations()
+        v = _nb_sequence(self._nseq, self._npos, lo, self._hi, p, s, ptr, idx, dl, self._nc)
+        if v < 0:
+            return None
+        self._valid = n
+        self._hi = 0
+        self._cmax = v
+        return v
+
+
+def new_sequence(seq: List[int]) -> ArraySequence:
+    """Sequência mutável da busca local no backend atual."""
+    if _BACKEND == "numba":
+        return KernelSequence(seq)
+    return ArraySequence(seq)
+
+
+# backend herdado do processo pai (ou definido pelo usuário na variável de ambiente)
+if os.environ.get("TIC_KERNEL") in BACKENDS:
+    try:
+        set_backend(os.environ["TIC_KERNEL"])
+    except RuntimeError:
+        pass  # numba pedido mas indisponível neste ambiente: fica o backend Python
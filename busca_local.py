@@ -1,17 +1,419 @@
 import random as random
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
-import networkx as nx
+from typing import Callable, List, Tuple, Dict, Optional
 
-from Modelagem import Instance, verify_solution
+from Modelagem import Instance, ArraySequence, HeadTailSchedule, verify_solution, critical_blocks
+import Modelagem as md
+import avaliacao as av
+
+# ---------------------------
+# Restrição da vizinhança aos blocos críticos
+# ---------------------------
+def critical_positions(res) -> List[int]:
+    """
+    Posições da sequência em torno dos blocos críticos (md.critical_blocks), incluindo
+    a posição imediatamente antes e depois de cada bloco. Com critical=True os operadores
+    sorteiam o job movido/trocado só entre essas posições, já que mover jobs com folga
+    não reduz C_max.
+    """
+    n = len(res["sequence_normalized"])
+    positions = set()
+    for ini, fim in critical_blocks(res):
+        positions.update(range(max(0, ini - 1), min(n - 1, fim + 1) + 1))
+    return sorted(positions)
+
+
+def _sample_position(candidates: Optional[List[int]], upper: int) -> int:
+    """Sorteia uma posição em [0, upper]; com candidatos críticos, só entre eles."""
+    if candidates:
+        valid = [r for r in candidates if r <= upper]
+        if valid:
+            return random.choice(valid)
+    return random.randint(0, upper)
+
+
+# ---------------------------
+# Reparo de factibilidade
+# ---------------------------
+def repair_precedence(inst: Instance, seq: List[int]) -> List[int]:
+    """
+    Restaura a ordem de precedência de uma permutação com deslocamento mínimo:
+    ordenação topológica estável (Kahn) em que, entre os jobs prontos, sai sempre o
+    de menor posição na sequência original. Se 'seq' já é factível, volta igual; senão,
+    só os jobs que violam precedência (e quem depende deles) mudam de lugar.
+    Como os atrasos d_ij são respeitados pela própria agenda, a sequência reparada é factível.
+    """
+    import heapq
+
+    preds = inst.predecessors()
+    succs = inst.successors()
+    pos = {job: r for r, job in enumerate(seq)}
+    missing = {j: sum(1 for i, _d in preds[j] if i in pos) for j in seq}
+    heap = [(pos[j], j) for j in seq if missing[j] == 0]
+    heapq.heapify(heap)
+
+    out = []
+    while heap:
+        _r, j = heapq.heappop(heap)
+        out.append(j)
+        for q, _d in succs[j]:
+            if q in missing:
+                missing[q] -= 1
+                if missing[q] == 0:
+                    heapq.heappush(heap, (pos[q], q))
+    return out
+
+
+def _repair_buffer(inst: Instance, buf: ArraySequence):
+    """Repara a sequência (infactível) do buffer e a avalia; devolve (seq reparada, Resultado)."""
+    seq = repair_precedence(inst, buf.to_list())
+    return seq, verify_solution(inst, seq, verbose=False)
+
+
+# ---------------------------
+# Listas de candidatos por setup (k vizinhos mais próximos)
+# ---------------------------
+def neighbor_insert_positions(inst: Instance, buf: ArraySequence, start: int, size: int, k: int) -> List[int]:
+    """
+    Posições de inserção (na sequência sem o bloco buf[start:start+size]) que colocam
+    o bloco logo depois de um dos k melhores predecessores do seu primeiro job ou logo
+    antes de um dos k melhores sucessores do último (inst.setup_neighbors). Usa o índice
+    de posições do buffer, sem montar a sequência sem o bloco.
+    Reduz a vizinhança de inserção de O(n) para O(k) posições.
+    """
+    succ, pred = inst.setup_neighbors(k)
+    pos = buf.pos
+    end = start + size
+    positions = set()
+    for q in pred[buf[start]]:
+        r = pos[q]
+        if r >= 0 and not start <= r < end:
+            positions.add((r if r < start else r - size) + 1)
+    for q in succ[buf[end - 1]]:
+        r = pos[q]
+        if r >= 0 and not start <= r < end:
+            positions.add(r if r < start else r - size)
+    return sorted(positions)
+
+
+# ---------------------------
+# Avaliação de movimentos: cabeça/cauda da incumbente + buffer in place
+# ---------------------------
+#
+# Movimento: ("swap", i, j) ou ("block", i, size, j) (bloco [i, i+size) passa a começar em j;
+# inserção de um job = bloco de tamanho 1), sempre relativo à incumbente.
+
+def _apply_move(buf: ArraySequence, move: tuple) -> None:
+    if move[0] == "swap":
+        buf.swap(move[1], move[2])
+    else:
+        buf.move_block(move[1], move[2], move[3])
+
+
+def _evaluate_move(inst: Instance, buf: ArraySequence, ht: HeadTailSchedule, move: tuple,
+                   threshold: float, repair: bool = False):
+    """
+    C_max do vizinho da incumbente ('buf' sem movimentos pendentes, 'ht' da mesma sequência):
+      1) ht dá o C_max exato em O(1) se as posições alteradas não têm arcos de atraso;
+         senão um limite inferior — se ele já não fica abaixo de 'threshold', o vizinho é
+         descartado sem ser agendado e o limite é devolvido no lugar do C_max (com repair
+         não, pois o reparo muda a sequência);
+      2) senão o movimento é aplicado no buffer, avaliado a partir da 1ª posição alterada
+         e desfeito; com repair, um vizinho infactível é reparado e reavaliado.
+    Cada vizinho conta uma avaliação (md.count_evaluations) qualquer que seja o caminho.
+    Retorna (C_max, ou None se infactível; sequência reparada ou None).
+    """
+    if move[0] == "swap":
+        val, exact = ht.swap(move[1], move[2])
+    else:
+        val, exact = ht.move_block(move[1], move[2], move[3])
+    if exact or (val >= threshold and not repair):
+        md.count_evaluations()  # o buffer (que conta sozinho) não é usado neste caminho
+        return val, None
+
+    _apply_move(buf, move)
+    val = buf.evaluate(inst)
+    repaired = None
+    if val is None and repair:
+        repaired, repaired_solution = _repair_buffer(inst, buf)
+        val = repaired_solution["C_max"]
+    buf.undo()
+    return val, repaired
+
+
+def _accept_move(inst: Instance, buf: ArraySequence, move: tuple, repaired: Optional[List[int]]):
+    """Aplica o movimento aceito (ou adota a sequência reparada); devolve (buf, seq, Resultado, ht)."""
+    if repaired is not None:
+        buf = av.new_sequence(repaired)
+    else:
+        _apply_move(buf, move)
+        buf.commit()
+    seq = buf.to_list()
+    return buf, seq, verify_solution(inst, seq, verbose=False), HeadTailSchedule(inst, seq)
+
+
+class SearchState:
+    """
+    Incumbente da busca local com o caminho rápido de avaliação: buffer in place (ArraySequence)
+    + cabeça/cauda (HeadTailSchedule) da mesma sequência. Todos os operadores e motores de
+    busca (aqui e em vizinhanca.py) avaliam e aceitam movimentos por este objeto.
+    on_improve(C_max), se dado, é chamado a cada movimento aceito, no momento em que acontece
+    (ex.: ConvergenceTrace.record, que só guarda melhorias da incumbente).
+    """
+    __slots__ = ("inst", "buf", "seq", "res", "ht", "repair", "critical", "crit", "on_improve")
+
+    def __init__(self, inst: Instance, res, critical: bool = False, repair: bool = False,
+                 on_improve: Optional[Callable[[float], object]] = None):
+        self.inst = inst
+        self.on_improve = on_improve
+        self.repair = repair
+        self.critical = critical
+        self.seq = res["sequence_normalized"]
+        self.res = res
+        self.buf = av.new_sequence(self.seq)
+        self.ht = HeadTailSchedule(inst, self.seq)
+        self.crit = critical_positions(res) if critical else None
+
+    @property
+    def C_max(self) -> float:
+        return self.res["C_max"]
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    def evaluate(self, move: tuple, threshold: float):
+        """(C_max ou limite >= threshold, sequência reparada ou None) do vizinho (_evaluate_move)."""
+        return _evaluate_move(self.inst, self.buf, self.ht, move, threshold, self.repair)
+
+    def accept(self, move: tuple, repaired: Optional[List[int]] = None) -> None:
+        """Aplica o movimento (ou adota a sequência reparada) e atualiza a incumbente."""
+        self.buf, self.seq, self.res, self.ht = _accept_move(self.inst, self.buf, move, repaired)
+        if self.critical:
+            self.crit = critical_positions(self.res)
+        if self.on_improve is not None:
+            self.on_improve(self.res["C_max"])
+
+    def best_of(self, moves, threshold: Optional[float] = None, first: bool = False):
+        """
+        Percorre os movimentos (iterável, em geral um gerador preguiçoso) e devolve
+        (move, C_max, reparada) do melhor abaixo de 'threshold' (padrão: C_max da incumbente),
+        ou None. first=True: para no primeiro que melhora (first-improvement).
+        O limite de poda de cada avaliação é o melhor valor achado até então.
+        """
+        best = None
+        limit = self.C_max if threshold is None else threshold
+        for move in moves:
+            val, repaired = self.evaluate(move, limit)
+            if val is not None and val < limit:
+                best = (move, val, repaired)
+                limit = val
+                if first:
+                    break
+        return best
+
+
+def improvement_loop(inst: Instance, res, propose, name: str, critical: bool = False, repair: bool = False,
+                     max_stagnation: float = 1000, max_iterations: Optional[int] = None,
+                     on_improve: Optional[Callable[[float], object]] = None):
+    """
+    Laço de estagnação comum aos operadores: a cada tentativa, propose(state) gera os
+    movimentos candidatos (um só, nos operadores aleatórios; várias posições, nos "best"),
+    o melhor que melhora a incumbente é aceito e zera a estagnação.
+    Para com 'max_stagnation' tentativas seguidas sem melhoria ou 'max_iterations' tentativas.
+    on_improve(C_max) é chamado a cada melhoria aceita (ver SearchState).
+    Retorna (sequência, Resultado, melhorou).
+    """
+    print(f"\nIniciando {name}...")
+    st = SearchState(inst, res, critical, repair, on_improve)
+    improved = False
+    stagnation_counter = 0
+    iterations = 0
+
+    while stagnation_counter < max_stagnation and (max_iterations is None or iterations < max_iterations):
+        iterations += 1
+        found = st.best_of(propose(st))
+        if found is not None:
+            move, val, repaired = found
+            st.accept(move, repaired)
+            improved = True
+            print(f"Melhoria encontrada: novo makespan {val} com o movimento {move}, tentativa {stagnation_counter}")
+            stagnation_counter = 0
+        else:
+            stagnation_counter += 1
+
+    print(f"{name} finalizada.")
+    print("Número de tentativas:", iterations)
+    return st.seq, st.res, improved
+
+
+# ---------------------------
+# Avaliação paralela da vizinhança de trocas (swap) usada pela buscalocal1
+# ---------------------------
+#
+# A vizinhança O(n²) de pares (i, j), i < j, é dividida em blocos ("chunks") de tamanho
+# fixo. A divisão não depende do número de workers, e os blocos são combinados sempre
+# na ordem de enumeração, então o movimento escolhido é o mesmo para 1 ou N workers.
+
+_WORKER_INST = None   # instância (somente leitura) de cada processo de trabalho
+_WORKER_LIMIT = None  # mp.Value compartilhado: menor chunk_id que já achou melhoria (first-improvement)
+
+
+def _init_worker(inst: Instance, limit=None) -> None:
+    """Inicializador do pool de processos: recebe a instância (e o limite compartilhado) uma única vez por processo."""
+    global _WORKER_INST, _WORKER_LIMIT
+    _WORKER_INST = inst
+    _WORKER_LIMIT = limit
+    av.warmup(inst)
+
+
+def _eval_swap_chunk(sol: List[int], pairs: List[Tuple[int, int]], best_makespan: float, first: bool,
+                     chunk_id: int = 0, inst: Optional[Instance] = None) -> Optional[Tuple[int, float]]:
+    """
+    Avalia as trocas de um bloco sobre uma cópia local de 'sol' (_evaluate_move: cabeça/cauda
+    em O(1) quando possível, senão troca e desfaz in place).
+    Retorna (posição no bloco, C_max) do melhor movimento que melhora best_makespan
+    (first=True: o primeiro que melhora), ou None.
+    Nos processos do pool, com first=True, o bloco consulta o limite compartilhado a cada par e
+    para assim que um bloco anterior (chunk_id menor) acha melhoria; blocos anteriores continuam,
+    então o movimento escolhido não depende da ordem de término.
+    """
+    limit = _WORKER_LIMIT if first and inst is None else None
+    inst = inst if inst is not None else _WORKER_INST
+    trial = av.new_sequence(sol)
+    ht = HeadTailSchedule(inst, sol)
+    found = None
+    for k, (i, j) in enumerate(pairs):
+        if limit is not None and limit.value < chunk_id:
+            return None  # um bloco anterior já achou melhoria
+        threshold = best_makespan if found is None else found[1]
+        val, _rep = _evaluate_move(inst, trial, ht, ("swap", i, j), threshold)
+        if val is not None and val < best_makespan and (found is None or val < found[1]):
+            found = (k, val)
+            if first:
+                if limit is not None:
+                    with limit.get_lock():
+                        if chunk_id < limit.value:
+                            limit.value = chunk_id
+                break
+    return found
+
+
+def _best_swap_move(inst: Instance, sol: List[int], best_makespan: float, first: bool,
+                    chunk_size: int, rng: Optional[random.Random], pool=None,
+                    limit=None) -> Optional[Tuple[int, int, float]]:
+    """
+    Procura na vizinhança de trocas o movimento (i, j, C_max) que melhora best_makespan.
+      - first=True: o primeiro na ordem de enumeração (blocos seguintes são cancelados ou,
+        se já em execução, param pelo limite compartilhado 'limit');
+      - first=False: o melhor de toda a vizinhança (empates: o primeiro na ordem).
+    rng (opcional) embaralha a ordem de enumeração de forma reproduzível.
+    """
+    n = len(sol)
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    if rng is not None:
+        rng.shuffle(pairs)
+    chunks = [pairs[k:k + chunk_size] for k in range(0, len(pairs), chunk_size)]
+
+    best = None
+    if pool is None:
+        for cid, chunk in enumerate(chunks):
+            r = _eval_swap_chunk(sol, chunk, best_makespan, first, inst=inst)
+            if r is not None and (best is None or r[1] < best[2]):
+                i, j = chunk[r[0]]
+                best = (i, j, r[1])
+                if first:
+                    break
+        return best
+
+    from concurrent.futures import wait
+    if limit is not None:
+        limit.value = len(chunks)
+    futures = [pool.submit(_eval_swap_chunk, sol, chunk, best_makespan, first, cid)
+               for cid, chunk in enumerate(chunks)]
+
+    # combina na ordem dos blocos: o resultado não depende de qual worker terminou antes
+    for cid, fut in enumerate(futures):
+        r = fut.result()
+        if r is not None and (best is None or r[1] < best[2]):
+            i, j = chunks[cid][r[0]]
+            best = (i, j, r[1])
+            if first:
+                rest = futures[cid + 1:]
+                for other in rest:
+                    other.cancel()  # blocos ainda não iniciados são descartados
+                # os já iniciados leem o limite e param no próximo par; espera por eles para que
+                # nenhum bloco desta varredura continue rodando (ou mexa no limite) na próxima
+                wait(rest)
+                break
+    return best
+
+
+def _buscalocal1_parallel(inst: Instance, res, mode: str, workers: int, chunk_size: int,
+                          seed: Optional[int], max_iterations: int, on_improve=None):
+    """Descida completa na vizinhança de trocas com avaliação em blocos (ver buscalocal1)."""
+    print(f"\nIniciando Busca Local ({mode}-improvement, {workers} workers)...")
+    best_sol = res["sequence_normalized"][:]
+    best_makespan = res["C_max"]
+    improved = False
+    first = mode == "first"
+    rng = random.Random(seed) if seed is not None else None
+
+    pool = None
+    limit = None
+    if workers > 1:
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+        limit = mp.Value("i", 0)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(inst, limit))
+
+    iterations = 0
+    try:
+        while iterations < max_iterations:
+            iterations += 1
+            move = _best_swap_move(inst, best_sol, best_makespan, first, chunk_size, rng, pool, limit)
+            if move is None:
+                break  # ótimo local na vizinhança de trocas
+            i, j, new_makespan = move
+            best_sol[i], best_sol[j] = best_sol[j], best_sol[i]
+            best_makespan = new_makespan
+            improved = True
+            if on_improve is not None:
+                on_improve(new_makespan)
+            print(f"Melhoria encontrada: novo makespan {new_makespan} trocando posições {i} e {j}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    print("Busca Local finalizada.")
+    print("Número de iterações:", iterations)
+    return best_sol, verify_solution(inst, best_sol, verbose=False), improved
+
+
+def buscalocal1(inst: Instance, res: List[int], mode: str = "sequencial", workers: int = 1,
+                chunk_size: int = 256, seed: Optional[int] = None,
+                max_iterations: int = 1000,
+                on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """
+    Busca local por trocas de pares de posições.
+
+    - mode="sequencial": varredura original (todas as posições i != j, estagnação de 1000).
+    - mode="first" | "best": descida first/best-improvement com a vizinhança dividida em
+      blocos de 'chunk_size' pares, avaliados em um pool de 'workers' processos (a avaliação é
+      Python puro: threads não ganham nada com o GIL). A instância é enviada uma vez para cada processo.
+      O resultado é determinístico para uma dada 'seed' (ordem de enumeração), qualquer
+      que seja o número de workers.
+    on_improve(C_max), se dado, é chamado a cada melhoria (traço de convergência).
+    """
+    if mode != "sequencial":
+        if mode not in ("first", "best"):
+            raise ValueError(f"mode deve ser 'sequencial', 'first' ou 'best' (recebido: {mode}).")
+        return _buscalocal1_parallel(inst, res, mode, workers, chunk_size, seed, max_iterations, on_improve)
 
-def buscalocal1(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
-    
     print("\nIniciando Busca Local...")
     improved = False
     best_solution = res
     best_sol = res["sequence_normalized"]
+    buf = av.new_sequence(best_sol)
+    ht = HeadTailSchedule(inst, best_sol)
     best_makespan = best_solution["C_max"]
     
     iterations = 0
@@ -19,25 +421,21 @@ def buscalocal1(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
     max_stagnation = 1000  # Define um número máximo de iterações para evitar loops infinitos
 
     while stagnation_counter < max_stagnation:
-        for i in range(len(best_sol)):
-            for j in range(len(best_sol)):
+        for i in range(len(buf)):
+            for j in range(len(buf)):
                 if i == j:
                     continue
-                # Troca as tarefas nas posições i e j
-                new_sol = best_sol[:]
-                new_sol[i], new_sol[j] = new_sol[j], new_sol[i]
-                
-                new_solution = verify_solution(inst, new_sol, verbose=False)
+                # Troca as tarefas nas posições i e j (O(1) pela cabeça/cauda ou in place no buffer)
+                new_makespan, _rep = _evaluate_move(inst, buf, ht, ("swap", i, j), best_makespan)
                 
-                if not new_solution["feasible"]:
+                if new_makespan is None:
                     continue
                 
-                new_makespan = new_solution["C_max"]
-                
                 if new_makespan < best_makespan:
-                    best_sol = new_sol
-                    best_solution = new_solution
+                    buf, best_sol, best_solution, ht = _accept_move(inst, buf, ("swap", i, j), None)
                     improved = True
+                    if on_improve is not None:
+                        on_improve(new_makespan)
                     stagnation_counter = 0
                     print(f"Melhoria encontrada: novo makespan {new_makespan} trocando posições {i} e {j}")
                 
@@ -52,255 +450,83 @@ def buscalocal1(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
     return  best_sol, best_solution, improved
 
 
-def bl_job_exchange(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
-    
-    print("\nIniciando Job Exchange...")
-    
-    best_solution = res
-    best_sol = res["sequence_normalized"]
-    start_sol = best_sol[:]
-    
-    best_makespan = best_solution["C_max"]
-    improved = False
+# ---------------------------
+# Operadores (geradores de movimentos candidatos sobre improvement_loop)
+# ---------------------------
+def bl_job_exchange(inst: Instance, res: List[int], critical: bool = False,
+                    repair: bool = False,
+                    max_stagnation: int = 1000,
+                    on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """Troca de dois jobs sorteados; 'max_stagnation' é o nº total de tentativas."""
+    def propose(st):
+        i = _sample_position(st.crit, len(st) - 1)
+        j = random.randint(0, len(st) - 1)
+        yield ("swap", i, j)
 
-    max_stagnation = 1000  # Define um número máximo de iterações para evitar loops infinitos
-    stagnation_counter = 0
-    iterations = 0
+    return improvement_loop(inst, res, propose, "Job Exchange", critical, repair,
+                            max_stagnation=float("inf"), max_iterations=max_stagnation, on_improve=on_improve)
 
-    while iterations < max_stagnation:
-
-        i = random.randint(0, len(best_sol) - 1)
-        j = random.randint(0, len(best_sol) - 1)
-        
-        new_sol = best_sol[:]
-        new_sol[i], new_sol[j] = new_sol[j], new_sol[i]
-        
-        new_solution = verify_solution(inst, new_sol, verbose=False)
-        if new_solution["feasible"]:
-            new_makespan = new_solution["C_max"]
-            
-            if new_makespan < best_makespan:
-                best_sol = new_sol
-                best_solution = new_solution
-                best_makespan = new_makespan
-                improved = True
-                print(f"Melhoria encontrada: novo makespan {new_makespan} trocando posições {i} e {j}, tentativa {stagnation_counter}")
-                stagnation_counter = 0
-
-            
-            else:
-                stagnation_counter += 1
-        iterations += 1
-                
-    
-    print("Busca Local finalizada. Achou um ótimo local.")
-    print("Número de iterações:", iterations)
-    
-    return  best_sol, best_solution, improved
 
+def insert_job_random(inst: Instance, res: List[int], critical: bool = False,
+                      k_neighbors: Optional[int] = None, repair: bool = False,
+                      max_stagnation: int = 1000,
+                      on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """Move um job sorteado para uma posição sorteada (com k_neighbors: ao lado de um vizinho de setup barato)."""
+    def propose(st):
+        remove_index = _sample_position(st.crit, len(st) - 1)
+        near = neighbor_insert_positions(inst, st.buf, remove_index, 1, k_neighbors) if k_neighbors else None
+        insert_index = random.choice(near) if near else random.randint(0, len(st) - 1)
+        yield ("block", remove_index, 1, insert_index)
 
-def insert_job_random(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
-    
-    print("\nIniciando Perturbação Insert Job Random...")
-    
-    best_solution = res
-    best_sol = res["sequence_normalized"]
-    
-    improved = False
-    max_stagnation = 1000
-    stagnation_counter = 0
-    iterations = 0
+    return improvement_loop(inst, res, propose, "Perturbação Insert Job Random", critical, repair, max_stagnation,
+                            on_improve=on_improve)
 
-    while stagnation_counter < max_stagnation:
-        
-        # Seleciona uma posição aleatória para remover a tarefa
-        remove_index = random.randint(0, len(best_sol) - 1)
-        job = best_sol[remove_index]
-        
-        # Remove a tarefa da sequência
-        new_sol = best_sol[:remove_index] + best_sol[remove_index + 1:]
-        
-        # Seleciona uma nova posição para inserir a tarefa
-        insert_index = random.randint(0, len(new_sol))
-        
-        # Insere a tarefa na nova posição
-        new_sol = new_sol[:insert_index] + [job] + new_sol[insert_index:]
-        
-        new_solution = verify_solution(inst, new_sol, verbose=False)
-        
-        if new_solution["feasible"] and new_solution["C_max"] < best_solution["C_max"]:
-            
-            best_sol = new_sol
-            best_solution = new_solution
-            improved = True
-            print(f"Perturbação realizada: job {job} movido para posição {insert_index}, tentativa {stagnation_counter}")
-            stagnation_counter = 0
-        else:
-            stagnation_counter += 1
-    
-    print("Perturbação Insert Job Random finalizada.")
-    print("Número de tentativas:", iterations)
-    
-    return best_sol, best_solution, improved
-    
 
-def insert_job_best(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
-    
-    print("\nIniciando Perturbação Insert Job Best...")
-    
-    best_solution = res
-    best_sol = res["sequence_normalized"]
-    
-    improved = False
-    max_stagnation = 1000
-    stagnation_counter = 0
+def insert_job_best(inst: Instance, res: List[int], critical: bool = False,
+                    k_neighbors: Optional[int] = None, repair: bool = False,
+                    max_stagnation: int = 1000,
+                    on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """Move um job sorteado para a melhor posição (com k_neighbors: só ao lado dos vizinhos de setup)."""
+    def propose(st):
+        remove_index = _sample_position(st.crit, len(st) - 1)
+        positions = neighbor_insert_positions(inst, st.buf, remove_index, 1, k_neighbors) if k_neighbors else range(len(st))
+        return (("block", remove_index, 1, insert_index) for insert_index in positions)
 
-    iterations = 0
-    
-    best_insertion_sol = None
-    best_insertion_makespan = float('inf')
+    return improvement_loop(inst, res, propose, "Perturbação Insert Job Best", critical, repair, max_stagnation,
+                            on_improve=on_improve)
 
-    while stagnation_counter < max_stagnation:
 
-        iterations += 1
-        
-        # Seleciona uma posição aleatória para remover a tarefa
-        remove_index = random.randint(0, len(best_sol) - 1)
-        job = best_sol[remove_index]
-        
-        # Remove a tarefa da sequência
-        new_sol = best_sol[:remove_index] + best_sol[remove_index + 1:]
-        
-        # Tenta inserir a tarefa em todas as posições possíveis
-        for insert_index in range(len(new_sol) + 1):
-            trial_sol = new_sol[:insert_index] + [job] + new_sol[insert_index:]
-            trial_solution = verify_solution(inst, trial_sol, verbose=False)
-            
-            if trial_solution["feasible"] and trial_solution["C_max"] < best_insertion_makespan:
-                best_insertion_makespan = trial_solution["C_max"]
-                best_insertion_sol = trial_sol
-                best_insertion_solution = trial_solution
-        
-        if best_insertion_sol is not None and best_insertion_makespan < best_solution["C_max"]:
-            best_sol = best_insertion_sol
-            best_solution = best_insertion_solution
-            print(f"Perturbação realizada: job {job} movido para melhor posição, tentativa {stagnation_counter}")
-            stagnation_counter = 0
-            improved = True
-        else:
-            stagnation_counter += 1
-    
-    print("Perturbação Insert Job Best finalizada.")
-    print("Número de tentativas:", iterations)
-    
-    return best_sol, best_solution, improved
-
-
-def insert_block_random(inst: Instance, res: List[int]) -> Tuple[List[int], Dict]:
-        
-    print("\nIniciando Perturbação Block Throw...")
-    
-    best_solution = res
-    best_sol = res["sequence_normalized"]
-    
-    improved = False
-    max_stagnation = 1000
-    stagnation_counter = 0
-
-    iterations = 0
-
-    while stagnation_counter < max_stagnation:
-        iterations += 1
-        
-        # Seleciona o tamanho do bloco (entre 2 e 4 tarefas)
-        block_size = random.randint(2, int(0.4*len(best_sol)))
-        
-        if len(best_sol) < block_size:
-            continue
-        
-        # Seleciona a posição inicial do bloco
-        start_index = random.randint(0, len(best_sol) - block_size)
-        block = best_sol[start_index:start_index + block_size]
-        
-        # Remove o bloco da sequência
-        new_sol = best_sol[:start_index] + best_sol[start_index + block_size:]
-        
-        # Seleciona uma nova posição para inserir o bloco
-        insert_index = random.randint(0, len(new_sol))
-        
-        # Insere o bloco na nova posição
-        new_sol = new_sol[:insert_index] + block + new_sol[insert_index:]
-        
-        new_solution = verify_solution(inst, new_sol, verbose=False)
-        
-        if new_solution["feasible"] and new_solution["C_max"] < best_solution["C_max"]:
-            
-            best_sol = new_sol
-            best_solution = new_solution
-            print(f"Perturbação realizada: bloco de tamanho {block_size} movido para posição {insert_index}, tentativa {stagnation_counter}")
-            stagnation_counter = 0
-            improved = True
-        else:
-            stagnation_counter += 1
-    
-    print("Perturbação Block Throw finalizada.")
-    print("Número de tentativas:", iterations)
-    
-    return best_sol, best_solution, improved
+def insert_block_random(inst: Instance, res: List[int], critical: bool = False,
+                        k_neighbors: Optional[int] = None, repair: bool = False,
+                        max_stagnation: int = 1000, max_block_frac: float = 0.4,
+                        on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """Move um bloco de tamanho sorteado (2 até max_block_frac * n) para uma posição sorteada."""
+    def propose(st):
+        block_size = random.randint(2, int(max_block_frac * len(st)))
+        if len(st) < block_size:
+            return
+        start_index = _sample_position(st.crit, len(st) - block_size)
+        near = neighbor_insert_positions(inst, st.buf, start_index, block_size, k_neighbors) if k_neighbors else None
+        insert_index = random.choice(near) if near else random.randint(0, len(st) - block_size)
+        yield ("block", start_index, block_size, insert_index)
 
+    return improvement_loop(inst, res, propose, "Perturbação Block Throw", critical, repair, max_stagnation,
+                            on_improve=on_improve)
 
-def insert_block_best(inst: Instance, res: List[int], min_block_size: int = 2, max_block_size: int = 3) -> Tuple[List[int], Dict]:
-    
-    print("\nIniciando Perturbação Insert Block Best...")
-    
-    best_solution = res
-    best_sol = res["sequence_normalized"]
-    
-    improved = False
-    max_stagnation = 1000
-    stagnation_counter = 0
-    
-    best_insertion_sol = None
-    best_insertion_makespan = float('inf')
-
-    interation = 0
 
-    while stagnation_counter < max_stagnation:
-        interation += 1
-        
-        # Seleciona o tamanho do bloco
+def insert_block_best(inst: Instance, res: List[int], min_block_size: int = 2, max_block_size: int = 3,
+                      critical: bool = False, k_neighbors: Optional[int] = None, repair: bool = False,
+                      max_stagnation: int = 1000,
+                      on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], Dict]:
+    """Move um bloco sorteado (min_block_size..max_block_size jobs) para a melhor posição."""
+    def propose(st):
         block_size = random.randint(min_block_size, max_block_size)
-        
-        if len(best_sol) < block_size:
-            continue
-        
-        # Seleciona a posição inicial do bloco
-        start_index = random.randint(0, len(best_sol) - block_size)
-        block = best_sol[start_index:start_index + block_size]
-        
-        # Remove o bloco da sequência
-        new_sol = best_sol[:start_index] + best_sol[start_index + block_size:]
-        
-        # Tenta inserir o bloco em todas as posições possíveis
-        for insert_index in range(len(new_sol) + 1):
-            trial_sol = new_sol[:insert_index] + block + new_sol[insert_index:]
-            trial_solution = verify_solution(inst, trial_sol, verbose=False)
-            
-            if trial_solution["feasible"] and trial_solution["C_max"] < best_insertion_makespan:
-                best_insertion_makespan = trial_solution["C_max"]
-                best_insertion_sol = trial_sol
-                best_insertion_solution = trial_solution
-        
-        if best_insertion_sol is not None and best_insertion_makespan < best_solution["C_max"]:
-            best_sol = best_insertion_sol
-            best_solution = best_insertion_solution
-            print(f"Perturbação realizada: bloco de tamanho {block_size} movido para melhor posição, tentativa {stagnation_counter}")
-            stagnation_counter = 0
-            improved = True
-        else:
-            stagnation_counter += 1
-            
-    print("Perturbação Insert Block Best finalizada.")
-    print("Número de tentativas:", interation)
-    
-    return best_sol, best_solution, improved
\ No newline at end of file
+        if len(st) < block_size:
+            return ()
+        start_index = _sample_position(st.crit, len(st) - block_size)
+        positions = (neighbor_insert_positions(inst, st.buf, start_index, block_size, k_neighbors) if k_neighbors
+                     else range(len(st) - block_size + 1))
+        return (("block", start_index, block_size, insert_index) for insert_index in positions)
+
+    return improvement_loop(inst, res, propose, "Perturbação Insert Block Best", critical, repair, max_stagnation,
+                            on_improve=on_improve)
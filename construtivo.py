@@ -1,13 +1,16 @@
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional
-import networkx as nx
 import random
 
 import Modelagem as md
 from Modelagem import Instance
 
-import view as vw
+try:
+    import numpy as np  # opcional: expansão vetorizada do beam search
+except ImportError:
+    np = None
+
+# view (matplotlib) só é importado quando um gráfico é pedido (plot_title), para que o
+# núcleo do solver possa ser importado sem bibliotecas de plotagem
 
 # ******************************** MÉTODOS DE ATUALIZAÇÃO E ORDENAÇÃO ********************************
 
@@ -109,52 +112,20 @@ def update_earliest_finish_times(inst: Instance, sol_partial: List[int], eft_tup
     # print(f"\nEFT final atualizado (tuplas ordenadas): {eft_updated}")
     return eft_updated
 
-# ??
 def update_latest_finish_times(inst: Instance, sol_partial: List[int], lft_tuples: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
     """
     Atualiza a tabela de latest finish times representada como lista de tuplas
-    (job_idx, lft_value). Retorna a lista ordenada por lft_value (asc).
+    (job_idx, lft_value): para cada job de sol_partial, o maior término que não aumenta
+    o C_max da sequência parcial, LFT = C_max - cauda (passada reversa de
+    md.HeadTailSchedule sobre setups e atrasos). Jobs fora da sequência mantêm o valor
+    de lft_tuples. A sequência parcial deve ser factível.
     """
-    print("\n=== Atualizando latest finish times (tuplas) ===")
-    print(f"Solução parcial: {sol_partial}")
-    print(f"LFT (tuplas) atual: {lft_tuples}")
-
-    n = inst.n
     lft_map = {job: val for job, val in lft_tuples}
-    last_job = sol_partial[-1]
-    print(f"Último job colocado: {last_job}, LFT[{last_job}] = {lft_map.get(last_job)}")
-
-    for j in range(n):
-        if j in sol_partial:
-            print(f"\nJob {j}: já está na solução, pulando...")
-            continue
-
-        print(f"\nProcessando job {j}:")
-        old = lft_map.get(j, 0.0)
+    lft = md.HeadTailSchedule(inst, sol_partial).latest_finish()
+    for j in sol_partial:
+        lft_map[j] = lft[j]
 
-        # consideração de setup (termino possível antes do last_job)
-        setup_finish = lft_map[last_job] + inst.p[j] + inst.s[last_job][j]
-        print(f"  Setup antes de job {last_job}: LFT[{last_job}]({lft_map[last_job]}) + p[{j}]({inst.p[j]}) + s[{last_job}][{j}]({inst.s[last_job][j]}) = {setup_finish}")
-        lft_map[j] = max(lft_map.get(j, 0.0), setup_finish)
-        print(f"  LFT após setup (temporário) = {lft_map[j]}")
-
-        # atrasos de precedência (restrições que impõem um limite superior)
-        for i in sol_partial:
-            if inst.d[i][j] != -1:
-                prec_finish = lft_map[i] + inst.p[j] + inst.d[i][j]
-                print(f"  Precedência {i}->{j}: LFT[{i}]({lft_map[i]}) + p[{j}]({inst.p[j]}) + d[{i}][{j}]({inst.d[i][j]}) = {prec_finish}")
-                lft_map[j] = max(lft_map[j], prec_finish)
-                print(f"  LFT após precedência = {lft_map[j]}")
-
-        if lft_map[j] != old:
-            print(f"  LFT final de {j} atualizado: {old} -> {lft_map[j]}")
-        else:
-            print(f"  LFT final de {j} mantido: {lft_map[j]}")
-
-    # constroi lista ordenada por valor (ascendente)
-    # lft_updated = sorted([(job, lft_map[job]) for job in range(n)], key=lambda x: x[1])
-    lft_updated = [(job, lft_map[job]) for job in range(n)]
-    print(f"\nLFT final atualizado (tuplas ordenadas): {lft_updated}")
+    lft_updated = [(job, lft_map.get(job, 0.0)) for job in range(inst.n)]
     return lft_updated
 
 
@@ -174,6 +145,21 @@ def get_candidates_ordered(inst: Instance, sol_partial: List[int], list_tuples:
     print(f"Candidatos ordenados: {candidates}")
     return candidates
 
+def make_knn_candidates(k: int, base: callable = get_candidates_ordered) -> callable:
+    """
+    Versão de get_candidates_ordered restrita às listas de candidatos por setup:
+    primeiro vêm (na ordem do score) os jobs entre os k sucessores de setup mais barato
+    do último job colocado (inst.setup_neighbors); o restante só serve de reserva caso
+    nenhum deles mantenha a viabilidade.
+    """
+    def get_candidates_knn(inst: Instance, sol_partial: List[int], list_tuples: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        candidates = base(inst, sol_partial, list_tuples)
+        if not sol_partial:
+            return candidates
+        near = set(inst.setup_neighbors(k)[0][sol_partial[-1]])
+        return [c for c in candidates if c[0] in near] + [c for c in candidates if c[0] not in near]
+    return get_candidates_knn
+
 # ******************************** MÉTODOS CONSTRUTIVOS GERAIS ********************************
 
 def greedy_constructive_build(
@@ -214,8 +200,8 @@ def greedy_constructive_build(
     -------
     sol : list[int]
         Sequência construída (idealmente completa).
-    res : dict
-        Resultado de md.verify_solution(inst, sol).
+    res : md.Resultado
+        Resultado de md.verify_solution(inst, sol) (acesso também no estilo dict).
     """
     # inicia prefixo
     sol = initial_seq if initial_seq else []
@@ -224,11 +210,7 @@ def greedy_constructive_build(
     if sol:
         res0 = md.verify_solution(inst, sol, verbose=True)
         if not res0.get("feasible", False):
-            return sol, {
-                "feasible": False,
-                "violations": ["Prefixo inicial inviável."],
-                "C_max": None, "b": None, "c": None, "sequence_normalized": sol
-            }
+            return sol, md.Resultado(inst, sol, False, None, ["Prefixo inicial inviável."])
 
     # copia scores (para não mutar o argumento)
     scores = initial_scores.copy()
@@ -264,6 +246,7 @@ def greedy_constructive_build(
     # plot opcional
     if plot_title is not None:
         try:
+            import view as vw
             vw.plot_gantt(inst, res, title=plot_title)
         except Exception as e:
             print(f"[constructive_build] Falha ao plotar Gantt: {e}")
@@ -279,7 +262,8 @@ def randomized_greedy_constructive_build(
     plot_title: str | None = None,
     alpha: float = 0.0,
     rcl_size: Optional[int] = None,
-    seed: Optional[int] = None
+    seed: Optional[int] = None,
+    rng: Optional[random.Random] = None
 ):
     """
     Versão gulosa randomizada do construtivo.
@@ -289,11 +273,13 @@ def randomized_greedy_constructive_build(
     Parâmetros adicionais:
       - alpha: em [0,1], controla largura da RCL (0 = puro guloso).
       - rcl_size: se int, tamanho fixo do RCL (tem preferência sobre alpha).
-      - seed: semente para reprodutibilidade.
+      - rng: gerador usado nos sorteios (padrão: o módulo random global);
+      - seed: sem 'rng', cria um gerador próprio com essa semente. O random global nunca é
+        ressemeado, para não mexer na sequência de sorteios de quem chama.
     Retorna (sol, res) como greedy_constructive_build.
     """
-    if seed is not None:
-        random.seed(seed)
+    if rng is None:
+        rng = random.Random(seed) if seed is not None else random
 
     sol = initial_seq.copy() if initial_seq else []
 
@@ -301,11 +287,7 @@ def randomized_greedy_constructive_build(
     if sol:
         res0 = md.verify_solution(inst, sol, verbose=True)
         if not res0.get("feasible", False):
-            return sol, {
-                "feasible": False,
-                "violations": ["Prefixo inicial inviável."],
-                "C_max": None, "b": None, "c": None, "sequence_normalized": sol
-            }
+            return sol, md.Resultado(inst, sol, False, None, ["Prefixo inicial inviável."])
 
     scores = initial_scores.copy()
 
@@ -333,7 +315,7 @@ def randomized_greedy_constructive_build(
 
         # tenta escolher aleatoriamente um candidato da RCL que mantenha a viabilidade
         rcl_shuffled = rcl.copy()
-        random.shuffle(rcl_shuffled)
+        rng.shuffle(rcl_shuffled)
         chosen = None
         for j, _v in rcl_shuffled:
             trial = sol + [j]
@@ -365,8 +347,405 @@ def randomized_greedy_constructive_build(
     # plot opcional
     if plot_title is not None:
         try:
+            import view as vw
+            vw.plot_gantt(inst, res, title=plot_title)
+        except Exception as e:
+            print(f"[constructive_build] Falha ao plotar Gantt: {e}")
+    return sol, res
+
+
+
+# ******************************** BEAM SEARCH ********************************
+#
+# Cada nó do feixe guarda o estado da agenda parcial, para estender sem passar pelo
+# verify_solution: (seq, c, t, lb_rest, missing, ready, mask)
+#   - seq: prefixo; c: término de cada job agendado (-inf nos demais); t: término do último;
+#   - lb_rest: limite inferior do que falta (soma de p[j] + menor setup de entrada de j);
+#   - missing[j]: predecessores de j ainda não agendados; ready: jobs com missing == 0;
+#   - mask: bitmask dos jobs agendados (para eliminar nós repetidos).
+#
+# Com numpy instalado, a expansão de um passo é vetorizada: todos os pares (nó, job pronto) são
+# avaliados de uma vez com os arrays de _beam_arrays; sem numpy, o mesmo cálculo é um laço em
+# Python. As duas versões fazem as mesmas operações de ponto flutuante e desempatam igual.
+
+_BEAM_INST = None    # instância (somente leitura) de cada processo de trabalho
+_BEAM_ARRAYS = None  # arrays da instância para a expansão vetorizada (_beam_arrays)
+
+
+def _init_beam_worker(inst: Instance) -> None:
+    global _BEAM_INST, _BEAM_ARRAYS
+    _BEAM_INST = inst
+    _BEAM_ARRAYS = _beam_arrays(inst)
+
+
+def _beam_arrays(inst: Instance) -> Optional[tuple]:
+    """
+    (p, S, PI, PD) em numpy, ou None sem numpy: S tem uma linha extra de zeros (índice n) para o
+    nó vazio; PI/PD são os predecessores/atrasos de cada job numa matriz retangular, completada
+    com o índice n (coluna de -inf na matriz de términos) e atraso 0.
+    """
+    if np is None:
+        return None
+    n = inst.n
+    preds = inst.predecessors()
+    width = max((len(preds[j]) for j in range(n)), default=0)
+    PI = np.full((n, width), n, dtype=np.intp)
+    PD = np.zeros((n, width))
+    for j in range(n):
+        for k, (i, d) in enumerate(preds[j]):
+            PI[j, k] = i
+            PD[j, k] = d
+    S = np.zeros((n + 1, n))
+    S[:n] = inst.s
+    return np.asarray(inst.p, dtype=float), S, PI, PD
+
+
+def _beam_lower_bounds(inst: Instance) -> List[float]:
+    """lb[j] = p[j] + menor setup de entrada em j: custo mínimo que j ainda acrescenta ao C_max."""
+    n = inst.n
+    if n == 1:
+        return [inst.p[0]]
+    return [inst.p[j] + min(inst.s[i][j] for i in range(n) if i != j) for j in range(n)]
+
+
+def _expand_beam(nodes: list, offset: int, width: int, lb: List[float], inst: Optional[Instance] = None,
+                 arrays: Optional[tuple] = None) -> list:
+    """
+    Avalia em lote o custo de anexar cada job pronto a cada nó e devolve os 'width'
+    melhores candidatos (score, fim, índice do nó, job). score = fim + limite inferior do resto.
+    Com 'arrays' (_beam_arrays; nos processos, o do inicializador) a avaliação é vetorizada.
+    """
+    import heapq
+
+    if inst is None:
+        inst, arrays = _BEAM_INST, _BEAM_ARRAYS
+    if arrays is not None:
+        return _expand_beam_vectorized(nodes, offset, width, lb, arrays)
+
+    preds = inst.predecessors()
+    s = inst.s
+    p = inst.p
+    candidates = []
+    for idx, (seq, c, t, lb_rest, _missing, ready, _mask) in enumerate(nodes):
+        s_last = s[seq[-1]] if seq else None
+        for j in ready:
+            start = t + s_last[j] if s_last is not None else 0.0
+            for i, d in preds[j]:
+                if c[i] + d > start:
+                    start = c[i] + d
+            fin = start + p[j]
+            candidates.append((fin + lb_rest - lb[j], fin, offset + idx, j))
+    return heapq.nsmallest(width, candidates)
+
+
+def _expand_beam_vectorized(nodes: list, offset: int, width: int, lb: List[float], arrays: tuple) -> list:
+    """_expand_beam em numpy: uma linha por par (nó, job pronto), ordenação lexicográfica igual à das tuplas."""
+    p, S, PI, PD = arrays
+    n = p.shape[0]
+    counts = [len(node[5]) for node in nodes]
+    total = sum(counts)
+    if total == 0:
+        return []
+    node_idx = np.repeat(np.arange(len(nodes)), counts)
+    jobs = np.fromiter((j for node in nodes for j in node[5]), dtype=np.intp, count=total)
+    last = np.array([node[0][-1] if node[0] else n for node in nodes], dtype=np.intp)
+    t = np.array([node[2] for node in nodes], dtype=float)
+    lb_rest = np.array([node[3] for node in nodes], dtype=float)
+
+    start = t[node_idx] + S[last[node_idx], jobs]
+    if PI.shape[1]:
+        C = np.full((len(nodes), n + 1), -np.inf)
+        C[:, :n] = [node[1] for node in nodes]
+        release = (C[node_idx[:, None], PI[jobs]] + PD[jobs]).max(axis=1)
+        start = np.maximum(start, release)
+    fin = start + p[jobs]
+    score = fin + lb_rest[node_idx] - np.asarray(lb, dtype=float)[jobs]
+
+    order = np.lexsort((jobs, node_idx, fin, score))[:width]
+    return list(zip(score[order].tolist(), fin[order].tolist(), (node_idx[order] + offset).tolist(),
+                    jobs[order].tolist()))
+
+
+def beam_search_constructive(
+        inst: Instance,
+        width: int = 10,
+        workers: int = 1,
+        plot_title: str | None = None
+):
+    """
+    Construtivo por busca em feixe (beam search).
+
+    Mantém as 'width' melhores sequências parciais por C_max parcial + limite inferior
+    do que falta, e a cada passo estende todas elas com todos os jobs prontos
+    (predecessores já agendados). A extensão é avaliada em lote a partir do estado
+    guardado em cada nó (sem refazer a agenda), vetorizada com numpy quando disponível, e
+    com workers > 1 os nós do feixe são divididos entre processos. Só jobs prontos são anexados, então toda sequência
+    construída respeita as precedências; o custo é O(n * width * n) avaliações.
+    Retorna (sol, res) como greedy_constructive_build.
+    """
+    import heapq
+
+    n = inst.n
+    lb = _beam_lower_bounds(inst)
+    preds = inst.predecessors()
+    succs = inst.successors()
+
+    missing0 = [len(preds[j]) for j in range(n)]
+    ready0 = tuple(j for j in range(n) if missing0[j] == 0)
+    beam = [([], [float("-inf")] * n, 0.0, sum(lb), missing0, ready0, 0)]
+    arrays = _beam_arrays(inst)
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_beam_worker, initargs=(inst,))
+
+    try:
+        for _step in range(n):
+            # pede candidatos a mais (2*width) para compensar os nós repetidos eliminados abaixo
+            if pool is not None and len(beam) >= 2 * workers:
+                size = -(-len(beam) // workers)
+                futures = [pool.submit(_expand_beam, beam[k:k + size], k, 2 * width, lb)
+                           for k in range(0, len(beam), size)]
+                best = heapq.nsmallest(2 * width, (cand for fut in futures for cand in fut.result()))
+            else:
+                best = _expand_beam(beam, 0, 2 * width, lb, inst, arrays)
+
+            new_beam = []
+            seen = set()
+            for _score, fin, idx, j in best:
+                seq, c, t, lb_rest, missing, ready, mask = beam[idx]
+                key = (mask | (1 << j), j)
+                if key in seen:
+                    continue  # mesmo conjunto de jobs terminando no mesmo job: fica o de menor score
+                seen.add(key)
+
+                c2 = c[:]
+                c2[j] = fin
+                missing2 = missing[:]
+                ready2 = [q for q in ready if q != j]
+                for q, _d in succs[j]:
+                    missing2[q] -= 1
+                    if missing2[q] == 0:
+                        ready2.append(q)
+                new_beam.append((seq + [j], c2, fin, lb_rest - lb[j], missing2, tuple(ready2), key[0]))
+                if len(new_beam) == width:
+                    break
+
+            if not new_beam:
+                print("[beam_search] Nenhum job pronto para estender o feixe. Interrompendo.")
+                break
+            beam = new_beam
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # no último passo o limite inferior do resto é 0, então o primeiro nó tem o menor C_max
+    sol = beam[0][0]
+    res = md.verify_solution(inst, sol, verbose=False)
+    print(f"[beam_search] width={width}: C_max = {res['C_max']}")
+
+    # plot opcional
+    if plot_title is not None:
+        try:
+            import view as vw
             vw.plot_gantt(inst, res, title=plot_title)
         except Exception as e:
             print(f"[constructive_build] Falha ao plotar Gantt: {e}")
     return sol, res
 
+
+# ******************************** PILOT METHOD (LOOKAHEAD) ********************************
+
+class PartialSchedule:
+    """
+    Estado de uma agenda parcial, para estender job a job sem refazer a agenda
+    pelo verify_solution:
+      - seq: prefixo; t: término do último job; c: término de cada job agendado;
+      - missing[j]: predecessores de j ainda não agendados; ready: jobs prontos;
+      - mask: bitmask dos jobs agendados;
+      - open_succ[i]: sucessores de i ainda não agendados; pending: (i, c[i]) dos jobs
+        agendados com open_succ[i] > 0, na ordem de seq (mantidos para a chave de memo).
+    Os objetos não são alterados depois de criados, então podem ser compartilhados
+    entre vários rollouts.
+    """
+    __slots__ = ("seq", "c", "t", "missing", "ready", "mask", "open_succ", "pending")
+
+    def __init__(self, seq, c, t, missing, ready, mask, open_succ, pending):
+        self.seq = seq
+        self.c = c
+        self.t = t
+        self.missing = missing
+        self.ready = ready
+        self.mask = mask
+        self.open_succ = open_succ
+        self.pending = pending
+
+    @classmethod
+    def empty(cls, inst: Instance) -> "PartialSchedule":
+        preds = inst.predecessors()
+        succs = inst.successors()
+        missing = [len(preds[j]) for j in range(inst.n)]
+        return cls([], [None] * inst.n, 0.0, missing, tuple(j for j in range(inst.n) if missing[j] == 0), 0,
+                   [len(succs[j]) for j in range(inst.n)], ())
+
+    def complete(self, inst: Instance) -> bool:
+        return len(self.seq) == inst.n
+
+    def finish_if_appended(self, inst: Instance, j: int) -> float:
+        """Término de j se ele for anexado agora (Eq. 7 e 8)."""
+        start = self.t + inst.s[self.seq[-1]][j] if self.seq else 0.0
+        c = self.c
+        for i, d in inst.predecessors()[j]:
+            if c[i] + d > start:
+                start = c[i] + d
+        return start + inst.p[j]
+
+    def extended(self, inst: Instance, j: int) -> "PartialSchedule":
+        fin = self.finish_if_appended(inst, j)
+        c = self.c[:]
+        c[j] = fin
+        missing = self.missing[:]
+        ready = [q for q in self.ready if q != j]
+        for q, _d in inst.successors()[j]:
+            missing[q] -= 1
+            if missing[q] == 0:
+                ready.append(q)
+        preds = inst.predecessors()[j]
+        open_succ = self.open_succ
+        pending = self.pending
+        if preds:
+            open_succ = open_succ[:]
+            for i, _d in preds:
+                open_succ[i] -= 1
+            pending = tuple(e for e in pending if open_succ[e[0]] > 0)
+        if open_succ[j] > 0:
+            pending += ((j, fin),)
+        return PartialSchedule(self.seq + [j], c, fin, missing, tuple(ready), self.mask | (1 << j),
+                               open_succ, pending)
+
+    def key(self, inst: Instance) -> tuple:
+        """
+        Chave de memoização: o futuro da agenda só depende do conjunto agendado, do último
+        job, de t e dos términos dos jobs que ainda têm arcos de atraso para jobs pendentes
+        (pending, mantido por extended em vez de recalculado a cada chamada).
+        """
+        return (self.mask, self.seq[-1] if self.seq else -1, self.t, self.pending)
+
+
+def greedy_rollout(inst: Instance, state: PartialSchedule, memo: Optional[Dict] = None) -> Tuple[float, List[int]]:
+    """
+    Completa a agenda de forma gulosa (sempre o job pronto com menor término) e devolve
+    (C_max, jobs acrescentados). 'memo' guarda o resultado de cada estado visitado, então
+    rollouts que passam por estados já vistos (o que acontece entre passos do pilot)
+    param ali e reaproveitam o restante.
+    """
+    if memo is None:
+        memo = {}
+    visited = []
+    chosen = []
+    cur = state
+    while not cur.complete(inst):
+        k = cur.key(inst)
+        hit = memo.get(k)
+        if hit is not None:
+            final, path, r = hit
+            tail = path[r:]
+            break
+        j = min(cur.ready, key=lambda q: (cur.finish_if_appended(inst, q), q))
+        visited.append(k)
+        chosen.append(j)
+        cur = cur.extended(inst, j)
+    else:
+        final, tail = cur.t, []
+
+    # cada estado visitado guarda (C_max, caminho do rollout, posição dele no caminho): o
+    # sufixo só é copiado se o estado for reencontrado, em vez de uma cópia por estado
+    path = chosen + tail
+    for r, k in enumerate(visited):
+        memo[k] = (final, path, r)
+    return final, path
+
+
+_PILOT_INST = None
+_PILOT_MEMO: Dict = {}
+
+
+def _init_pilot_worker(inst: Instance) -> None:
+    global _PILOT_INST, _PILOT_MEMO
+    _PILOT_INST = inst
+    _PILOT_MEMO = {}
+
+
+def _pilot_rollout_worker(state: PartialSchedule) -> Tuple[float, List[int]]:
+    """Rollout em um processo de trabalho (cada processo mantém sua própria memória)."""
+    return greedy_rollout(_PILOT_INST, state, _PILOT_MEMO)
+
+
+def pilot_constructive(
+        inst: Instance,
+        max_candidates: Optional[int] = None,
+        workers: int = 1,
+        plot_title: str | None = None
+):
+    """
+    Construtivo pelo método piloto (lookahead).
+
+    A cada passo, cada job pronto é avaliado completando a sequência com o guloso
+    barato (greedy_rollout); o candidato com menor C_max completado é fixado.
+    As agendas parciais (PartialSchedule) são compartilhadas entre os rollouts e os
+    resultados ficam memoizados, em vez de recalcular tudo pelo verify_solution.
+    - max_candidates: avalia só os k prontos de menor término imediato (None = todos).
+    - workers: com > 1, os rollouts de cada passo rodam em um pool de processos.
+    Retorna (sol, res) como greedy_constructive_build, com a melhor solução completa
+    vista (a sequência fixada ou algum rollout melhor).
+    """
+    memo: Dict = {}
+    state = PartialSchedule.empty(inst)
+    best_final, best_seq = None, None
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pilot_worker, initargs=(inst,))
+
+    try:
+        while not state.complete(inst):
+            candidates = sorted(state.ready, key=lambda q: (state.finish_if_appended(inst, q), q))
+            if not candidates:
+                print("[pilot] Nenhum job pronto. Interrompendo.")
+                break
+            if max_candidates is not None:
+                candidates = candidates[:max_candidates]
+
+            children = [state.extended(inst, j) for j in candidates]
+            if pool is not None and len(children) > 1:
+                outcomes = list(pool.map(_pilot_rollout_worker, children))
+            else:
+                outcomes = [greedy_rollout(inst, child, memo) for child in children]
+
+            step_best = None
+            for child, (final, tail) in zip(children, outcomes):
+                if step_best is None or final < step_best[0]:
+                    step_best = (final, child)
+                if best_final is None or final < best_final:
+                    best_final, best_seq = final, child.seq + tail
+            state = step_best[1]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    sol = state.seq
+    if best_seq is not None and len(best_seq) == inst.n and best_final < state.t:
+        sol = best_seq
+    res = md.verify_solution(inst, sol, verbose=False)
+    print(f"[pilot] C_max = {res['C_max']}")
+
+    # plot opcional
+    if plot_title is not None:
+        try:
+            import view as vw
+            vw.plot_gantt(inst, res, title=plot_title)
+        except Exception as e:
+            print(f"[constructive_build] Falha ao plotar Gantt: {e}")
+    return sol, res
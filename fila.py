@@ -0,0 +1,337 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from typing import List, Dict, Optional
+
+import avaliacao as av
+import resultados as rs
+import main
+
+# ******************************** VARREDURA DISTRIBUÍDA (FILA EM DIRETÓRIO COMPARTILHADO) ********************************
+#
+# Divide uma varredura de main.py em tarefas (instância, semente) que vários nós pegam de
+# um diretório compartilhado (NFS, etc.), sem servidor nem banco: só o sistema de arquivos.
+#
+#   DIR/fila.json              configuração (main.build_config) + lista de tarefas
+#   DIR/claims/<id>.lock       posse da tarefa: criado com O_CREAT|O_EXCL (só um nó consegue);
+#                              o dono renova o mtime periodicamente (heartbeat)
+#   DIR/resultados/<id>.json   resultado da tarefa, gravado atomicamente (temp + os.replace);
+#                              se a tarefa falha (exceção), registro com C_max null e "error"
+#
+# Uma posse cujo mtime passou de 'lease' segundos é considerada abandonada (nó caiu) e pode
+# ser tomada por outro nó. Tarefas com resultado nunca são refeitas. O merge agrega as
+# sementes de cada instância (melhor, média, tempo médio) no JSONL de resultados, com a
+# mesma chave de configuração de main.py, e monta a planilha.
+# O lease deve ser bem maior que o intervalo do heartbeat e que a diferença de relógio entre nós.
+
+QUEUE_FILE = "fila.json"
+
+
+def task_id(k: int) -> str:
+    return f"{k:06d}"
+
+
+def _write_atomic(path: str, data: Dict) -> None:
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_queue(work_dir: str) -> Dict:
+    with open(os.path.join(work_dir, QUEUE_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def init_queue(work_dir: str, config: Dict, files: List[str]) -> Dict:
+    """Cria a fila: uma tarefa por (instância, semente) de 'config'."""
+    if os.path.exists(os.path.join(work_dir, QUEUE_FILE)):
+        raise FileExistsError(f"Já existe uma fila em {work_dir}.")
+    for sub in ("claims", "resultados"):
+        os.makedirs(os.path.join(work_dir, sub), exist_ok=True)
+    queue = {
+        "config": config,
+        "config_key": rs.config_key(config),
+        "tasks": [[f, seed] for f in files for seed in config["seeds"]],
+    }
+    _write_atomic(os.path.join(work_dir, QUEUE_FILE), queue)
+    return queue
+
+
+class Claim:
+    """Posse de uma tarefa (arquivo de lock) com heartbeat em segundo plano."""
+
+    def __init__(self, work_dir: str, tid: str, owner: str, lease: float):
+        self.path = os.path.join(work_dir, "claims", tid + ".lock")
+        self.owner = owner
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _create(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.owner)
+        return True
+
+    def acquire(self) -> bool:
+        """Tenta pegar a tarefa; toma posses abandonadas (mtime mais velho que o lease)."""
+        if self._create():
+            return True
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return self._create()
+        if age < self.lease:
+            return False
+        # posse abandonada: renomear é atômico, só um nó consegue tirá-la do lugar
+        stale = f"{self.path}.{self.owner}.stale"
+        try:
+            os.rename(self.path, stale)
+        except FileNotFoundError:
+            return False
+        try:
+            if time.time() - os.stat(stale).st_mtime < self.lease:
+                # outro nó renovou/recriou a posse entre o stat e o rename: devolve
+                with contextlib.suppress(FileExistsError):
+                    os.link(stale, self.path)
+                return False
+        finally:
+            os.unlink(stale)
+        print(f"[fila] Posse abandonada retomada: {os.path.basename(self.path)} ({age:.0f}s)")
+        return self._create()
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease / 4):
+            with contextlib.suppress(OSError):
+                os.utime(self.path)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # sem resultado (erro/interrupção), a posse é liberada para outro nó tentar de novo
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+
+def run_task(work_dir: str, config: Dict, tid: str, file_name: str, seed: int, owner: str) -> Dict:
+    """Roda uma (instância, semente) como em main.run_instance e grava o resultado."""
+    random.seed(seed)
+    start = time.time()
+    cache = rs.SolutionCache(config["solution_cache"]) if config.get("solution_cache") else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = main.run_simulations_for_instance(file_name, solution_cache=cache, **main.pipeline_params(config))
+    rec = {
+        "task": tid,
+        "instancia": file_name,
+        "seed": seed,
+        "C_max": res["C_max"] if res is not None else None,
+        "sequence": list(res["sequence_normalized"]) if res is not None else None,
+        "time": time.time() - start,
+        "node": owner,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    _write_atomic(os.path.join(work_dir, "resultados", tid + ".json"), rec)
+    return rec
+
+
+def record_failure(work_dir: str, tid: str, file_name: str, seed: int, owner: str, start: float,
+                   exc: Exception) -> Dict:
+    """Grava o resultado de uma tarefa que levantou 'exc' (chamada dentro do except)."""
+    rec = {
+        "task": tid,
+        "instancia": file_name,
+        "seed": seed,
+        "C_max": None,
+        "sequence": None,
+        "error": f"{type(exc).__name__}: {exc}",
+        "traceback": traceback.format_exc(),
+        "time": time.time() - start,
+        "node": owner,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    _write_atomic(os.path.join(work_dir, "resultados", tid + ".json"), rec)
+    return rec
+
+
+def work(work_dir: str, node: str, lease: float = 600.0, backend: Optional[str] = None) -> int:
+    """
+    Laço de um processo de trabalho: pega tarefas livres (ordem aleatória, para os nós não
+    disputarem as mesmas) até não sobrar nenhuma sem resultado. Retorna nº de tarefas feitas.
+    """
+    av.init_worker(backend)
+    queue = load_queue(work_dir)
+    config = queue["config"]
+    owner = f"{node}.{os.getpid()}"
+    rng = random.Random(owner)
+    done = 0
+
+    while True:
+        pending = [k for k in range(len(queue["tasks"]))
+                   if not os.path.exists(os.path.join(work_dir, "resultados", task_id(k) + ".json"))]
+        if not pending:
+            return done
+        rng.shuffle(pending)
+        claimed = False
+        for k in pending:
+            tid = task_id(k)
+            claim = Claim(work_dir, tid, owner, lease)
+            if not claim.acquire():
+                continue
+            claimed = True
+            with claim:
+                # outro nó pode ter terminado entre a listagem e a posse
+                if os.path.exists(os.path.join(work_dir, "resultados", tid + ".json")):
+                    continue
+                file_name, seed = queue["tasks"][k]
+                start = time.time()
+                try:
+                    rec = run_task(work_dir, config, tid, file_name, seed, owner)
+                except Exception as exc:
+                    # uma tarefa com erro (instância corrompida, falha no pipeline) não derruba o
+                    # processo: fica registrada como falha e não é tentada de novo
+                    rec = record_failure(work_dir, tid, file_name, seed, owner, start, exc)
+                    print(f"[{owner}] {tid} {file_name} seed={seed}: FALHOU — {rec['error']}", flush=True)
+                else:
+                    done += 1
+                    print(f"[{owner}] {tid} {file_name} seed={seed}: C_max={rec['C_max']} ({rec['time']:.1f}s)", flush=True)
+            break  # relista: as posses dos outros nós mudaram nesse meio tempo
+        if not claimed:
+            # tudo o que falta está com outros nós: espera terminarem ou a posse expirar
+            time.sleep(min(5.0, lease / 4))
+
+
+def status(work_dir: str) -> Dict:
+    queue = load_queue(work_dir)
+    total = len(queue["tasks"])
+    results_dir = os.path.join(work_dir, "resultados")
+    finished = [f for f in os.listdir(results_dir) if f.endswith(".json")]
+    failed = 0
+    for name in finished:
+        with contextlib.suppress(OSError, json.JSONDecodeError), open(os.path.join(results_dir, name), encoding="utf-8") as f:
+            failed += "error" in json.load(f)
+    claimed = len([f for f in os.listdir(os.path.join(work_dir, "claims")) if f.endswith(".lock")])
+    return {"total": total, "concluidas": len(finished), "falhas": failed, "em_andamento": claimed,
+            "livres": total - len(finished) - claimed}
+
+
+def merge(work_dir: str, store_path: str, excel: Optional[str] = None, export_path: Optional[str] = None,
+          partial: bool = False) -> int:
+    """
+    Agrega os resultados por instância (métricas de main.run_instance) e anexa ao JSONL
+    de resultados com a chave de configuração da fila; depois exporta a planilha.
+    Sem 'partial', instâncias com sementes faltando ficam de fora. Retorna nº de instâncias.
+    """
+    queue = load_queue(work_dir)
+    per_instance: Dict[str, List[Dict]] = {}
+    for k, (file_name, _seed) in enumerate(queue["tasks"]):
+        path = os.path.join(work_dir, "resultados", task_id(k) + ".json")
+        per_instance.setdefault(file_name, [])
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                per_instance[file_name].append(json.load(f))
+
+    n_seeds = len(queue["config"]["seeds"])
+    best_lit = main.load_best_lit(excel) if excel else {}
+    store = rs.ResultStore(store_path, config=queue["config"])
+    merged = 0
+    for file_name, recs in sorted(per_instance.items()):
+        recs = [r for r in recs if r["C_max"] is not None]
+        if not recs or (len(recs) < n_seeds and not partial):
+            continue
+        values = [r["C_max"] for r in recs]
+        metrics = {
+            "best": min(values),
+            "mean": sum(values) / len(values),
+            "time": sum(r["time"] for r in recs) / len(recs),
+        }
+        lit = best_lit.get(file_name)
+        metrics["best_lit"] = lit
+        metrics["diff_best"] = ((metrics["best"] - lit) / lit) * 100 if lit else None
+        store.append(file_name, metrics)
+        merged += 1
+
+    incomplete = sum(1 for recs in per_instance.values() if len(recs) < n_seeds)
+    print(f"[fila] {merged} instâncias agregadas em {store_path} ({incomplete} com sementes faltando)")
+    if export_path and excel and os.path.exists(excel):
+        rs.export_excel(store_path, excel, export_path, key=store.key)
+    return merged
+
+
+def main_fila(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Varredura distribuída por uma fila num diretório compartilhado.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_init = sub.add_parser("init", help="Cria a fila. Argumentos extras são os de main.py (-i, -o, -t, --seeds, ...).")
+    p_init.add_argument("work_dir")
+
+    p_work = sub.add_parser("worker", help="Roda processos de trabalho neste nó até a fila esvaziar.")
+    p_work.add_argument("work_dir")
+    p_work.add_argument("-w", "--workers", type=int, default=1)
+    p_work.add_argument("--no", dest="node", default=socket.gethostname(), help="Nome do nó (padrão: hostname).")
+    p_work.add_argument("--lease", type=float, default=600.0,
+                        help="Segundos sem heartbeat até uma posse ser considerada abandonada.")
+    p_work.add_argument("--kernel", choices=av.BACKENDS, default="python")
+
+    p_merge = sub.add_parser("merge", help="Agrega os resultados e monta a planilha.")
+    p_merge.add_argument("work_dir")
+    p_merge.add_argument("--saida", dest="store_path", default="Resultados.jsonl")
+    p_merge.add_argument("--excel", default="Resultados.xlsx")
+    p_merge.add_argument("--exportar", dest="export_path", default="Resultados_atualizado.xlsx")
+    p_merge.add_argument("--parcial", dest="partial", action="store_true",
+                         help="Inclui instâncias com sementes faltando.")
+
+    p_status = sub.add_parser("status", help="Resumo da fila.")
+    p_status.add_argument("work_dir")
+
+    args, rest = parser.parse_known_args(argv)
+    if args.cmd != "init" and rest:
+        parser.error(f"Argumentos desconhecidos: {rest}")
+
+    if args.cmd == "init":
+        run_args = main.parse_args(rest)
+        if run_args.path_relinking:
+            print("[fila] --path-relinking não é suportado no modo fila (cada tarefa é uma semente); ignorado.")
+            run_args.path_relinking = False
+        files = main.select_instances(run_args.instances_dir, run_args.patterns)
+        queue = init_queue(args.work_dir, main.build_config(run_args), files)
+        print(f"[fila] {len(queue['tasks'])} tarefas ({len(files)} instâncias) em {args.work_dir} "
+              f"| config {queue['config_key']}")
+    elif args.cmd == "worker":
+        av.set_backend(args.kernel)
+        if args.workers <= 1:
+            work(args.work_dir, args.node, args.lease, av.backend())
+        else:
+            import multiprocessing as mp
+            procs = [mp.Process(target=work, args=(args.work_dir, args.node, args.lease, av.backend()))
+                     for _ in range(args.workers)]
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.join()
+        print(f"[fila] {args.node}: nenhuma tarefa pendente.")
+    elif args.cmd == "merge":
+        merge(args.work_dir, args.store_path, args.excel, args.export_path, args.partial)
+    else:
+        print(json.dumps(status(args.work_dir)))
+
+
+if __name__ == "__main__":
+    main_fila()
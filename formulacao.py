@@ -0,0 +1,259 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import time
+from typing import List, Dict, Optional, Tuple
+
+import Modelagem as md
+from Modelagem import Instance, verify_solution
+import main
+
+# ******************************** FORMULAÇÃO MIP (LIMITANTES CERTIFICADOS) ********************************
+#
+# Modelo de sequenciamento por sucessor imediato (ATSP com um nó fictício D = n, que abre e
+# fecha a sequência) e tempos de início com big-M:
+#
+#   min C_max
+#   sum_i x[i][j] = 1, sum_j x[i][j] = 1            para cada job e para D   (cada job tem um antecessor/sucessor)
+#   b[j] >= b[i] + p[i] + s[i][j] - M_ij (1 - x[i][j])                          (Eq. 7, setup do antecessor imediato)
+#   b[j] >= b[i] + p[i] + d[i][j]                    para cada arco de atraso  (Eq. 8)
+#   C_max >= b[j] + p[j] + tail[j]
+#   C_max >= sum_j p[j] + sum_{i,j} s[i][j] x[i][j]                             (nunca há setup "de graça")
+#
+# Como p > 0, a restrição de setup também elimina subciclos (efeito MTZ). head/tail são os
+# caminhos mais longos pelos arcos de atraso e limitam b; o C_max da incumbente (heurística)
+# limita C_max e aperta cada M_ij. Arcos impossíveis pela precedência não viram variáveis.
+#
+# Resolvido pelo HiGHS do SciPy (scipy.optimize.milp), importado só quando usado. O milp do
+# SciPy não aceita solução inicial: a incumbente entra como limite superior (corte) e é
+# devolvida se o solver não achar nada melhor; o limitante inferior provado vem do solver.
+
+
+def precedence_order(inst: Instance) -> List[int]:
+    """Uma ordem topológica dos arcos de atraso: as camadas de Kahn da instância, em sequência."""
+    order = [j for layer in inst.precedence_layers() for j in layer]
+    if not verify_solution(inst, order)["feasible"]:
+        raise ValueError("Os arcos de atraso formam um ciclo: instância infactível.")
+    return order
+
+
+def heads_tails(inst: Instance, order: List[int]) -> Tuple[List[float], List[float]]:
+    """
+    head[j]: início mais cedo de j só pelos arcos de atraso (caminho mais longo até j);
+    tail[j]: tempo mínimo entre o término de j e o fim da agenda pelos arcos de atraso.
+    """
+    preds = inst.predecessors()
+    succs = inst.successors()
+    head = [0.0] * inst.n
+    for j in order:
+        for i, d in preds[j]:
+            head[j] = max(head[j], head[i] + inst.p[i] + d)
+    tail = [0.0] * inst.n
+    for i in reversed(order):
+        for j, d in succs[i]:
+            tail[i] = max(tail[i], d + inst.p[j] + tail[j])
+    return head, tail
+
+
+class MIPModel:
+    """
+    Matrizes do modelo no formato de scipy.optimize.milp.
+    Colunas: x dos arcos (self.arcs, binárias), b[0..n-1], C_max.
+    """
+
+    def __init__(self, inst: Instance, upper_bound: float):
+        import numpy as np
+        from scipy.sparse import coo_array
+
+        n = inst.n
+        D = n
+        order = precedence_order(inst)
+        head, tail = heads_tails(inst, order)
+        preds = inst.predecessors()
+        succs = inst.successors()
+
+        # j nunca vem imediatamente antes de um job do qual depende (nem direta nem transitivamente)
+        ancestors = [set() for _ in range(n)]
+        for j in order:
+            for i, _d in preds[j]:
+                ancestors[j] |= ancestors[i] | {i}
+        arcs = []
+        for i in range(n + 1):
+            for j in range(n + 1):
+                if i == j or (i == D and preds[j]) or (j == D and succs[i]):
+                    continue
+                if i < n and j < n and j in ancestors[i]:
+                    continue
+                arcs.append((i, j))
+        self.n = n
+        self.arcs = arcs
+        n_x = len(arcs)
+        col_b = n_x
+        col_C = n_x + n
+        n_cols = col_C + 1
+
+        lb_b = head
+        ub_b = [upper_bound - inst.p[j] - tail[j] for j in range(n)]
+
+        rows, cols, vals, lo, hi = [], [], [], [], []
+
+        def add_row(entries, lower, upper):
+            r = len(lo)
+            for c, v in entries:
+                rows.append(r)
+                cols.append(c)
+                vals.append(v)
+            lo.append(lower)
+            hi.append(upper)
+
+        into = [[] for _ in range(n + 1)]
+        out = [[] for _ in range(n + 1)]
+        for k, (i, j) in enumerate(arcs):
+            out[i].append(k)
+            into[j].append(k)
+        for v in range(n + 1):
+            add_row([(k, 1.0) for k in into[v]], 1.0, 1.0)
+            add_row([(k, 1.0) for k in out[v]], 1.0, 1.0)
+
+        setup_cover = []
+        for k, (i, j) in enumerate(arcs):
+            if i == D or j == D:
+                continue
+            sij = inst.s[i][j]
+            setup_cover.append((k, -float(sij)))
+            # b[i] - b[j] + M x <= M - p[i] - s[i][j]; sem efeito se x = 0 (M = maior valor do lado esquerdo)
+            M = ub_b[i] + inst.p[i] + sij - lb_b[j]
+            if M > 0:
+                add_row([(col_b + i, 1.0), (col_b + j, -1.0), (k, M)], -np.inf, M - inst.p[i] - sij)
+        for j in range(n):
+            for i, d in preds[j]:
+                add_row([(col_b + i, 1.0), (col_b + j, -1.0)], -np.inf, -inst.p[i] - d)
+            add_row([(col_C, 1.0), (col_b + j, -1.0)], inst.p[j] + tail[j], np.inf)
+        add_row([(col_C, 1.0)] + setup_cover, float(sum(inst.p)), np.inf)
+
+        self.c = np.zeros(n_cols)
+        self.c[col_C] = 1.0
+        self.integrality = np.zeros(n_cols)
+        self.integrality[:n_x] = 1
+        self.lb = np.concatenate([np.zeros(n_x), lb_b, [max(h + inst.p[j] + tail[j] for j, h in enumerate(head))]])
+        self.ub = np.concatenate([np.ones(n_x), ub_b, [upper_bound]])
+        self.A = coo_array((vals, (rows, cols)), shape=(len(lo), n_cols)).tocsr()
+        self.row_lb = np.array(lo)
+        self.row_ub = np.array(hi)
+
+    def decode(self, x) -> List[int]:
+        """Sequência a partir dos x do solver: segue os sucessores a partir de D."""
+        succ = {i: j for (i, j), v in zip(self.arcs, x) if v > 0.5}
+        seq = []
+        j = succ.get(self.n)
+        while j is not None and j != self.n and len(seq) <= self.n:
+            seq.append(j)
+            j = succ.get(j)
+        return seq
+
+
+def solve_mip(inst: Instance, time_limit: Optional[float] = 60.0, incumbent: Optional[List[int]] = None,
+              verbose: bool = False) -> Dict:
+    """
+    Resolve o modelo com HiGHS (scipy.optimize.milp) até 'time_limit' segundos.
+
+    'incumbent' (sequência factível, ex.: da busca local) dá o limite superior; sem ela usa
+    a ordem topológica. Retorna {"sequence", "C_max" (melhor conhecido, verificado),
+    "lower_bound" (provado pelo solver), "gap" (%), "optimal", "status", "time"}.
+    """
+    from scipy.optimize import milp, LinearConstraint, Bounds
+
+    start = time.time()
+    if incumbent is None:
+        incumbent = precedence_order(inst)
+    res_inc = verify_solution(inst, incumbent)
+    if not res_inc["feasible"]:
+        raise ValueError("A incumbente dada não é factível.")
+
+    model = MIPModel(inst, res_inc["C_max"])
+    options = {"disp": verbose}
+    if time_limit is not None:
+        options["time_limit"] = max(1.0, time_limit - (time.time() - start))
+    out = milp(model.c, integrality=model.integrality, bounds=Bounds(model.lb, model.ub),
+               constraints=LinearConstraint(model.A, model.row_lb, model.row_ub), options=options)
+
+    best_seq, best = list(incumbent), res_inc["C_max"]
+    if out.x is not None:
+        seq = model.decode(out.x)
+        res = verify_solution(inst, seq)
+        if res["feasible"] and res["C_max"] < best:
+            best_seq, best = seq, res["C_max"]
+
+    optimal = out.status == 0
+    bound = getattr(out, "mip_dual_bound", None)
+    if optimal:
+        lower = out.fun
+    elif bound is not None and bound == bound:  # NaN quando o solver não reporta
+        lower = bound
+    else:
+        lower = model.lb[-1]  # max_j head[j] + p[j] + tail[j]
+    if all(float(v).is_integer() for v in inst.p) and all(float(v).is_integer() for row in inst.s for v in row) \
+            and all(float(v).is_integer() for row in inst.d for v in row):
+        lower = math.ceil(lower - 1e-6)  # dados inteiros: C_max ótimo é inteiro
+    lower = min(lower, best)
+    return {
+        "sequence": best_seq,
+        "C_max": best,
+        "lower_bound": lower,
+        "gap": (best - lower) / best * 100 if best else 0.0,
+        "optimal": optimal or best - lower < 1e-6,
+        "status": out.message,
+        "time": time.time() - start,
+    }
+
+
+def main_mip(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Limitantes certificados pela formulação MIP (HiGHS via SciPy).")
+    parser.add_argument("-i", "--instancias", nargs="*", dest="patterns", default=[])
+    parser.add_argument("--dir", dest="instances_dir", default="Instancias")
+    parser.add_argument("-t", "--tempo", dest="time_limit", type=float, default=60.0, help="Tempo limite (s) do MIP por instância.")
+    parser.add_argument("--heuristica", dest="heuristic_time", type=float, default=5.0,
+                        help="Tempo (s) da busca local (main.py, operadores JE,IJB) que gera a incumbente; 0 = ordem topológica.")
+    parser.add_argument("--cache-solucoes", dest="solution_cache", default=None,
+                        help="Usa também a melhor solução guardada (resultados.SolutionCache) como incumbente.")
+    parser.add_argument("--saida", dest="out_path", default=None, help="JSONL com um registro por instância.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostra o log do HiGHS.")
+    args = parser.parse_args(argv)
+
+    import resultados as rs
+    cache = rs.SolutionCache(args.solution_cache) if args.solution_cache else None
+
+    for file_name in main.select_instances(args.instances_dir, args.patterns):
+        path = os.path.join(args.instances_dir, file_name)
+        inst = md.load_instance_from_txt(path)
+
+        incumbent = None
+        if args.heuristic_time > 0:
+            random.seed(0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                res = main.run_simulations_for_instance(file_name, instances_dir=args.instances_dir,
+                                                        operators=["JE", "IJB"], time_budget=args.heuristic_time,
+                                                        solution_cache=cache)
+            incumbent = res["sequence_normalized"] if res is not None else None
+        elif cache is not None:
+            stored = cache.get(path)
+            if stored is not None and verify_solution(inst, stored["sequence"])["feasible"]:
+                incumbent = stored["sequence"]
+
+        out = solve_mip(inst, args.time_limit, incumbent, args.verbose)
+        print(f"[MIP] {file_name}: C_max={out['C_max']} LB={out['lower_bound']:.1f} gap={out['gap']:.2f}% "
+              f"{'ótimo' if out['optimal'] else ''} ({out['time']:.1f}s)")
+        if cache is not None:
+            cache.put(path, out["sequence"], out["C_max"])
+        if args.out_path:
+            rec = {"instancia": file_name, **out, "time_limit": args.time_limit}
+            with open(args.out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec) + "\n")
+
+
+if __name__ == "__main__":
+    main_mip()
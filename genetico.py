@@ -0,0 +1,214 @@
+import random
+import time
+from typing import Callable, List, Tuple, Optional
+
+import Modelagem as md
+from Modelagem import Instance, verify_solution
+import construtivo as ct
+import busca_local as bl
+import avaliacao as av
+
+# ******************************** ALGORITMO GENÉTICO ********************************
+#
+# Indivíduo = sequência factível (lista de jobs). A população inteira é avaliada de uma
+# vez por geração (evaluate_population), opcionalmente espalhada em processos.
+
+_GA_INST = None  # instância (somente leitura) de cada processo de trabalho
+
+
+def _init_ga_worker(inst: Instance) -> None:
+    global _GA_INST
+    _GA_INST = inst
+    av.warmup(inst)
+
+
+def _evaluate_batch(seqs: List[List[int]], inst: Optional[Instance] = None) -> List[float]:
+    """C_max de cada sequência (inf se infactível), num único lote do backend de avaliação."""
+    inst = inst if inst is not None else _GA_INST
+    return av.makespans(inst, seqs)
+
+
+def evaluate_population(inst: Instance, population: List[List[int]], pool=None, workers: int = 1) -> List[float]:
+    """
+    Avalia a população inteira em lote. Com 'pool' (ProcessPoolExecutor criado com
+    _init_ga_worker), a população é dividida em 'workers' lotes contíguos; a ordem
+    dos valores devolvidos é sempre a da população.
+    """
+    if pool is None or workers <= 1:
+        return _evaluate_batch(population, inst)
+    size = -(-len(population) // workers)
+    batches = [population[k:k + size] for k in range(0, len(population), size)]
+    return [v for part in pool.map(_evaluate_batch, batches) for v in part]
+
+
+def precedence_crossover(p1: List[int], p2: List[int], rng: random.Random) -> List[int]:
+    """
+    Cruzamento de dois pontos que preserva precedência (estilo Hartmann para listas de atividades):
+      - posições [0, c1): copiadas de p1;
+      - posições [c1, c2): próximos jobs de p2 (na ordem de p2) ainda não usados;
+      - posições [c2, n): restantes, na ordem de p1.
+    Cada trecho mantém a ordem relativa de um pai factível, então o filho também é factível.
+    """
+    n = len(p1)
+    c1, c2 = sorted(rng.sample(range(n + 1), 2))
+    child = p1[:c1]
+    used = set(child)
+    for j in p2:
+        if len(child) >= c2:
+            break
+        if j not in used:
+            child.append(j)
+            used.add(j)
+    child.extend(j for j in p1 if j not in used)
+    return child
+
+
+def insert_mutation(inst: Instance, seq: List[int], rng: random.Random, tries: int = 10) -> List[int]:
+    """Move um job aleatório para outra posição (mesmo movimento de insert_job_random), mantendo a factibilidade."""
+    n = len(seq)
+    for _ in range(tries):
+        remove_index = rng.randint(0, n - 1)
+        job = seq[remove_index]
+        new_sol = seq[:remove_index] + seq[remove_index + 1:]
+        insert_index = rng.randint(0, len(new_sol))
+        new_sol = new_sol[:insert_index] + [job] + new_sol[insert_index:]
+        if verify_solution(inst, new_sol, verbose=False).feasible:
+            return new_sol
+    return seq
+
+
+def seed_population(inst: Instance, size: int, rng: random.Random,
+                    initial: Optional[List[List[int]]] = None) -> List[List[int]]:
+    """
+    População inicial: sequências dadas em 'initial', construtivos EST e EFT e o restante
+    por GRASP (randomized_greedy_constructive_build sobre os scores EFT, alpha sorteado).
+    """
+    population = [seq[:] for seq in (initial or [])]
+
+    initial_est = [(j, 0) for j in range(inst.n)]
+    initial_eft = [(j, inst.p[j]) for j in range(inst.n)]
+    for update, scores in ((ct.update_earliest_start_times, initial_est),
+                           (ct.update_earliest_finish_times, initial_eft)):
+        sol, res = ct.greedy_constructive_build(inst, ct.get_candidates_ordered, update, scores)
+        if res.feasible and len(sol) == inst.n:
+            population.append(sol)
+
+    attempts = 0
+    while len(population) < size and attempts < 3 * size:
+        attempts += 1
+        sol, res = ct.randomized_greedy_constructive_build(
+            inst, ct.get_candidates_ordered, ct.update_earliest_finish_times, initial_eft,
+            alpha=rng.uniform(0.1, 0.5), rng=rng
+        )
+        if res.feasible and len(sol) == inst.n:
+            population.append(sol)
+
+    # completa (se preciso) com mutações das sementes
+    while population and len(population) < size:
+        population.append(insert_mutation(inst, rng.choice(population), rng))
+    return population[:size]
+
+
+def genetic_algorithm(
+        inst: Instance,
+        pop_size: int = 30,
+        generations: int = 100,
+        crossover_rate: float = 0.9,
+        mutation_rate: float = 0.2,
+        education_rate: float = 0.0,
+        elite: int = 2,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        initial: Optional[List[List[int]]] = None,
+        on_improve: Optional[Callable[[float], object]] = None
+) -> Tuple[List[int], md.Resultado]:
+    """
+    Algoritmo genético com cruzamento que preserva precedência.
+
+    - Semeadura: seed_population (EST, EFT, GRASP e as sequências em 'initial').
+    - Seleção por torneio binário; 'elite' melhores passam direto para a próxima geração.
+    - Mutação: insert_mutation. Educação (com prob. education_rate): insert_job_best da
+      busca local com k_neighbors=8 aplicada ao filho.
+    - A população inteira é avaliada por geração em evaluate_population; com workers > 1
+      a avaliação roda num pool de processos que recebe a instância uma única vez.
+    - on_improve(C_max): chamado com o melhor da geração 0 e a cada geração que o melhora.
+    Retorna (melhor sequência, Resultado).
+    """
+    rng = random.Random(seed)
+    deadline = time.time() + time_budget if time_budget else None
+
+    population = seed_population(inst, pop_size, rng, initial)
+    if not population:
+        print("[GA] Nenhuma solução inicial factível.")
+        return [], verify_solution(inst, [], verbose=False)
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_ga_worker, initargs=(inst,))
+
+    try:
+        fitness = evaluate_population(inst, population, pool, workers)
+        best_idx = min(range(len(population)), key=lambda k: fitness[k])
+        best_seq, best_val = population[best_idx][:], fitness[best_idx]
+        print(f"[GA] Geração 0: melhor C_max = {best_val}")
+        if on_improve is not None:
+            on_improve(best_val)
+
+        def tournament() -> List[int]:
+            a, b = rng.randrange(len(population)), rng.randrange(len(population))
+            return population[a] if fitness[a] <= fitness[b] else population[b]
+
+        for gen in range(1, generations + 1):
+            if deadline is not None and time.time() >= deadline:
+                print("[GA] Tempo limite atingido.")
+                break
+
+            order = sorted(range(len(population)), key=lambda k: fitness[k])
+            offspring = [population[k] for k in order[:elite]]
+            seen = {tuple(s) for s in offspring}
+
+            while len(offspring) < pop_size:
+                p1, p2 = tournament(), tournament()
+                child = precedence_crossover(p1, p2, rng) if rng.random() < crossover_rate else p1[:]
+                if rng.random() < mutation_rate:
+                    child = insert_mutation(inst, child, rng)
+                if education_rate > 0 and rng.random() < education_rate:
+                    res_child = verify_solution(inst, child, verbose=False)
+                    if res_child.feasible:
+                        child, _res, _imp = bl.insert_job_best(inst, res_child, k_neighbors=8)
+                key = tuple(child)
+                if key in seen:
+                    child = insert_mutation(inst, child, rng)  # evita clones (diversidade)
+                    key = tuple(child)
+                seen.add(key)
+                offspring.append(child)
+
+            population = offspring
+            fitness = evaluate_population(inst, population, pool, workers)
+            gen_idx = min(range(len(population)), key=lambda k: fitness[k])
+            if fitness[gen_idx] < best_val:
+                best_seq, best_val = population[gen_idx][:], fitness[gen_idx]
+                print(f"[GA] Geração {gen}: melhor C_max = {best_val}")
+                if on_improve is not None:
+                    on_improve(best_val)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return best_seq, verify_solution(inst, best_seq, verbose=False)
+
+
+def ga_operator(inst: Instance, res, **params) -> Tuple[List[int], md.Resultado, bool]:
+    """
+    Adaptador para o pipeline de main.py (mesma assinatura dos operadores da busca local):
+    inclui a solução corrente na população inicial e devolve (sol, res, improved).
+    """
+    seq = res["sequence_normalized"]
+    # sem semente explícita, deriva uma do gerador global (que main.py semeia por repetição)
+    params.setdefault("seed", random.randrange(1 << 30))
+    best_seq, best_res = genetic_algorithm(inst, initial=[seq], **params)
+    if best_res.feasible and best_res.C_max < res["C_max"]:
+        return best_seq, best_res, True
+    return seq, res, False
@@ -1,31 +1,121 @@
 import Modelagem as md
-import view as vw
 import construtivo as ct
 import busca_local as bl
-import pandas as pd  # <- novo import
+import genetico as gn
+import vizinhanca as vz
+import path_relinking as pr
+import resultados as rs
+import avaliacao as av
+import argparse
+import fnmatch
+import json
+import os
+import random
 import time
-
-
-def run_simulations_for_instance(file_path: str, max_stagnation: int = 10) -> None:
+from typing import List, Dict, Optional, Callable
+
+
+# Operadores de busca local disponíveis para o pipeline: rótulo -> (função, parâmetros(inst))
+OPERADORES = {
+    "JE": (bl.bl_job_exchange, lambda inst: {}),
+    "BT": (bl.insert_block_random, lambda inst: {}),
+    "IJR": (bl.insert_job_random, lambda inst: {}),
+    "IJB": (bl.insert_job_best, lambda inst: {}),
+    "IBB": (bl.insert_block_best, lambda inst: {"min_block_size": 2, "max_block_size": int(inst.n*0.4)}),
+    "BL1": (bl.buscalocal1, lambda inst: {"mode": "first"}),
+    "GA": (gn.ga_operator, lambda inst: {}),
+    "DESC": (vz.descent, lambda inst: {"neighbourhood": "insert"}),
+    "VND": (vz.vnd, lambda inst: {}),
+    "SA": (vz.simulated_annealing, lambda inst: {}),
+    "TS": (vz.tabu_search, lambda inst: {}),
+}
+# Operadores que aceitam critical=True (sorteio restrito aos blocos críticos)
+OPERADORES_CRITICOS = {"JE", "BT", "IJR", "IJB", "IBB", "DESC", "VND", "SA", "TS"}
+# Operadores que aceitam repair=True (vizinhos infactíveis são reparados em vez de descartados)
+OPERADORES_REPARO = {"JE", "BT", "IJR", "IJB", "IBB", "DESC", "VND", "SA", "TS"}
+# Operadores de inserção que aceitam k_neighbors (posições ao lado dos k vizinhos de setup)
+OPERADORES_KNN = {"BT", "IJR", "IJB", "IBB", "DESC", "VND", "SA", "TS"}
+# Motores longos que recebem o prazo (deadline) e o cancelamento (should_stop) e param no meio da chamada
+OPERADORES_PRAZO = {"DESC", "VND", "SA", "TS"}
+
+
+def run_simulations_for_instance(
+        file_path: str,
+        max_stagnation: int = 10,
+        instances_dir: str = "Instancias",
+        operators: Optional[List[str]] = None,
+        time_budget: Optional[float] = None,
+        contract: bool = False,
+        critical: bool = False,
+        k_neighbors: Optional[int] = None,
+        beam_width: Optional[int] = None,
+        pilot_candidates: Optional[int] = None,
+        elite_pool: Optional[pr.ElitePool] = None,
+        repair: bool = False,
+        grasp_starts: int = 0,
+        alpha: float = 0.3,
+        rcl_size: Optional[int] = None,
+        operator_params: Optional[Dict[str, Dict]] = None,
+        trace: Optional[rs.ConvergenceTrace] = None,
+        solution_cache: Optional[rs.SolutionCache] = None,
+        inst: Optional[md.Instance] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+) -> Optional[md.Resultado]:
     """
     Executa o pipeline de simulações para uma instância:
       1) Carrega instância
       2) Constrói soluções por EST e EFT
       3) Escolhe a melhor para iniciar busca local
       4) Roda operadores de busca local com critério de estagnação
+    Retorna o Resultado da melhor solução (na instância original), ou None se nenhum
+    construtivo encontrar solução factível.
+
+    - operators: rótulos de OPERADORES, na ordem em que são aplicados (padrão: ["JE"]).
+    - time_budget: tempo máximo (s) da execução; verificado entre chamadas dos operadores.
+    - contract: contrai cadeias de precedência com atraso 0 em macro-jobs (md.contract_chains);
+      a busca roda na instância reduzida e a solução é expandida e verificada na original.
+    - critical: operadores sorteiam movimentos só em torno dos blocos críticos.
+    - k_neighbors: construtivos e operadores de inserção usam as listas dos k setups mais baratos.
+    - beam_width: também constrói por beam search (largura dada) e concorre como ponto de partida.
+    - pilot_candidates: também constrói pelo método piloto, avaliando esse nº de candidatos
+      por passo (0 = todos os prontos).
+    - repair: vizinhos que violam precedência são reparados (bl.repair_precedence) e avaliados.
+    - grasp_starts / alpha / rcl_size: nº de construções GRASP (randomized_greedy_constructive_build
+      sobre EFT) que também concorrem como ponto de partida, e os parâmetros da RCL.
+    - operator_params: parâmetros extras por operador, ex.: {"IJR": {"max_stagnation": 200}}.
+    - elite_pool: se dado, a melhor solução final é oferecida ao pool de elite (path relinking).
+    - trace: se dado, cada melhoria da incumbente é registrada (rs.ConvergenceTrace), inclusive
+      as dos construtivos; os operadores recebem on_improve e registram cada movimento aceito
+      no instante em que acontece. O chamador grava o traço ao final da execução.
+    - solution_cache: se dado, a melhor sequência guardada da instância (reverificada) concorre
+      como ponto de partida, e a solução final é gravada de volta se for melhor.
+    - inst: instância já carregada (ex.: cache do servidor); file_path vira só o rótulo.
+    - should_stop: verificado junto com o tempo limite; se devolver True, a busca para e
+      devolve a melhor solução até então (cancelamento pelo servidor).
     """
+    start = time.time()
+    deadline = start + time_budget if time_budget else None
+    operators = operators or ["JE"]
+
     print(f"\n==============================")
     print(f"Rodando instância: {file_path}")
     print(f"==============================")
 
     # 1) Carregar instância
-    inst = md.load_instance_from_txt("Instancias\\"+file_path)
+    if inst is None:
+        inst = md.load_instance_from_txt(os.path.join(instances_dir, file_path))
+    full_inst, groups = inst, None
+    if contract:
+        inst, groups = md.contract_chains(full_inst)
+        print(f"Cadeias contraídas: n = {full_inst.n} -> {inst.n} macro-jobs")
+
+    get_candidates = ct.make_knn_candidates(k_neighbors) if k_neighbors else ct.get_candidates_ordered
 
     # 2) Construtivo por EST
     initial_est = [(j, 0) for j in range(inst.n)]
     sol_est, res_est = ct.greedy_constructive_build(
         inst=inst,
-        get_candidates_ordered=ct.get_candidates_ordered,
+        get_candidates_ordered=get_candidates,
         update_scores=ct.update_earliest_start_times,
         initial_scores=initial_est,
         initial_seq=None,
@@ -36,13 +126,21 @@ def run_simulations_for_instance(file_path: str, max_stagnation: int = 10) -> No
     initial_eft = [(j, inst.p[j]) for j in range(inst.n)]
     sol_eft, res_eft = ct.greedy_constructive_build(
         inst=inst,
-        get_candidates_ordered=ct.get_candidates_ordered,
+        get_candidates_ordered=get_candidates,
         update_scores=ct.update_earliest_finish_times,
         initial_scores=initial_eft,
         initial_seq=None,
         # plot_title="Gantt — Construtivo por EFT"
     )
 
+    def note(res, label):
+        """Registra no traço de convergência (se houver) uma solução factível."""
+        if trace is not None and res.get("feasible", False):
+            trace.record(res["C_max"], label)
+
+    note(res_est, "EST")
+    note(res_eft, "EFT")
+
     # 3) Escolher melhor ponto de partida
     def is_better(a, b):
         """Melhor = factível e com menor C_max."""
@@ -53,9 +151,52 @@ def run_simulations_for_instance(file_path: str, max_stagnation: int = 10) -> No
         return a["C_max"] <= b["C_max"]
 
     start_sol, start_res = (sol_eft, res_eft) if is_better(res_eft, res_est) else (sol_est, res_est)
+
+    # 2) Warm start: melhor sequência já encontrada para esta instância (cache persistente)
+    instance_path = os.path.join(instances_dir, file_path)
+    stored = solution_cache.get(instance_path) if solution_cache is not None else None
+    if stored is not None:
+        res_ws = md.verify_solution(full_inst, stored["sequence"])
+        sol_ws = stored["sequence"] if groups is None else md.contract_solution(groups, stored["sequence"])
+        if not res_ws["feasible"] or sol_ws is None:
+            print("[cache] Solução guardada inválida para esta instância; ignorada.")
+        else:
+            res_ws = res_ws if groups is None else md.verify_solution(inst, sol_ws)
+            print(f"[cache] Warm start com a melhor solução guardada: C_max = {res_ws['C_max']:.3f}")
+            note(res_ws, "CACHE")
+            if is_better(res_ws, start_res):
+                start_sol, start_res = sol_ws, res_ws
+
+    # 2) GRASP: construções gulosas randomizadas (opcional)
+    for _ in range(grasp_starts):
+        sol_grasp, res_grasp = ct.randomized_greedy_constructive_build(
+            inst=inst,
+            get_candidates_ordered=get_candidates,
+            update_scores=ct.update_earliest_finish_times,
+            initial_scores=initial_eft,
+            alpha=alpha,
+            rcl_size=rcl_size,
+        )
+        note(res_grasp, "GRASP")
+        if is_better(res_grasp, start_res):
+            start_sol, start_res = sol_grasp, res_grasp
+
+    # 2) Construtivo por beam search (opcional)
+    if beam_width:
+        sol_beam, res_beam = ct.beam_search_constructive(inst, width=beam_width)
+        note(res_beam, "BEAM")
+        if is_better(res_beam, start_res):
+            start_sol, start_res = sol_beam, res_beam
+
+    # 2) Construtivo piloto (opcional)
+    if pilot_candidates is not None:
+        sol_pilot, res_pilot = ct.pilot_constructive(inst, max_candidates=pilot_candidates or None)
+        note(res_pilot, "PILOT")
+        if is_better(res_pilot, start_res):
+            start_sol, start_res = sol_pilot, res_pilot
     if not start_res.get("feasible", False):
         print("[ERRO] Nenhuma solução construtiva viável encontrada. Encerrando esta instância.")
-        return
+        return None
 
     print(f"Solução inicial escolhida: C_max = {start_res['C_max']:.3f}")
 
@@ -66,10 +207,17 @@ def run_simulations_for_instance(file_path: str, max_stagnation: int = 10) -> No
         current_res = res_in
 
         while stagnation_counter < max_stagnation:
+            if deadline is not None and time.time() >= deadline:
+                print(f"[{label}] Tempo limite atingido.")
+                break
+            if should_stop is not None and should_stop():
+                print(f"[{label}] Execução cancelada.")
+                break
             sol_out, res_out, improved = fn(inst=inst, res=current_res, **params) # ** desempacota o dicionário 'params' em argumentos nomeados
             if improved:
                 # vw.plot_gantt(inst, res_out, title=f"Gantt — Após Encontrar OL {label} {stagnation_counter}")
                 print(f"[{label}] Melhoria encontrada! C_max = {res_out['C_max']:.3f}")
+                note(res_out, label)
                 current_res = res_out
                 stagnation_counter = 0
             else:
@@ -82,77 +230,303 @@ def run_simulations_for_instance(file_path: str, max_stagnation: int = 10) -> No
     # 4) Fases de busca local (cada fase começa do melhor resultado até então)
     best_res = start_res
 
-    # JOB EXCHANGE
-    best_res = run_stagnation_loop("JE", bl.bl_job_exchange, best_res)
-
-    # # BLOCK THROW
-    # best_res = run_stagnation_loop("BT", bl.insert_block_random, best_res)
-
-    # # INSERT JOB RANDOM
-    # best_res = run_stagnation_loop("IJR", bl.insert_job_random, best_res)
-
-    # # INSERT JOB BEST
-    # best_res = run_stagnation_loop("IJB", bl.insert_job_best, best_res)
-
-    # # INSERT BLOCK BEST
-    # print(f"\nParâmetros para IBB: min_block_size=2, max_block_size={int(inst.n*0.4)}")
-    # best_res = run_stagnation_loop("IBB", bl.insert_block_best, best_res, params={"min_block_size": 2, "max_block_size": int(inst.n*0.4)})
+    # JE: JOB EXCHANGE | BT: BLOCK THROW | IJR: INSERT JOB RANDOM
+    # IJB: INSERT JOB BEST | IBB: INSERT BLOCK BEST | BL1: DESCIDA COMPLETA POR TROCAS
+    # GA: ALGORITMO GENÉTICO (população semeada com a solução corrente)
+    # DESC: DESCIDA COM DON'T-LOOK BITS | VND: DESCIDA EM VIZINHANÇA VARIÁVEL
+    # SA: SIMULATED ANNEALING | TS: BUSCA TABU (vizinhanca.py)
+    for label in operators:
+        fn, params = OPERADORES[label]
+        op_params = params(inst)
+        if critical and label in OPERADORES_CRITICOS:
+            op_params["critical"] = True
+        if repair and label in OPERADORES_REPARO:
+            op_params["repair"] = True
+        if k_neighbors and label in OPERADORES_KNN:
+            op_params["k_neighbors"] = k_neighbors
+        if label in OPERADORES_PRAZO:
+            op_params["deadline"] = deadline
+            op_params["should_stop"] = should_stop
+        if trace is not None:
+            # cada melhoria dentro do operador entra no traço com o próprio instante (não só ao fim da chamada)
+            op_params["on_improve"] = lambda C_max, label=label: trace.record(C_max, label)
+        op_params.update((operator_params or {}).get(label, {}))
+        best_res = run_stagnation_loop(label, fn, best_res, params=op_params)
+
+    if groups is not None:
+        best_res = md.verify_solution(full_inst, md.expand_solution(groups, best_res["sequence_normalized"]))
+
+    if elite_pool is not None and best_res["feasible"]:
+        elite_pool.add(best_res["sequence_normalized"], best_res["C_max"])
+
+    if solution_cache is not None and best_res["feasible"]:
+        if solution_cache.put(instance_path, best_res["sequence_normalized"], best_res["C_max"]):
+            print(f"[cache] Nova melhor solução guardada: C_max = {best_res['C_max']:.3f}")
 
     print(f"\nFinal da instância {file_path} — Melhor C_max = {best_res['C_max']:.3f}")
 
-    return best_res["C_max"]
-
-
-if __name__ == "__main__":
-    
-    excel_path = "Resultados.xlsx"
-    df = pd.read_excel(excel_path, header=0)
-
-    # quantidade_inst_para_testar = 5 # vai testar as primeiras 5 instâncias listadas na coluna A do Excel
-    quantidade_inst_para_testar = len(df)  # vai testar todas as instâncias listadas na coluna A do Excel
-
-    for row, name in enumerate(df.iloc[:quantidade_inst_para_testar, 0].dropna()):
-        file_name = str(name).strip()
-        if not file_name:
+    return best_res
+
+
+def pipeline_params(config: Dict) -> Dict:
+    """Argumentos de run_simulations_for_instance correspondentes a um dicionário de configuração."""
+    return {
+        "max_stagnation": config.get("max_stagnation", 10),
+        "instances_dir": config.get("instances_dir", "Instancias"),
+        "operators": config.get("operators"),
+        "time_budget": config.get("time_budget"),
+        "contract": config.get("contract", False),
+        "critical": config.get("critical", False),
+        "k_neighbors": config.get("k_neighbors"),
+        "beam_width": config.get("beam_width"),
+        "pilot_candidates": config.get("pilot_candidates"),
+        "repair": config.get("repair", False),
+        "grasp_starts": config.get("grasp_starts", 0),
+        "alpha": config.get("alpha", 0.3),
+        "rcl_size": config.get("rcl_size"),
+        "operator_params": config.get("operator_params"),
+    }
+
+
+def run_instance(file_name: str, config: Dict, trace_path: Optional[str] = None) -> Dict:
+    """
+    Roda as repetições configuradas de uma instância e devolve as métricas agregadas.
+    Cada repetição usa sua própria semente (config["seeds"]) para ser reproduzível.
+    Com 'trace_path', o traço de convergência de cada repetição é anexado a esse arquivo
+    (uma linha JSON por repetição, gravada só ao final dela).
+    Função de nível de módulo para poder ser enviada a processos de trabalho.
+    """
+    best_result = None
+    sum_results = 0
+    sum_time = 0
+    completed = 0
+
+    pool = pr.ElitePool() if config.get("path_relinking") else None
+    cache = rs.SolutionCache(config["solution_cache"]) if config.get("solution_cache") else None
+
+    seeds = config["seeds"]
+    for seed in seeds:
+        random.seed(seed)
+        trace = rs.ConvergenceTrace() if trace_path else None
+
+        start_time = time.time()
+        res = run_simulations_for_instance(
+            file_name,
+            elite_pool=pool,
+            trace=trace,
+            solution_cache=cache,
+            **pipeline_params(config),
+        )
+        end_time = time.time()
+        if trace is not None:
+            trace.flush(trace_path, file_name, seed=seed, key=rs.config_key(config))
+        elapsed_time = end_time - start_time
+        sum_time += elapsed_time
+
+        if res is None:
+            print(f"[{file_name}] Semente {seed}: nenhuma solução factível; repetição ignorada.")
             continue
+        result = res["C_max"]
+        sum_results += result
+        completed += 1
+
+        if best_result is None or result < best_result:
+            best_result = result
+
+    # Pós-otimização: path relinking entre as soluções de elite das repetições
+    if pool is not None and len(pool) >= 2:
+        start_time = time.time()
+        inst = md.load_instance_from_txt(os.path.join(config["instances_dir"], file_name))
+        pr_best, pr_seq = pr.path_relinking_phase(inst, pool)
+        sum_time += time.time() - start_time
+        print(f"[PR] {file_name}: melhor após path relinking = {pr_best}")
+        if cache is not None and pr_seq is not None:
+            cache.put(os.path.join(config["instances_dir"], file_name), pr_seq, pr_best)
+        if pr_best is not None and (best_result is None or pr_best < best_result):
+            best_result = pr_best
+
+    # sem nenhuma repetição factível, best/mean ficam None (a instância é gravada assim mesmo)
+    return {
+        "best": best_result,
+        "mean": sum_results / completed if completed else None,
+        "time": sum_time / len(seeds),
+    }
+
+
+def select_instances(instances_dir: str, patterns: List[str]) -> List[str]:
+    """Lista as instâncias do diretório cujo nome casa com algum dos padrões (fnmatch)."""
+    names = sorted(f for f in os.listdir(instances_dir) if f.endswith(".txt"))
+    if not patterns:
+        return names
+    # parênteses não são especiais no fnmatch, então "N50_*_A(40-60)*" funciona diretamente
+    return [f for f in names if any(fnmatch.fnmatchcase(f, p) or fnmatch.fnmatchcase(f, p + ".txt") for p in patterns)]
+
+
+def load_best_lit(excel_path: Optional[str]) -> Dict[str, float]:
+    """Melhores resultados da literatura (coluna F) indexados pelo nome da instância (coluna A)."""
+    if not excel_path or not os.path.exists(excel_path):
+        return {}
+    import pandas as pd  # só carregado quando a planilha é de fato lida
 
-        num_it = 1
-        best_result = 0
-        best_result_lit = df.iloc[row, 5]  # Coluna F (6) contém o melhor resultado da literatura
-        print(f"\nIniciando simulações para instância: {file_name}")
-        print("best_result_lit =", best_result_lit)
-        print("------------------------------")
-
-        sum_results = 0
-        sum_time = 0
-
-        for it in range(num_it):
-
-            start_time = time.time()
-            result = run_simulations_for_instance(file_name)
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-
-            sum_results += result
-            sum_time += elapsed_time
-
-            if it == 0 or result < best_result:
-                best_result = result
-
-        mean_result = sum_results / num_it
-        mean_time = sum_time / num_it
-        diff_best = ((best_result - best_result_lit) / best_result_lit) * 100
-
-        # colocar para que as simulações rodem para todas as instâncias listadas na coluna A do Excel
-        # e escrevam os resultados necessários nas outras colunas:
-        # G: melhor resultado (coluna 7)
-        # H: média (10x) (coluna 8)
-        # I: tempo (s) (coluna 9)
-        # J: dif best (que está na coluna F:6) (%) (coluna 10)
+    df = pd.read_excel(excel_path, header=0)
+    best_lit = {}
+    for row, name in enumerate(df.iloc[:, 0]):
+        if isinstance(name, str) and name.strip():
+            try:
+                best_lit[name.strip()] = float(df.iloc[row, 5])
+            except (TypeError, ValueError):
+                pass
+    return best_lit
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Executa a varredura de instâncias 1 | s_ij, prec(d_ij) | C_max."
+    )
+    parser.add_argument("--config", help="Arquivo JSON com os parâmetros (chaves: patterns, instances_dir, repetitions, seeds, "
+                             "workers, time_budget, operators, max_stagnation, ...). A linha de comando tem prioridade.")
+    parser.add_argument("-i", "--instancias", nargs="*", dest="patterns", default=[],
+                        help="Padrões de família das instâncias, ex.: 'N50_*_A(40-60)*'. Padrão: todas.")
+    parser.add_argument("--dir", dest="instances_dir", default="Instancias", help="Diretório das instâncias.")
+    parser.add_argument("--excel", default="Resultados.xlsx", help="Planilha com os melhores da literatura (coluna F).")
+    parser.add_argument("--saida", dest="store_path", default="Resultados.jsonl", help="Arquivo JSONL de resultados.")
+    parser.add_argument("--exportar", dest="export_path", default="Resultados_atualizado.xlsx",
+                        help="Planilha gerada ao final a partir do JSONL ('' para não exportar).")
+    parser.add_argument("-r", "--repeticoes", dest="repetitions", type=int, default=1,
+                        help="Número de repetições por instância.")
+    parser.add_argument("--seed", type=int, default=0, help="Semente base (repetição k usa seed+k).")
+    parser.add_argument("--seeds", type=int, nargs="*", default=None,
+                        help="Lista explícita de sementes (substitui --repeticoes/--seed).")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processos em paralelo (uma instância por tarefa).")
+    parser.add_argument("-t", "--tempo", dest="time_budget", type=float, default=None,
+                        help="Tempo limite (s) por execução.")
+    parser.add_argument("-o", "--operadores", dest="operators", default="JE",
+                        help=f"Pipeline de operadores separados por vírgula. Opções: {','.join(OPERADORES)}.")
+    parser.add_argument("--max-stagnation", type=int, default=10, help="Estagnação máxima por operador.")
+    parser.add_argument("--contrair", dest="contract", action="store_true",
+                        help="Contrai cadeias de precedência com atraso 0 em macro-jobs antes da busca.")
+    parser.add_argument("--critico", dest="critical", action="store_true",
+                        help="Operadores sorteiam movimentos só em torno dos blocos críticos.")
+    parser.add_argument("--knn", dest="k_neighbors", type=int, default=None,
+                        help="Restringe construtivos e inserções aos k setups mais baratos de cada job.")
+    parser.add_argument("--beam", dest="beam_width", type=int, default=None,
+                        help="Largura do construtivo por beam search (concorre com EST/EFT como solução inicial).")
+    parser.add_argument("--pilot", dest="pilot_candidates", type=int, default=None,
+                        help="Também constrói pelo método piloto com esse nº de candidatos por passo (0 = todos).")
+    parser.add_argument("--path-relinking", dest="path_relinking", action="store_true",
+                        help="Guarda as soluções das repetições num pool de elite e aplica path relinking ao final.")
+    parser.add_argument("--reparar", dest="repair", action="store_true",
+                        help="Repara vizinhos que violam precedência em vez de descartá-los.")
+    parser.add_argument("--grasp", dest="grasp_starts", type=int, default=0,
+                        help="Nº de construções GRASP que concorrem como solução inicial.")
+    parser.add_argument("--alpha", type=float, default=0.3, help="Alpha da RCL do GRASP.")
+    parser.add_argument("--rcl", dest="rcl_size", type=int, default=None, help="Tamanho fixo da RCL do GRASP.")
+    parser.add_argument("--operator-params", dest="operator_params", type=json.loads, default=None,
+                        help='Parâmetros por operador em JSON, ex.: \'{"IJR": {"max_stagnation": 200}}\'.')
+    parser.add_argument("--traco", dest="trace_path", default=None,
+                        help="Arquivo JSONL onde gravar o traço de convergência (tempo, avaliações, C_max, operador) de cada execução.")
+    parser.add_argument("--cache-solucoes", dest="solution_cache", default=None,
+                        help="Diretório do cache persistente de melhores soluções: cada execução parte da melhor "
+                             "solução guardada da instância e grava de volta as melhorias.")
+    parser.add_argument("--kernel", choices=av.BACKENDS, default="python",
+                        help="Backend de avaliação: python (referência), numba (kernel compilado) ou auto.")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="Não pula instâncias já concluídas com a mesma configuração.")
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = build_parser()
+    args, _ = parser.parse_known_args(argv)
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+        # valores do arquivo viram os novos padrões; a linha de comando continua prevalecendo
+        parser.set_defaults(**cfg)
+    args = parser.parse_args(argv)
+
+    if isinstance(args.operators, str):
+        args.operators = [op.strip() for op in args.operators.split(",") if op.strip()]
+    unknown = [op for op in args.operators if op not in OPERADORES]
+    if unknown:
+        parser.error(f"Operadores desconhecidos: {unknown}. Opções: {list(OPERADORES)}")
+    if args.kernel == "numba" and not av.HAS_NUMBA:
+        parser.error("--kernel numba requer numba e numpy instalados.")
+    if isinstance(args.patterns, str):
+        args.patterns = [args.patterns]
+    if not args.seeds:
+        args.seeds = [args.seed + k for k in range(args.repetitions)]
+    return args
+
+
+def build_config(args: argparse.Namespace) -> Dict:
+    """
+    Configuração que identifica a execução (chave do resume e do modo fila);
+    filtros de instâncias e nº de workers não entram.
+    """
+    return {
+        "operators": args.operators,
+        "seeds": args.seeds,
+        "max_stagnation": args.max_stagnation,
+        "time_budget": args.time_budget,
+        "instances_dir": args.instances_dir,
+        "contract": args.contract,
+        "critical": args.critical,
+        "k_neighbors": args.k_neighbors,
+        "beam_width": args.beam_width,
+        "pilot_candidates": args.pilot_candidates,
+        "path_relinking": args.path_relinking,
+        "repair": args.repair,
+        "grasp_starts": args.grasp_starts,
+        "alpha": args.alpha,
+        "rcl_size": args.rcl_size,
+        "operator_params": args.operator_params,
+        "solution_cache": args.solution_cache,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    # backend de avaliação: compilado (e conferido contra a referência) uma vez por processo
+    av.set_backend(args.kernel)
+    av.warmup()
+
+    config = build_config(args)
+    store = rs.ResultStore(args.store_path, config=config)
+    done = store.completed() if args.resume else set()
+    if done:
+        print(f"[resume] {len(done)} instâncias já concluídas com esta configuração ({store.key}) serão puladas.")
+
+    files = [f for f in select_instances(args.instances_dir, args.patterns) if f not in done]
+    best_lit = load_best_lit(args.excel)
+    print(f"{len(files)} instâncias a executar | operadores={args.operators} | sementes={args.seeds} | "
+          f"workers={args.workers} | kernel={av.backend()}")
+
+    def save(file_name: str, metrics: Dict) -> None:
+        # grava o resultado da instância assim que termina (não se perde em caso de queda);
+        # a planilha é montada a partir deste arquivo (G: melhor, H: média, I: tempo, J: dif best)
+        lit = best_lit.get(file_name)
+        metrics["best_lit"] = lit
+        metrics["diff_best"] = ((metrics["best"] - lit) / lit) * 100 if lit and metrics["best"] is not None else None
+        store.append(file_name, metrics)
+        mean = f"{metrics['mean']:.3f}" if metrics["mean"] is not None else "-"
+        print(f"[{file_name}] melhor={metrics['best']} média={mean} tempo={metrics['time']:.2f}s")
+
+    if args.workers <= 1:
+        for file_name in files:
+            save(file_name, run_instance(file_name, config, args.trace_path))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=av.init_worker,
+                                 initargs=(av.backend(),)) as pool:
+            futures = {pool.submit(run_instance, f, config, args.trace_path): f for f in files}
+            for fut in as_completed(futures):
+                save(futures[fut], fut.result())
+
+    if args.export_path and args.excel and os.path.exists(args.excel):
+        rs.export_excel(args.store_path, args.excel, args.export_path, key=store.key)
 
-        df.iloc[row, 6] = best_result      # Coluna G
-        df.iloc[row, 7] = mean_result      # Coluna H
-        df.iloc[row, 8] = mean_time        # Coluna I
-        df.iloc[row, 9] = diff_best        # Coluna J
 
-    df.to_excel("Resultados_atualizado.xlsx", index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from typing import List, Tuple, Optional
+
+from Modelagem import Instance, verify_solution, compute_schedule, evaluate_suffix
+
+# ******************************** POOL DE ELITE + PATH RELINKING ********************************
+
+
+def position_distance(a: List[int], b: List[int]) -> int:
+    """Distância entre permutações: número de posições com jobs diferentes (Hamming)."""
+    return sum(1 for x, y in zip(a, b) if x != y)
+
+
+class ElitePool:
+    """
+    Conjunto limitado das melhores soluções, com diversidade mínima.
+
+    Uma solução entra se:
+      - não for repetida e estiver a pelo menos 'min_distance' de todas as do pool; ou
+      - for melhor que a melhor do pool (critério de aspiração).
+    Com o pool cheio ela precisa ser melhor que a pior, e substitui a mais parecida
+    entre as piores que ela.
+    """
+
+    def __init__(self, max_size: int = 10, min_distance: int = 2):
+        self.max_size = max_size
+        self.min_distance = min_distance
+        self.items: List[Tuple[float, List[int]]] = []  # (C_max, seq)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def best(self) -> Optional[Tuple[float, List[int]]]:
+        return min(self.items, key=lambda it: it[0]) if self.items else None
+
+    def add(self, seq: List[int], C_max: float) -> bool:
+        if any(seq == s for _c, s in self.items):
+            return False
+        dists = [position_distance(seq, s) for _c, s in self.items]
+        best = self.best()
+        aspiration = best is not None and C_max < best[0]
+        if dists and min(dists) < self.min_distance and not aspiration:
+            return False
+
+        if len(self.items) < self.max_size:
+            self.items.append((C_max, seq[:]))
+            return True
+
+        worse = [k for k, (c, _s) in enumerate(self.items) if c > C_max]
+        if not worse:
+            return False
+        victim = min(worse, key=lambda k: (dists[k], -self.items[k][0]))
+        self.items[victim] = (C_max, seq[:])
+        return True
+
+
+def path_relink(inst: Instance, source: List[int], target: List[int]) -> Tuple[Optional[float], Optional[List[int]]]:
+    """
+    Caminha de 'source' até 'target' e devolve a melhor sequência intermediária
+    (exclui as extremidades), como (C_max, seq), ou (None, None).
+
+    A cada passo, para cada posição r em que a corrente difere do alvo, o movimento
+    candidato é inserir target[r] na posição r; escolhe-se o candidato factível de menor
+    C_max (ou, se nenhum for factível, o da primeira posição divergente para seguir
+    andando). Cada candidato é avaliado de forma incremental (evaluate_suffix) a partir
+    da primeira posição alterada, reaproveitando a agenda do prefixo.
+    """
+    current = source[:]
+    res = verify_solution(inst, current, verbose=False)
+    if not res.feasible:
+        return None, None
+    _b, c = compute_schedule(inst, current)
+    current_ok = True
+
+    best_val, best_seq = None, None
+    while True:
+        diff = [r for r in range(len(current)) if current[r] != target[r]]
+        if len(diff) <= 1:
+            break
+
+        step = None  # (C_max, r, seq, c)
+        fallback = None
+        for r in diff:
+            k = current.index(target[r])
+            trial = current[:]
+            job = trial.pop(k)
+            trial.insert(r, job)
+            if trial == target:
+                continue  # não conta o próprio alvo como intermediária
+            lo = min(r, k)
+            if current_ok:
+                c_trial = c[:]
+                val = evaluate_suffix(inst, trial, lo, c_trial)
+            else:
+                # a corrente é infactível: não há prefixo confiável, avalia por inteiro
+                val = verify_solution(inst, trial, verbose=False).C_max
+                c_trial = compute_schedule(inst, trial)[1] if val is not None else None
+            if fallback is None:
+                fallback = (val, r, trial, c_trial)
+            if val is not None and (step is None or val < step[0]):
+                step = (val, r, trial, c_trial)
+
+        if step is None:
+            if fallback is None:
+                break
+            step = fallback
+        val, _r, current, c = step
+        current_ok = val is not None
+        if val is not None and (best_val is None or val < best_val):
+            best_val, best_seq = val, current[:]
+
+    return best_val, best_seq
+
+
+def path_relinking_phase(inst: Instance, pool: ElitePool) -> Tuple[Optional[float], Optional[List[int]]]:
+    """
+    Pós-otimização: aplica path relinking nos dois sentidos entre todos os pares do pool
+    e tenta inserir no pool as melhores intermediárias. Retorna o melhor (C_max, seq) do pool.
+    """
+    elites = [seq for _c, seq in pool.items]
+    for a in range(len(elites)):
+        for b in range(len(elites)):
+            if a == b:
+                continue
+            val, seq = path_relink(inst, elites[a], elites[b])
+            if seq is not None and pool.add(seq, val):
+                print(f"[PR] Nova solução de elite: C_max = {val}")
+    best = pool.best()
+    return (best[0], best[1]) if best else (None, None)
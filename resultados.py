@@ -0,0 +1,257 @@
+import contextlib
+import json
+import os
+import time
+import hashlib
+from typing import List, Dict, Optional, Set
+
+import Modelagem as md
+
+# ---------------------------
+# Armazenamento incremental (append-only) dos resultados
+# ---------------------------
+#
+# Cada instância concluída vira uma linha JSON no arquivo (JSONL). A linha é
+# gravada e sincronizada com o disco assim que a instância termina, então uma
+# queda no meio da varredura perde no máximo a instância em andamento.
+# A planilha Excel é gerada a partir desse arquivo sob demanda (export_excel).
+
+
+def config_key(config: Dict) -> str:
+    """
+    Gera uma chave curta e estável para uma configuração de execução.
+    Duas execuções com a mesma configuração (mesmos parâmetros) têm a mesma chave,
+    o que permite retomar (resume) uma varredura interrompida.
+    """
+    texto = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:12]
+
+
+class ResultStore:
+    """
+    Arquivo JSONL append-only com um registro por instância concluída.
+
+    Campos de cada registro:
+      - instancia: nome do arquivo da instância
+      - config_key / config: configuração usada na execução
+      - best, mean, time, diff_best, best_lit: métricas da instância
+      - timestamp: momento da gravação
+    """
+
+    def __init__(self, path: str, config: Optional[Dict] = None):
+        self.path = path
+        self.config = config or {}
+        self.key = config_key(self.config)
+
+    def load(self, only_current_config: bool = False) -> List[Dict]:
+        """
+        Lê todos os registros do arquivo. Linhas corrompidas (ex.: gravação
+        interrompida no meio) são ignoradas.
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"[ResultStore] Linha inválida ignorada em {self.path}")
+                    continue
+                if only_current_config and rec.get("config_key") != self.key:
+                    continue
+                records.append(rec)
+        return records
+
+    def completed(self) -> Set[str]:
+        """Instâncias já concluídas com a configuração atual (para o modo resume)."""
+        return {rec["instancia"] for rec in self.load(only_current_config=True)}
+
+    def append(self, instancia: str, metrics: Dict) -> Dict:
+        """Anexa o resultado de uma instância e força a escrita em disco."""
+        rec = {
+            "instancia": instancia,
+            "config_key": self.key,
+            "config": self.config,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        rec.update(metrics)
+
+        pasta = os.path.dirname(self.path)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return rec
+
+
+class ConvergenceTrace:
+    """
+    Traço de convergência de uma execução (uma instância, uma semente).
+
+    A cada melhoria da incumbente, record() guarda em memória a tupla
+    (tempo decorrido (s), nº de avaliações, melhor C_max, operador). Nada é escrito
+    em disco durante a busca: flush() grava o traço inteiro como uma única linha
+    JSONL ao final da execução, para montar perfis anytime / time-to-target.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.eval_start = md.evaluation_count()
+        self.best = float("inf")
+        self.points: List[tuple] = []
+
+    def record(self, C_max: float, operator: str) -> bool:
+        """Registra um ponto se C_max melhora a incumbente. Retorna True se registrou."""
+        if C_max is None or C_max >= self.best:
+            return False
+        self.best = C_max
+        self.points.append((round(time.time() - self.start, 4), md.evaluation_count() - self.eval_start, C_max, operator))
+        return True
+
+    def flush(self, path: str, instancia: str, seed=None, key: Optional[str] = None) -> None:
+        """Anexa o traço (uma linha JSON) ao arquivo 'path'."""
+        rec = {
+            "instancia": instancia,
+            "seed": seed,
+            "config_key": key,
+            "time": round(time.time() - self.start, 4),
+            "evaluations": md.evaluation_count() - self.eval_start,
+            "trace": self.points,  # [[t, avaliações, C_max, operador], ...]
+        }
+        pasta = os.path.dirname(path)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        # uma única escrita por execução: com vários processos, as linhas não se intercalam
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+
+
+def load_traces(path: str) -> List[Dict]:
+    """Lê os traços gravados por ConvergenceTrace.flush (linhas inválidas são ignoradas)."""
+    return ResultStore(path).load()
+
+
+# ---------------------------
+# Cache persistente das melhores soluções (warm start entre execuções)
+# ---------------------------
+def instance_hash(path: str) -> str:
+    """Hash (sha256) do conteúdo do arquivo da instância: mesma instância, mesma chave."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class SolutionCache:
+    """
+    Melhor sequência conhecida de cada instância, um arquivo JSON por instância em
+    'directory', nomeado pelo hash do conteúdo da instância (instance_hash): renomear
+    ou mover a instância não perde a solução, e alterar o arquivo invalida a entrada.
+
+    A gravação é atômica (arquivo temporário no mesmo diretório + os.replace), então uma
+    execução interrompida nunca deixa um arquivo pela metade, e só acontece se o novo
+    C_max for melhor que o guardado naquele momento. Ler, comparar e substituir acontece sob
+    um lock exclusivo (flock em <hash>.lock): processos que gravam a mesma instância ao mesmo
+    tempo (workers da fila, pool de main -w, servidor) não sobrescrevem uma solução melhor.
+    Quem lê deve reverificar a sequência (verify_solution) antes de usá-la.
+    """
+
+    def __init__(self, directory: str = "Solucoes"):
+        self.directory = directory
+        self._hashes: Dict[str, str] = {}
+
+    def _path(self, instance_path: str) -> str:
+        key = self._hashes.get(instance_path)
+        if key is None:
+            key = self._hashes[instance_path] = instance_hash(instance_path)
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, instance_path: str) -> Optional[Dict]:
+        """Registro guardado ({"instancia", "C_max", "sequence", "timestamp"}) ou None."""
+        path = self._path(instance_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[SolutionCache] Entrada inválida ignorada: {path}")
+            return None
+
+    @contextlib.contextmanager
+    def _locked(self, path: str):
+        """Lock exclusivo (flock) no arquivo auxiliar path.lock; liberado também se o processo morrer."""
+        import fcntl
+        with open(path[:-len(".json")] + ".lock", "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def put(self, instance_path: str, sequence: List[int], C_max: float) -> bool:
+        """Grava a sequência se ela melhora a guardada. Retorna True se gravou."""
+        rec = {
+            "instancia": os.path.basename(instance_path),
+            "C_max": C_max,
+            "sequence": list(sequence),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(instance_path)
+        with self._locked(path):
+            # relido sob o lock: outro processo pode ter gravado algo melhor desde a última leitura
+            old = self.get(instance_path)
+            if old is not None and old.get("C_max", float("inf")) <= C_max:
+                return False
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rec, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)  # atômico: leitores veem o arquivo antigo ou o novo, nunca um parcial
+        return True
+
+
+def export_excel(store_path: str, excel_in: str, excel_out: str, key: Optional[str] = None) -> int:
+    """
+    Monta a planilha de resultados a partir do arquivo JSONL.
+
+    Lê a planilha modelo (excel_in, coluna A com os nomes das instâncias) e preenche:
+      G: melhor resultado | H: média | I: tempo (s) | J: dif best (%)
+    Se 'key' for dado, usa apenas registros daquela configuração. Se houver mais
+    de um registro para a mesma instância, vale o mais recente.
+    Retorna o número de linhas preenchidas.
+    """
+    import pandas as pd
+
+    store = ResultStore(store_path)
+    latest = {}
+    for rec in store.load():
+        if key is not None and rec.get("config_key") != key:
+            continue
+        latest[rec["instancia"]] = rec  # registros mais novos sobrescrevem os antigos
+
+    df = pd.read_excel(excel_in, header=0)
+    filled = 0
+    for row, name in enumerate(df.iloc[:, 0]):
+        rec = latest.get(str(name).strip())
+        if rec is None:
+            continue
+        df.iloc[row, 6] = rec["best"]       # Coluna G
+        df.iloc[row, 7] = rec["mean"]       # Coluna H
+        df.iloc[row, 8] = rec["time"]       # Coluna I
+        df.iloc[row, 9] = rec["diff_best"]  # Coluna J
+        filled += 1
+
+    df.to_excel(excel_out, index=False)
+    print(f"[export_excel] {filled} instâncias exportadas para {excel_out}")
+    return filled
@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Callable
+
+import Modelagem as md
+import avaliacao as av
+import resultados as rs
+import main
+
+# ******************************** SERVIDOR LOCAL DO SOLVER ********************************
+#
+# Processo de longa duração que atende pedidos de outras ferramentas sem pagar, a cada
+# chamada, o início do Python, os imports e a leitura da instância.
+#
+# Protocolo: uma mensagem JSON por linha (UTF-8), num socket Unix (padrão) ou TCP em
+# 127.0.0.1. Uma conexão pode enviar vários pedidos; cada resposta traz o "id" do pedido.
+#   {"op": "solve", "id": "a1", "instance": "Instancias/x.txt", "time_budget": 5, "config": {...}, "seed": 0}
+#   {"op": "solve", "id": "a2", "text": "R=10\nPi=(...)\nA=\n...\nSij=\n...", "time_budget": 5}
+#   {"op": "cancel", "id": "a1"}      {"op": "stats"}      {"op": "ping"}
+# Resposta de solve: {"id", "ok", "instancia", "C_max", "sequence", "b", "c", "elapsed", "cancelled"}
+# (jobs 0-based; b/c indexados pelo job). "config" aceita as chaves de main.pipeline_params.
+#
+# As buscas rodam num pool de processos (asyncio só cuida da rede). Instâncias lidas ficam
+# num cache LRU limitado por memória estimada. Um pedido cancelado (ou cuja conexão caiu)
+# sai da fila se ainda não começou; se já está rodando, a busca para no próximo ponto de
+# verificação (entre chamadas dos operadores) e devolve a melhor solução até então.
+
+DEFAULT_SOCKET = "/tmp/tic_solver.sock"
+
+
+def instance_bytes(inst: md.Instance) -> int:
+    """Estimativa (bytes) da memória de uma instância lida: listas de p, s e d e seus inteiros."""
+    total = sys.getsizeof(inst.p) + sys.getsizeof(inst.s) + sys.getsizeof(inst.d)
+    total += sum(sys.getsizeof(row) for row in inst.s) + sum(sys.getsizeof(row) for row in inst.d)
+    # inteiros fora do cache do CPython (-5..256) são objetos próprios
+    total += 28 * sum(1 for row in inst.s for v in row if not -5 <= v <= 256)
+    total += 28 * sum(1 for v in inst.p if not -5 <= v <= 256)
+    return total
+
+
+class InstanceCache:
+    """
+    Cache LRU de instâncias lidas, limitado pela memória estimada (instance_bytes).
+    Chave: (caminho real, mtime, tamanho) para arquivos, hash do conteúdo para instâncias inline;
+    um arquivo alterado no disco vira outra chave e a entrada antiga sai por LRU.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[tuple, tuple]" = OrderedDict()  # chave -> (instância, bytes)
+
+    def get(self, key: tuple, load: Callable[[], md.Instance]) -> md.Instance:
+        item = self._items.get(key)
+        if item is not None:
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item[0]
+
+        self.misses += 1
+        inst = load()
+        size = instance_bytes(inst)
+        self._items[key] = (inst, size)
+        self.bytes += size
+        # remove as menos usadas recentemente até caber (a recém-lida fica mesmo se sozinha exceder)
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _key, (_inst, old) = self._items.popitem(last=False)
+            self.bytes -= old
+        return inst
+
+    def stats(self) -> Dict:
+        return {"instancias": len(self._items), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+# ---------------------------
+# Processo de trabalho
+# ---------------------------
+def _solve(inst: md.Instance, label: str, config: Dict, seed: int, cancel, cache_dir: Optional[str]) -> Dict:
+    """Roda o pipeline de main.py numa instância já lida (saída verbosa descartada)."""
+    random.seed(seed)
+    start = time.time()
+    cache = rs.SolutionCache(cache_dir) if cache_dir else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = main.run_simulations_for_instance(label, inst=inst, should_stop=cancel.is_set,
+                                                solution_cache=cache, **main.pipeline_params(config))
+    if res is None:
+        return {"ok": False, "error": "Nenhuma solução construtiva viável encontrada."}
+    return {
+        "ok": True,
+        "C_max": res["C_max"],
+        "sequence": list(res["sequence_normalized"]),
+        "b": res["b"],
+        "c": res["c"],
+        "elapsed": round(time.time() - start, 4),
+        "cancelled": cancel.is_set(),
+    }
+
+
+# ---------------------------
+# Servidor (asyncio)
+# ---------------------------
+class SolverServer:
+    def __init__(self, workers: int = 1, max_bytes: int = 512 << 20, config: Optional[Dict] = None,
+                 cache_dir: Optional[str] = None):
+        self.config = config or {}
+        self.cache_dir = cache_dir
+        self.instances = InstanceCache(max_bytes)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=av.init_worker, initargs=(av.backend(),))
+        self.manager = mp.Manager()  # Events de cancelamento compartilhados com os processos
+        self.running: Dict[str, tuple] = {}  # id -> (future do pool, Event de cancelamento)
+        self.served = 0
+        self._next_id = 0
+
+    def _load(self, req: Dict) -> tuple:
+        """(instância, rótulo, caminho ou None) do pedido, passando pelo cache."""
+        if req.get("instance"):
+            path = os.path.realpath(req["instance"])
+            st = os.stat(path)
+            inst = self.instances.get((path, st.st_mtime_ns, st.st_size), lambda: md.load_instance_from_txt(path))
+            return inst, path, path
+        if req.get("text"):
+            text = req["text"]
+            key = ("inline", hashlib.sha256(text.encode("utf-8")).hexdigest())
+            return self.instances.get(key, lambda: md.parse_instance(text)), "inline", None
+        raise ValueError("Pedido sem 'instance' (caminho) nem 'text' (instância inline).")
+
+    async def solve(self, req: Dict) -> Dict:
+        req_id = req["id"]
+        if req_id in self.running:
+            raise ValueError(f"Já existe um pedido em andamento com id {req_id!r}.")
+        inst, label, path = self._load(req)
+
+        config = dict(self.config)
+        config.update(req.get("config") or {})
+        if "time_budget" in req:
+            config["time_budget"] = req["time_budget"]
+        seed = req.get("seed", random.randrange(1 << 30))
+        cancel = self.manager.Event()
+        cache_dir = self.cache_dir if path is not None else None
+
+        future = self.pool.submit(_solve, inst, label, config, seed, cancel, cache_dir)
+        self.running[req_id] = (future, cancel)
+        try:
+            out = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise  # a própria tarefa foi cancelada (servidor encerrando)
+            out = {"ok": False, "cancelled": True, "error": "Cancelado antes de começar."}
+        finally:
+            del self.running[req_id]
+            self.served += 1
+        out["instancia"] = os.path.basename(label)
+        return out
+
+    def cancel(self, req_id: str) -> bool:
+        """Cancela um pedido: tira da fila se não começou, senão pede para a busca parar."""
+        entry = self.running.get(req_id)
+        if entry is None:
+            return False
+        future, event = entry
+        event.set()
+        future.cancel()
+        return True
+
+    async def dispatch(self, req: Dict) -> Dict:
+        op = req.get("op", "solve")
+        if op == "solve":
+            return await self.solve(req)
+        if op == "cancel":
+            return {"ok": True, "cancelled": self.cancel(req["id"])}
+        if op == "stats":
+            return {"ok": True, "running": sorted(self.running), "served": self.served,
+                    "cache": self.instances.stats(), "kernel": av.backend()}
+        if op == "ping":
+            return {"ok": True}
+        raise ValueError(f"Operação desconhecida: {op!r}.")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Uma conexão: lê pedidos linha a linha e responde cada um assim que termina."""
+        lock = asyncio.Lock()
+        tasks = {}  # id -> task dos solves desta conexão
+
+        async def respond(req_id, fn) -> None:
+            try:
+                out = await fn
+            except Exception as e:  # erro do pedido vira resposta; a conexão continua
+                out = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            out["id"] = req_id
+            async with lock:
+                with contextlib.suppress(ConnectionError):  # cliente já desconectou
+                    writer.write((json.dumps(out) + "\n").encode("utf-8"))
+                    await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await respond(None, self._error(f"JSON inválido: {e}"))
+                    continue
+                if "id" not in req:
+                    self._next_id += 1
+                    req["id"] = f"req{self._next_id}"
+                if req.get("op", "solve") == "solve":
+                    tasks[req["id"]] = asyncio.create_task(respond(req["id"], self.dispatch(req)))
+                else:
+                    await respond(req["id"], self.dispatch(req))
+        except ConnectionError:
+            pass
+        finally:
+            # conexão fechada: pedidos desta conexão ainda em andamento não têm mais quem os leia
+            for req_id, task in tasks.items():
+                if not task.done():
+                    self.cancel(req_id)
+            with contextlib.suppress(Exception):
+                writer.close()
+
+    @staticmethod
+    async def _error(msg: str) -> Dict:
+        return {"ok": False, "error": msg}
+
+    def close(self) -> None:
+        for future, event in list(self.running.values()):
+            event.set()
+            future.cancel()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+
+async def serve(server: SolverServer, socket_path: Optional[str] = None, port: Optional[int] = None) -> None:
+    """Atende até SIGINT/SIGTERM, no socket Unix 'socket_path' ou em 127.0.0.1:'port'."""
+    if port is not None:
+        srv = await asyncio.start_server(server.handle, "127.0.0.1", port)
+        where = f"127.0.0.1:{port}"
+    else:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # socket de uma execução anterior que não foi encerrada
+        srv = await asyncio.start_unix_server(server.handle, path=socket_path)
+        where = socket_path
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f"[servidor] Atendendo em {where} (kernel={av.backend()})", flush=True)
+    async with srv:
+        await stop.wait()
+    if port is None and os.path.exists(socket_path):
+        os.unlink(socket_path)
+    print("[servidor] Encerrado.", flush=True)
+
+
+# ---------------------------
+# Cliente
+# ---------------------------
+def request(msg: Dict, socket_path: str = DEFAULT_SOCKET, port: Optional[int] = None,
+            timeout: Optional[float] = None) -> Dict:
+    """Envia um pedido ao servidor e espera a resposta (cliente síncrono para outras ferramentas)."""
+    if port is not None:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(msg) + "\n").encode("utf-8"))
+        f.flush()
+        line = f.readline()
+    if not line:
+        raise ConnectionError("Servidor fechou a conexão sem responder.")
+    return json.loads(line)
+
+
+def main_server(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor local do solver (um pedido JSON por linha).")
+    parser.add_argument("--socket", dest="socket_path", default=DEFAULT_SOCKET, help="Caminho do socket Unix.")
+    parser.add_argument("--porta", dest="port", type=int, default=None,
+                        help="Atende em TCP 127.0.0.1:PORTA em vez do socket Unix.")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--memoria", dest="memory_mb", type=float, default=512,
+                        help="Limite (MB) do cache de instâncias lidas.")
+    parser.add_argument("--config", help="JSON com a configuração padrão dos pedidos (chaves de main.pipeline_params).")
+    parser.add_argument("--cache-solucoes", dest="solution_cache", default=None,
+                        help="Diretório do cache persistente de melhores soluções (só pedidos por caminho).")
+    parser.add_argument("--kernel", choices=av.BACKENDS, default="python")
+    parser.add_argument("--enviar", dest="send", default=None,
+                        help="Modo cliente: envia este pedido JSON ao servidor e imprime a resposta.")
+    args = parser.parse_args(argv)
+
+    if args.send is not None:
+        print(json.dumps(request(json.loads(args.send), args.socket_path, args.port)))
+        return
+
+    config = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    av.set_backend(args.kernel)
+    av.warmup()
+    server = SolverServer(args.workers, int(args.memory_mb * (1 << 20)), config, args.solution_cache)
+    try:
+        asyncio.run(serve(server, args.socket_path, args.port))
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main_server()
@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import re
+from statistics import NormalDist
+from typing import List, Dict, Optional
+
+import main
+
+# ******************************** AJUSTE AUTOMÁTICO DE PARÂMETROS (RACING) ********************************
+#
+# Para cada família de instâncias (nome sem o sufixo _P<k>.txt), configurações candidatas
+# "correm" sobre um subconjunto de treino: a cada rodada todas as vivas são avaliadas na
+# mesma (instância, semente), e depois de 'min_rounds' rodadas as estatisticamente piores
+# são descartadas (teste de Friedman + diferença crítica sobre os ranks médios).
+# A melhor configuração de cada família é gravada num JSON aceito por `main.py --config`.
+
+# Espaço de busca: valores possíveis de cada parâmetro do pipeline de main.py
+PARAM_SPACE = {
+    "max_stagnation": [3, 5, 10, 20],
+    "k_neighbors": [None, 5, 10],
+    "critical": [False, True],
+    "repair": [False, True],
+    "beam_width": [None, 5, 20],
+    "grasp_starts": [0, 5],
+    "alpha": [0.1, 0.3, 0.5],
+    "rcl_size": [None, 3, 5],
+    "inner_stagnation": [200, 500, 1000],
+    "max_block_frac": [0.2, 0.4],
+}
+OPERATOR_POOL = ["JE", "IJR", "IJB", "BT", "IBB"]
+
+# Configuração atual (valores "mágicos" do código), sempre incluída na corrida
+DEFAULT_CONFIG = {
+    "operators": ["JE"],
+    "max_stagnation": 10,
+    "k_neighbors": None,
+    "critical": False,
+    "repair": False,
+    "beam_width": None,
+    "grasp_starts": 0,
+    "alpha": 0.3,
+    "rcl_size": None,
+    "inner_stagnation": 1000,
+    "max_block_frac": 0.4,
+}
+
+
+def family_of(file_name: str) -> str:
+    """Família da instância: nome sem o sufixo _P<k>.txt."""
+    return re.sub(r"_P\d+\.txt$", "", file_name)
+
+
+def sample_configs(n: int, rng: random.Random) -> List[Dict]:
+    """DEFAULT_CONFIG + (n-1) configurações sorteadas de PARAM_SPACE (ordem de operadores inclusa)."""
+    configs = [dict(DEFAULT_CONFIG)]
+    seen = {json.dumps(DEFAULT_CONFIG, sort_keys=True)}
+    while len(configs) < n:
+        cfg = {key: rng.choice(values) for key, values in PARAM_SPACE.items()}
+        cfg["operators"] = rng.sample(OPERATOR_POOL, rng.randint(1, 3))
+        key = json.dumps(cfg, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(cfg)
+    return configs
+
+
+def to_run_config(cfg: Dict, instances_dir: str, time_budget: Optional[float]) -> Dict:
+    """Converte uma configuração da corrida no dicionário de main.run_instance / main.py --config."""
+    run = {k: v for k, v in cfg.items() if k not in ("inner_stagnation", "max_block_frac")}
+    # Só os operadores da configuração; max_stagnation/max_block_frac só existem nos de OPERATOR_POOL
+    op_params = {label: {"max_stagnation": cfg["inner_stagnation"]}
+                 for label in cfg["operators"] if label in OPERATOR_POOL}
+    if "BT" in op_params:
+        op_params["BT"]["max_block_frac"] = cfg["max_block_frac"]
+    run["operator_params"] = op_params
+    run["instances_dir"] = instances_dir
+    run["time_budget"] = time_budget
+    return run
+
+
+def _evaluate(cfg: Dict, file_name: str, seed: int, instances_dir: str, time_budget: Optional[float]) -> float:
+    """Roda uma configuração numa (instância, semente) sem a saída verbosa do pipeline (inf se nada factível)."""
+    run = to_run_config(cfg, instances_dir, time_budget)
+    run["seeds"] = [seed]
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = main.run_instance(file_name, run)["best"]
+    return best if best is not None else float("inf")  # nenhuma solução factível: pior rank
+
+
+def _ranks(values: List[float]) -> List[float]:
+    """Ranks (1 = melhor) com média nos empates."""
+    order = sorted(range(len(values)), key=lambda k: values[k])
+    ranks = [0.0] * len(values)
+    r = 0
+    while r < len(order):
+        s = r
+        while s + 1 < len(order) and values[order[s + 1]] == values[order[r]]:
+            s += 1
+        for k in range(r, s + 1):
+            ranks[order[k]] = (r + s) / 2 + 1
+        r = s + 1
+    return ranks
+
+
+def friedman_survivors(results: Dict[int, List[float]], alive: List[int], alpha: float = 0.05) -> List[int]:
+    """
+    Teste de Friedman sobre os resultados das configurações vivas (mesmas rodadas).
+    Se significativo, mantém só as configurações cujo rank médio não passa do melhor
+    por mais que a diferença crítica z * sqrt(k(k+1)/(6N)) do pós-teste de Bonferroni-Dunn
+    (k - 1 comparações contra a melhor, bilateral: z = quantil 1 - alpha / (2(k - 1)) da
+    normal). Quantil da qui-quadrado por Wilson-Hilferty.
+    """
+    k = len(alive)
+    N = len(results[alive[0]])
+    if k < 2 or N < 2:
+        return alive
+
+    rank_sum = {c: 0.0 for c in alive}
+    for r in range(N):
+        ranks = _ranks([results[c][r] for c in alive])
+        for c, rk in zip(alive, ranks):
+            rank_sum[c] += rk
+    mean_rank = {c: rank_sum[c] / N for c in alive}
+
+    T = 12 * N / (k * (k + 1)) * sum((mean_rank[c] - (k + 1) / 2) ** 2 for c in alive)
+    z = NormalDist().inv_cdf(1 - alpha)
+    df = k - 1
+    chi2 = df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+    if T <= chi2:
+        return alive
+
+    best = min(mean_rank.values())
+    z_cd = NormalDist().inv_cdf(1 - alpha / (2 * (k - 1)))
+    cd = z_cd * math.sqrt(k * (k + 1) / (6 * N))
+    return [c for c in alive if mean_rank[c] - best <= cd]
+
+
+def race(configs: List[Dict], tasks: List[tuple], instances_dir: str, time_budget: Optional[float],
+         workers: int = 1, min_rounds: int = 3, alpha: float = 0.05) -> Dict:
+    """
+    Corrida de configurações sobre a lista de tarefas (instância, semente).
+    Retorna {"config", "mean", "rounds", "alive"} da melhor configuração.
+    """
+    alive = list(range(len(configs)))
+    results: Dict[int, List[float]] = {c: [] for c in alive}
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        r = 0
+        while r < len(tasks) and len(alive) > 1:
+            # as primeiras min_rounds rodadas não eliminam ninguém: vão juntas para o pool
+            batch = tasks[r:max(r + 1, min_rounds)]
+            jobs = [(c, t) for t in batch for c in alive]
+            if pool is not None:
+                futures = [pool.submit(_evaluate, configs[c], t[0], t[1], instances_dir, time_budget) for c, t in jobs]
+                values = [f.result() for f in futures]
+            else:
+                values = [_evaluate(configs[c], t[0], t[1], instances_dir, time_budget) for c, t in jobs]
+            for (c, _t), v in zip(jobs, values):
+                results[c].append(v)
+            r += len(batch)
+
+            if r >= min_rounds:
+                survivors = friedman_survivors(results, alive, alpha)
+                if len(survivors) < len(alive):
+                    print(f"[race] rodada {r}: {len(alive)} -> {len(survivors)} configurações")
+                alive = survivors
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = min(alive, key=lambda c: sum(results[c]) / max(1, len(results[c])))
+    return {
+        "config": configs[best],
+        "mean": sum(results[best]) / max(1, len(results[best])),
+        "rounds": len(results[best]),
+        "alive": len(alive),
+    }
+
+
+def main_tuning(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Ajuste de parâmetros por corrida (racing) por família de instâncias.")
+    parser.add_argument("-i", "--instancias", nargs="*", dest="patterns", default=[],
+                        help="Padrões das instâncias de treino (fnmatch). Padrão: todas.")
+    parser.add_argument("--dir", dest="instances_dir", default="Instancias")
+    parser.add_argument("--por-familia", dest="per_family", type=int, default=3,
+                        help="Instâncias de treino sorteadas por família.")
+    parser.add_argument("--sementes", dest="seeds_per_instance", type=int, default=2,
+                        help="Sementes por instância de treino.")
+    parser.add_argument("-c", "--configs", dest="n_configs", type=int, default=12,
+                        help="Nº de configurações candidatas.")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--alpha", type=float, default=0.05, help="Nível de significância.")
+    parser.add_argument("-t", "--tempo", dest="time_budget", type=float, default=10.0,
+                        help="Tempo limite (s) por avaliação.")
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", dest="out_dir", default="tuning",
+                        help="Diretório de saída (um <família>.json por família + resumo.json).")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    configs = sample_configs(args.n_configs, rng)
+
+    families: Dict[str, List[str]] = {}
+    for f in main.select_instances(args.instances_dir, args.patterns):
+        families.setdefault(family_of(f), []).append(f)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    summary = {}
+    for family, files in sorted(families.items()):
+        train = rng.sample(files, min(args.per_family, len(files)))
+        tasks = [(f, rng.randrange(1 << 30)) for f in train for _ in range(args.seeds_per_instance)]
+        print(f"\n[tuning] {family}: {len(configs)} configurações x {len(tasks)} tarefas")
+
+        best = race(configs, tasks, args.instances_dir, args.time_budget,
+                    args.workers, args.min_rounds, args.alpha)
+        run_config = to_run_config(best["config"], args.instances_dir, args.time_budget)
+        run_config["patterns"] = [family + "_*"]
+        with open(os.path.join(args.out_dir, family + ".json"), "w", encoding="utf-8") as f:
+            json.dump(run_config, f, indent=2)
+        summary[family] = best
+        print(f"[tuning] {family}: melhor média {best['mean']:.1f} ({best['alive']} sobreviventes) -> {best['config']}")
+
+    with open(os.path.join(args.out_dir, "resumo.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main_tuning()
@@ -1,157 +1,232 @@
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
+import argparse
+import json
+import os
 from typing import List, Tuple, Dict, Optional
-import networkx as nx
 
+import Modelagem as md
 from Modelagem import Instance
 
-def plot_gantt(inst: Instance, res: Dict, title: Optional[str] = None) -> None:
+# matplotlib é importado dentro das funções de plot: importar este módulo não carrega
+# bibliotecas gráficas (processos de trabalho e a CLI não pagam esse custo).
+
+# Acima deste nº de jobs o Gantt sai sem rótulos nem setas (ilegíveis e caros de desenhar)
+GANTT_MAX_LABELS = 40
+
+
+def _figure(figsize, path: Optional[str]):
+    """
+    Figura interativa (pyplot) ou, com 'path', uma Figure avulsa renderizada fora da tela:
+    sem pyplot não há janela, estado global nem backend interativo (serve em nós sem display
+    e em processos de trabalho); savefig escolhe Agg/SVG/PDF pela extensão do arquivo.
+    """
+    if path is None:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def draw_gantt(ax, inst: Instance, res: Dict, labels: bool = True) -> None:
+    """
+    Desenha o Gantt em 'ax' com poucas coleções, independente do nº de jobs:
+    todas as barras numa PolyCollection, os marcadores de início/fim numa LineCollection
+    e as ligações entre jobs consecutivos em outra. Com labels=True acrescenta os
+    intervalos [início, fim] e os tempos entre jobs (um texto por job).
+    """
+    from matplotlib.collections import PolyCollection, LineCollection
+
+    seq = res["sequence_normalized"]  # Sequência 0-based
+    b = res["b"]  # Tempos de início
+    c = res["c"]  # Tempos de término
+
+    bars = [[(b[j], y - 0.2), (b[j], y + 0.2), (c[j], y + 0.2), (c[j], y - 0.2)] for y, j in enumerate(seq)]
+    ax.add_collection(PolyCollection(bars, facecolors="tab:blue", edgecolors="none"))
+    ticks = [[(t, y - 0.2), (t, y + 0.2)] for y, j in enumerate(seq) for t in (b[j], c[j])]
+    ax.add_collection(LineCollection(ticks, colors="black", linewidths=1))
+    # Ligação do fim do job anterior ao início do atual (setup/espera entre eles)
+    links = [[(c[seq[r - 1]], r - 1), (b[seq[r]], r)] for r in range(1, len(seq))]
+    ax.add_collection(LineCollection(links, colors="gray", linewidths=0.8))
+
+    if labels:
+        for y, j in enumerate(seq):
+            ax.text((b[j] + c[j]) / 2, y, f"[{b[j]:.1f}, {c[j]:.1f}]", ha="center", va="center", fontsize=8)
+        for r in range(1, len(seq)):
+            i, j = seq[r - 1], seq[r]
+            ax.text((c[i] + b[j]) / 2, r - 0.5, f"{b[j] - c[i]:.1f}", ha="center", va="center", fontsize=8,
+                    bbox=dict(facecolor="white", edgecolor="none", alpha=0.7))
+
+    ax.set_xlim(0, max(res["C_max"], 1) * 1.02)
+    ax.set_ylim(-1, len(seq))
+    if labels:
+        ax.set_yticks(range(len(seq)), [f"Job {j + 1}" for j in seq])  # job+1 para o usuário (1-based)
+    else:
+        ax.set_ylabel("Posição na sequência")
+    ax.set_xlabel("Tempo")
+    ax.grid(True, alpha=0.3)
+
+
+def plot_gantt(inst: Instance, res: Dict, title: Optional[str] = None, path: Optional[str] = None,
+               max_labels: int = GANTT_MAX_LABELS) -> None:
     """
     Plota um Gantt simples da solução.
     - Cada job é representado por uma barra horizontal
     - Mostra os tempos de início (b) e término (c)
-    - Setas indicam a sequência dos jobs com tempos de espera
+    - Linhas ligam jobs consecutivos, com os tempos de espera
+    Com 'path' (ex.: "gantt.png", "gantt.svg") a figura é gravada sem abrir janela.
+    Acima de 'max_labels' jobs os rótulos são omitidos.
     """
     if not res.get("feasible", False):
         print("Solução não é factível. Violações:", res.get("violations"))
         return
-        
-    seq = res["sequence_normalized"]  # Sequência 0-based
-    b = res["b"]  # Tempos de início
-    c = res["c"]  # Tempos de término
 
-    plt.figure(figsize=(12, max(3, len(seq) * 0.5)))
-    yticks = []
-    ylabels = []
-
-    # Para cada job na sequência
-    for idx, j in enumerate(seq):
-        y = idx  # Posição vertical
-        yticks.append(y)
-        ylabels.append(f"Job {j+1}")  # Mostra job+1 para usuário (1-based)
-        
-        # Barra horizontal do job
-        start = b[j]
-        duration = inst.p[j]
-        plt.barh(y, duration, left=start, height=0.4)
-        
-        # Marcadores de início e fim
-        plt.vlines(start, y-0.2, y+0.2, linewidth=1)
-        plt.vlines(c[j], y-0.2, y+0.2, linewidth=1)
-        
-        # Rótulo com intervalo [início, fim]
-        plt.text((start + c[j]) / 2, y, 
-                f"[{start:.1f}, {c[j]:.1f}]",
-                ha="center", va="center")
-
-    # Setas conectando jobs consecutivos com rótulos de tempo
-    for r in range(1, len(seq)):
-        i = seq[r-1]  # Job anterior
-        j = seq[r]    # Job atual
-        
-        # Calcula o tempo entre jobs
-        gap = b[j] - c[i]  # Tempo entre fim de i e início de j
-        
-        # Desenha a seta
-        plt.annotate("",
-                    xy=(b[j], r),      # Ponta da seta (início do job atual)
-                    xytext=(c[i], r-1), # Base da seta (fim do job anterior)
-                    arrowprops=dict(arrowstyle="->", lw=1))
-        
-        # Adiciona o rótulo no meio da seta
-        mid_x = (c[i] + b[j]) / 2
-        mid_y = r - 0.5
-        plt.text(mid_x, mid_y, f"{gap:.1f}", 
-                ha="center", va="center",
-                bbox=dict(facecolor='white', edgecolor='none', alpha=0.7))
-
-    plt.yticks(yticks, ylabels)
-    plt.xlabel("Tempo")
+    seq = res["sequence_normalized"]
+    labels = len(seq) <= max_labels
+    fig = _figure((12, max(3, min(len(seq) * 0.5, 20))), path)
+    ax = fig.add_subplot()
+    draw_gantt(ax, inst, res, labels)
     if title is None:
         title = f"Gantt da solução — C_max = {res['C_max']:.1f}"
-    plt.title(title)
-    plt.tight_layout()
-    plt.grid(True, alpha=0.3)
+    ax.set_title(title)
+    fig.tight_layout()
+
+    if path is not None:
+        fig.savefig(path)
+        return
+    import matplotlib.pyplot as plt
     plt.show()
     print("Gantt plot gerado com sucesso.")
     print("solução:", res["sequence_normalized"])
 
-def plot_precedence_graph(inst: Instance, title: Optional[str] = None) -> None:
+
+def _render_gantt_file(task: Tuple[str, str, List[int], str, int]) -> Optional[str]:
+    """Uma tarefa de render_gantts (nível de módulo para ir a processos de trabalho)."""
+    instance_path, name, seq, out_path, max_labels = task
+    inst = md.load_instance_from_txt(instance_path)
+    res = md.verify_solution(inst, seq)
+    if not res["feasible"]:
+        print(f"[gantt] {name}: sequência infactível; ignorada.")
+        return None
+    plot_gantt(inst, res, title=f"{name} — C_max = {res['C_max']:.1f}", path=out_path, max_labels=max_labels)
+    return out_path
+
+
+def render_gantts(solutions: List[Dict], instances_dir: str, out_dir: str, fmt: str = "png",
+                  workers: int = 1, max_labels: int = GANTT_MAX_LABELS) -> List[str]:
+    """
+    Grava o Gantt de cada solução ({"instancia", "sequence"}, como nos arquivos de
+    resultados.SolutionCache e dos resultados de fila.py) em out_dir/<instância>.<fmt>,
+    em paralelo com 'workers' processos. Retorna os arquivos gravados.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    for sol in solutions:
+        name = sol["instancia"]
+        out_path = os.path.join(out_dir, os.path.splitext(name)[0] + f"_{sol.get('seed', 'best')}." + fmt)
+        tasks.append((os.path.join(instances_dir, name), name, sol["sequence"], out_path, max_labels))
+    if workers <= 1:
+        done = [_render_gantt_file(t) for t in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = list(pool.map(_render_gantt_file, tasks, chunksize=4))
+    return [f for f in done if f is not None]
+
+
+def plot_precedence_graph(inst: Instance, title: Optional[str] = None, path: Optional[str] = None,
+                          max_labels: int = GANTT_MAX_LABELS) -> None:
     """
     Desenha um grafo direcionado simples (sem networkx) para precedências.
     - Cada nó é um job real (1..n), com rótulo "j (p_j)".
     - Cada arco (i->j) em A tem rótulo "d_ij".
-    - Layout por camadas: níveis topológicos simples calculados
-      via Kahn (ignorando dummies 0 e n+1).
+    - Layout por camadas: camadas topológicas de Kahn (inst.precedence_layers, calculadas
+      uma vez por instância).
+    Nós e arcos vão em uma coleção cada (scatter e quiver); com 'path' a figura é gravada
+    sem abrir janela. Acima de 'max_labels' jobs os rótulos são omitidos.
     """
+    layers = inst.precedence_layers()
+    succs = inst.successors()
     n = inst.n
-    # Constrói DAG só com jobs reais
-    succ = {i: [] for i in range(n)} # Lista de sucessores
-    indeg = {i: 0 for i in range(n)} # Grau de entrada
-    
-    # Usando a matriz dij para adicionar as dependências
-    for i in range(n):
-        for j in range(n):
-            if inst.d[i][j] != -1:  # Se há uma dependência com atraso
-                succ[i].append(j)
-                indeg[j] += 1
-
-    # Kahn para camadas
-    layers: List[List[int]] = []
-    current = [i for i in range(n) if indeg[i] == 0]
-    visited = set()
-    while current:
-        layers.append(current[:])
-        next_level = []
-        for u in current:
-            visited.add(u)
-            for v in succ[u]:
-                indeg[v] -= 1
-                if indeg[v] == 0:
-                    next_level.append(v)
-        current = next_level
-
-    # Se sobrou nó não visitado (ciclos): ainda vamos plotar, empilhando restante
-    remaining = [i for i in range(n) if i not in visited]
-    if remaining:
-        layers.append(remaining)
 
     # Coordenadas dos nós
-    positions: Dict[int, Tuple[float, float]] = {}
     x_gap = 3.0
     y_gap = 1.5
+    xs = [0.0] * n
+    ys = [0.0] * n
     for lx, level in enumerate(layers):
         for k, node in enumerate(level):
-            positions[node] = (lx * x_gap, -k * y_gap)
+            xs[node] = lx * x_gap
+            ys[node] = -k * y_gap
+    edges = [(i, j, d) for i in range(n) for j, d in succs[i]]
+    labels = n <= max_labels
 
-    # Figura única (sem subplots)
-    plt.figure(figsize=(max(6, 2*len(layers)), max(3, 0.5*n)))
+    height = max(len(level) for level in layers) if layers else 1
+    fig = _figure((max(6, min(2 * len(layers), 30)), max(3, min(0.5 * height * y_gap, 30))), path)
+    ax = fig.add_subplot()
+    # Arestas: uma única chamada ao quiver (setas de i até j, encurtadas para não cobrir o nó)
+    if edges:
+        shrink = 0.85
+        ax.quiver([xs[i] for i, _j, _d in edges], [ys[i] for i, _j, _d in edges],
+                  [(xs[j] - xs[i]) * shrink for i, j, _d in edges], [(ys[j] - ys[i]) * shrink for i, j, _d in edges],
+                  angles="xy", scale_units="xy", scale=1, width=0.002, headwidth=6, color="gray")
     # Nós
-    for node, (x, y) in positions.items():
-        plt.scatter([x], [y], s=200)
-        # Mostra o job como node+1; tenta pegar p do índice correspondente (fallback caso p esteja indexado diferentemente)
-        p_val = inst.p[node]
-        plt.text(x, y+0.2, f"{node+1} (p={p_val})", ha="center")
-
-    # Arestas com rótulo d_ij
-    for i in range(n):
-        for j in range(n):
-            if inst.d[i][j] != -1:  # Se houver relação de precedência
-                x1, y1 = positions[i]
-                x2, y2 = positions[j]
-                plt.annotate("",
-                             xy=(x2, y2), xycoords='data',
-                             xytext=(x1, y1), textcoords='data',
-                             arrowprops=dict(arrowstyle="->", lw=1))
-                # Rótulo próximo ao meio
-                mx, my = (x1 + x2) / 2, (y1 + y2) / 2
-                dij = inst.d[i][j]
-                plt.text(mx, my+0.2, f"d={dij}", ha="center")
-
-    plt.axis("off")
+    ax.scatter(xs, ys, s=200 if labels else 40, zorder=3)
+
+    if labels:
+        for node in range(n):
+            ax.text(xs[node], ys[node] + 0.2, f"{node + 1} (p={inst.p[node]})", ha="center")
+        for i, j, d in edges:
+            ax.text((xs[i] + xs[j]) / 2, (ys[i] + ys[j]) / 2 + 0.2, f"d={d}", ha="center")
+
+    ax.margins(0.1)
+    ax.axis("off")
     if title is None:
         title = "Precedências (rótulo do nó = job e p; rótulo da aresta = d_ij)"
-    plt.title(title)
-    plt.tight_layout()
+    ax.set_title(title)
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path)
+        return
+    import matplotlib.pyplot as plt
     plt.show()
 
+
+def main_view(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera figuras (sem janela) a partir de soluções gravadas.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_gantt = sub.add_parser("gantt", help="Gantt de cada solução: arquivos JSON com 'instancia' e 'sequence' "
+                                           "(Solucoes/*.json, <fila>/resultados/*.json).")
+    p_gantt.add_argument("arquivos", nargs="+")
+    p_gantt.add_argument("--dir", dest="instances_dir", default="Instancias")
+    p_gantt.add_argument("--saida", dest="out_dir", default="Gantt")
+    p_gantt.add_argument("--formato", dest="fmt", choices=["png", "svg", "pdf"], default="png")
+    p_gantt.add_argument("-w", "--workers", type=int, default=1)
+    p_gantt.add_argument("--max-rotulos", dest="max_labels", type=int, default=GANTT_MAX_LABELS,
+                         help="Acima deste nº de jobs, sem rótulos.")
+    p_graph = sub.add_parser("grafo", help="Grafo de precedências de cada instância.")
+    p_graph.add_argument("instancias", nargs="+", help="Arquivos .txt das instâncias.")
+    p_graph.add_argument("--saida", dest="out_dir", default="Grafos")
+    p_graph.add_argument("--formato", dest="fmt", choices=["png", "svg", "pdf"], default="png")
+    p_graph.add_argument("--max-rotulos", dest="max_labels", type=int, default=GANTT_MAX_LABELS)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "grafo":
+        os.makedirs(args.out_dir, exist_ok=True)
+        for path in args.instancias:
+            name = os.path.splitext(os.path.basename(path))[0]
+            plot_precedence_graph(md.load_instance_from_txt(path), title=name,
+                                  path=os.path.join(args.out_dir, f"{name}.{args.fmt}"), max_labels=args.max_labels)
+        print(f"[grafo] {len(args.instancias)} figuras em {args.out_dir}")
+        return
+
+    solutions = []
+    for path in args.arquivos:
+        with open(path, "r", encoding="utf-8") as f:
+            sol = json.load(f)
+        if sol.get("sequence"):
+            solutions.append(sol)
+    files = render_gantts(solutions, args.instances_dir, args.out_dir, args.fmt, args.workers, args.max_labels)
+    print(f"[gantt] {len(files)} figuras em {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main_view()
@@ -0,0 +1,429 @@
+import math
+import random
+import time
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import Modelagem as md
+from Modelagem import Instance
+from busca_local import SearchState, neighbor_insert_positions
+
+# ******************************** VIZINHANÇAS E MOTORES DE BUSCA ********************************
+#
+# Uma vizinhança enumera movimentos da incumbente (mesmo formato de busca_local: ("swap", i, j)
+# ou ("block", i, size, j)) como geradores preguiçosos, em ordem aleatória ou sistemática: quem
+# consome para no primeiro que melhora sem montar a lista inteira. A âncora de um movimento é a
+# posição do job (ou do início do bloco) que ele mexe; moves_at(r) dá só os movimentos da âncora r.
+#
+# Os motores (descida, VND, simulated annealing, busca tabu) não conhecem o tipo de movimento:
+# todos avaliam e aceitam por SearchState, o caminho rápido da busca local (cabeça/cauda em O(1)
+# quando exato, poda por limite inferior, buffer in place com undo). Com critical=True, as
+# âncoras (descida) e os movimentos sorteados (SA, tabu) saem só das posições críticas (st.crit).
+# 'deadline' (time.time() absoluto) é verificado a cada passo e 'should_stop' no máximo a cada
+# _STOP_POLL_INTERVAL segundos: um motor longo não passa do tempo limite nem ignora um
+# cancelamento do pipeline de main.py.
+# on_improve(C_max) vai para SearchState e é chamado a cada movimento aceito (traço de convergência).
+
+
+class Neighbourhood:
+    """Interface das vizinhanças. Subclasses implementam moves_at e random_move."""
+    name = ""
+
+    def moves_at(self, st: SearchState, r: int, order: str = "random",
+                 rng: Optional[random.Random] = None):
+        """Movimentos ancorados na posição r (gerador)."""
+        raise NotImplementedError
+
+    def random_move(self, st: SearchState, rng: random.Random) -> Optional[tuple]:
+        """Um movimento sorteado da vizinhança (None se não houver)."""
+        raise NotImplementedError
+
+    def moves(self, st: SearchState, order: str = "random", rng: Optional[random.Random] = None):
+        """Toda a vizinhança, âncora por âncora (gerador)."""
+        for r in _ordered(range(len(st)), order, rng):
+            yield from self.moves_at(st, r, order, rng)
+
+    @staticmethod
+    def moved_jobs(st: SearchState, move: tuple) -> List[int]:
+        """Jobs que o movimento tira do lugar (antes de aplicá-lo)."""
+        if move[0] == "swap":
+            return [st.buf[move[1]], st.buf[move[2]]]
+        return [st.buf[r] for r in range(move[1], move[1] + move[2])]
+
+    @staticmethod
+    def affected_jobs(st: SearchState, move: tuple) -> List[int]:
+        """
+        Jobs movidos e os vizinhos de sequência dos lugares de onde saem (antes de aplicar): junto
+        com os novos vizinhos dos jobs movidos, são os que ganham outro antecessor/sucessor de setup.
+        """
+        n = len(st)
+        ends = (move[1], move[2]) if move[0] == "swap" else (move[1], move[1] + move[2] - 1)
+        rs = {q for r in ends for q in (r - 1, r, r + 1) if 0 <= q < n}
+        return [st.buf[q] for q in rs]
+
+
+class Swap(Neighbourhood):
+    """Troca de dois jobs (vizinhança de bl_job_exchange)."""
+    name = "swap"
+
+    def moves_at(self, st, r, order="random", rng=None):
+        for j in _ordered(range(len(st)), order, rng):
+            if j != r:
+                yield ("swap", r, j)
+
+    def moves(self, st, order="random", rng=None):
+        # cada par uma única vez: (r, j) com j > r
+        n = len(st)
+        for r in _ordered(range(n - 1), order, rng):
+            for j in _ordered(range(r + 1, n), order, rng):
+                yield ("swap", r, j)
+
+    def random_move(self, st, rng):
+        n = len(st)
+        if n < 2:
+            return None
+        i = _random_anchor(st, rng, n - 1)
+        j = rng.randrange(n - 1)
+        return ("swap", i, j if j < i else j + 1)
+
+
+class Insert(Neighbourhood):
+    """Move um job para outra posição (insert_job_*); com k_neighbors, só ao lado dos k vizinhos de setup."""
+    name = "insert"
+
+    def __init__(self, k_neighbors: Optional[int] = None):
+        self.k_neighbors = k_neighbors
+
+    def _targets(self, st, r):
+        if self.k_neighbors:
+            return neighbor_insert_positions(st.inst, st.buf, r, 1, self.k_neighbors)
+        return range(len(st))
+
+    def moves_at(self, st, r, order="random", rng=None):
+        for j in _ordered(self._targets(st, r), order, rng):
+            if j != r:
+                yield ("block", r, 1, j)
+
+    def random_move(self, st, rng):
+        r = _random_anchor(st, rng, len(st) - 1)
+        targets = [j for j in self._targets(st, r) if j != r]
+        return ("block", r, 1, rng.choice(targets)) if targets else None
+
+
+class BlockInsert(Neighbourhood):
+    """Move um bloco de min_size..max_size jobs consecutivos (insert_block_*); âncora = início do bloco."""
+    name = "block"
+
+    def __init__(self, min_size: int = 2, max_size: int = 3, k_neighbors: Optional[int] = None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.k_neighbors = k_neighbors
+
+    def _targets(self, st, r, size):
+        if self.k_neighbors:
+            return neighbor_insert_positions(st.inst, st.buf, r, size, self.k_neighbors)
+        return range(len(st) - size + 1)
+
+    def moves_at(self, st, r, order="random", rng=None):
+        n = len(st)
+        for size in _ordered(range(self.min_size, self.max_size + 1), order, rng):
+            if r + size > n:
+                continue
+            for j in _ordered(self._targets(st, r, size), order, rng):
+                if j != r:
+                    yield ("block", r, size, j)
+
+    def random_move(self, st, rng):
+        n = len(st)
+        size = rng.randint(self.min_size, self.max_size)
+        if size >= n:
+            return None
+        r = _random_anchor(st, rng, n - size)
+        targets = [j for j in self._targets(st, r, size) if j != r]
+        return ("block", r, size, rng.choice(targets)) if targets else None
+
+
+def _random_anchor(st: SearchState, rng: random.Random, upper: int) -> int:
+    """Âncora sorteada em [0, upper]; com critical, só entre as posições críticas (como _sample_position)."""
+    if st.crit:
+        valid = [r for r in st.crit if r <= upper]
+        if valid:
+            return rng.choice(valid)
+    return rng.randint(0, upper)
+
+
+# Intervalo mínimo (s) entre duas consultas a should_stop, que pode ser um proxy de
+# Manager().Event (uma ida e volta de IPC por chamada); o relógio é consultado sempre
+_STOP_POLL_INTERVAL = 0.05
+
+
+def _stopper(deadline: Optional[float], should_stop: Optional[Callable[[], bool]]) -> Callable[[], bool]:
+    """
+    Função sem argumentos que diz se o tempo acabou ou a execução foi cancelada.
+    O prazo é checado a cada chamada; should_stop, no máximo a cada _STOP_POLL_INTERVAL
+    segundos (a primeira chamada sempre consulta). Depois de devolver True, devolve sempre True.
+    """
+    if deadline is None and should_stop is None:
+        return lambda: False
+    next_poll = 0.0
+    stopped = False
+
+    def stop() -> bool:
+        nonlocal next_poll, stopped
+        if stopped:
+            return True
+        now = time.time()
+        if deadline is not None and now >= deadline:
+            stopped = True
+        elif should_stop is not None and now >= next_poll:
+            next_poll = now + _STOP_POLL_INTERVAL
+            stopped = bool(should_stop())
+        return stopped
+    return stop
+
+
+def _ordered(items, order: str, rng: Optional[random.Random]):
+    """Os itens na ordem sistemática ou embaralhados (order="random")."""
+    if order != "random":
+        return items
+    items = list(items)
+    (rng or random).shuffle(items)
+    return items
+
+
+def make_neighbourhood(spec: Union[str, Neighbourhood], inst: Instance,
+                       k_neighbors: Optional[int] = None) -> Neighbourhood:
+    """Vizinhança a partir do nome ("swap", "insert", "block"); instâncias passam direto."""
+    if isinstance(spec, Neighbourhood):
+        return spec
+    if spec == "swap":
+        return Swap()
+    if spec == "insert":
+        return Insert(k_neighbors)
+    if spec == "block":
+        return BlockInsert(2, max(2, min(int(inst.n * 0.4), 6)), k_neighbors)
+    raise ValueError(f"Vizinhança desconhecida: {spec}. Opções: swap, insert, block")
+
+
+# ---------------------------
+# Descida (first/best improvement) com don't-look bits
+# ---------------------------
+def _descend(st: SearchState, nb: Neighbourhood, strategy: str, order: str, dont_look: bool,
+             rng: random.Random, max_moves: Optional[int] = None,
+             stop: Callable[[], bool] = lambda: False) -> int:
+    """
+    Desce até o ótimo local de 'nb' a partir de st. Percorre as âncoras (jobs) acordadas; uma
+    âncora cuja vizinhança não melhorou a incumbente dorme (don't-look bit) até que um movimento
+    aceito mexa nela ou nos seus vizinhos de sequência. first: aceita o primeiro movimento que
+    melhora de cada âncora; best: o melhor da varredura inteira. 'stop' é consultado a cada
+    âncora. Retorna o nº de movimentos aceitos.
+    """
+    asleep = [False] * (max(st.seq) + 1 if len(st) else 0)
+    accepted = 0
+
+    def accept(found):
+        nonlocal accepted
+        move, _val, repaired = found
+        affected = nb.affected_jobs(st, move)
+        st.accept(move, repaired)
+        accepted += 1
+        if dont_look:
+            pos, buf, n = st.buf.pos, st.buf, len(st)
+            for job in affected:
+                r = pos[job]
+                for q in range(max(0, r - 1), min(n, r + 2)):
+                    asleep[buf[q]] = False
+
+    while (max_moves is None or accepted < max_moves) and not stop():
+        if st.crit:
+            anchors = [st.buf[r] for r in st.crit]
+        else:
+            anchors = st.buf.to_list()
+        anchors = [j for j in _ordered(anchors, order, rng) if not asleep[j]]
+        if not anchors:
+            break
+
+        if strategy == "best":
+            best = None
+            for job in anchors:
+                if stop():
+                    break
+                found = st.best_of(nb.moves_at(st, st.buf.pos[job], order, rng),
+                                   threshold=best[1] if best else None)
+                if found is not None:
+                    best = found
+                elif best is None and dont_look:
+                    asleep[job] = True
+            if best is None:
+                break
+            accept(best)
+            continue
+
+        improved = False
+        for job in anchors:
+            if stop():
+                break
+            found = st.best_of(nb.moves_at(st, st.buf.pos[job], order, rng), first=True)
+            if found is None:
+                if dont_look:
+                    asleep[job] = True
+                continue
+            accept(found)
+            improved = True
+            if max_moves is not None and accepted >= max_moves:
+                break
+        if not improved:
+            break
+    return accepted
+
+
+def descent(inst: Instance, res, neighbourhood: Union[str, Neighbourhood] = "insert",
+            strategy: str = "first", order: str = "random", dont_look: bool = True,
+            critical: bool = False, k_neighbors: Optional[int] = None, repair: bool = False,
+            seed: Optional[int] = None, max_moves: Optional[int] = None, deadline: Optional[float] = None,
+            should_stop: Optional[Callable[[], bool]] = None,
+            on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], md.Resultado, bool]:
+    """
+    Descida até o ótimo local de uma vizinhança (first ou best improvement, ordem aleatória ou
+    sistemática, don't-look bits). Mesma assinatura de retorno dos operadores: (sol, res, improved).
+    """
+    rng = random.Random(random.randrange(1 << 30) if seed is None else seed)
+    print(f"\nIniciando Descida ({neighbourhood}, {strategy})...")
+    st = SearchState(inst, res, critical, repair, on_improve)
+    nb = make_neighbourhood(neighbourhood, inst, k_neighbors)
+    moves = _descend(st, nb, strategy, order, dont_look, rng, max_moves, _stopper(deadline, should_stop))
+    print(f"Descida finalizada: {moves} movimentos, C_max = {st.C_max}")
+    return st.seq, st.res, moves > 0
+
+
+def vnd(inst: Instance, res, neighbourhoods: Sequence[Union[str, Neighbourhood]] = ("swap", "insert", "block"),
+        strategy: str = "first", order: str = "random", dont_look: bool = True,
+        critical: bool = False, k_neighbors: Optional[int] = None, repair: bool = False,
+        seed: Optional[int] = None, deadline: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], md.Resultado, bool]:
+    """
+    Variable Neighbourhood Descent: desce na vizinhança k; se houve melhoria volta à primeira,
+    senão passa à seguinte. Termina no ótimo local comum a todas.
+    """
+    rng = random.Random(random.randrange(1 << 30) if seed is None else seed)
+    print("\nIniciando VND...")
+    st = SearchState(inst, res, critical, repair, on_improve)
+    nbs = [make_neighbourhood(nb, inst, k_neighbors) for nb in neighbourhoods]
+    stop = _stopper(deadline, should_stop)
+    total = 0
+    k = 0
+    while k < len(nbs) and not stop():
+        moves = _descend(st, nbs[k], strategy, order, dont_look, rng, stop=stop)
+        total += moves
+        k = 0 if moves and k > 0 else k + 1
+    print(f"VND finalizada: {total} movimentos, C_max = {st.C_max}")
+    return st.seq, st.res, total > 0
+
+
+# ---------------------------
+# Simulated annealing
+# ---------------------------
+def simulated_annealing(inst: Instance, res, neighbourhood: Union[str, Neighbourhood] = "insert",
+                        T0: Optional[float] = None, alpha: float = 0.95, steps: Optional[int] = None,
+                        T_final: Optional[float] = None, critical: bool = False,
+                        k_neighbors: Optional[int] = None, repair: bool = False,
+                        seed: Optional[int] = None, deadline: Optional[float] = None,
+                        should_stop: Optional[Callable[[], bool]] = None,
+                        on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], md.Resultado, bool]:
+    """
+    Simulated annealing sobre movimentos sorteados da vizinhança, com resfriamento geométrico
+    (T *= alpha a cada 'steps' movimentos, padrão n) de T0 (padrão 1% do C_max inicial) até
+    T_final (padrão T0 / 1000).
+
+    O critério de Metropolis vira um limite: com u sorteado antes da avaliação, o vizinho é aceito
+    se C_max < C_max_atual - T ln(u). Esse limite é o threshold de SearchState.evaluate, então a
+    poda por limite inferior (cabeça/cauda) também vale para movimentos de piora.
+    Devolve a melhor solução visitada.
+    """
+    rng = random.Random(random.randrange(1 << 30) if seed is None else seed)
+    print("\nIniciando Simulated Annealing...")
+    st = SearchState(inst, res, critical, repair, on_improve)
+    nb = make_neighbourhood(neighbourhood, inst, k_neighbors)
+    best_seq, best_res = st.seq, st.res
+    T = T0 if T0 is not None else 0.01 * st.C_max
+    T_final = T_final if T_final is not None else T / 1000
+    steps = steps or len(st)
+    stop = _stopper(deadline, should_stop)
+    iterations = 0
+
+    while T > T_final and T > 0 and not stop():
+        for _ in range(steps):
+            if stop():
+                break
+            iterations += 1
+            move = nb.random_move(st, rng)
+            if move is None:
+                break
+            limit = st.C_max - T * math.log(1.0 - rng.random())  # 1 - random() em (0, 1]
+            val, repaired = st.evaluate(move, limit)
+            if val is None or val >= limit:
+                continue
+            st.accept(move, repaired)
+            if st.C_max < best_res["C_max"]:
+                best_seq, best_res = st.seq, st.res
+        T *= alpha
+
+    print(f"Simulated Annealing finalizado: {iterations} movimentos, melhor C_max = {best_res['C_max']}")
+    return best_seq, best_res, best_res["C_max"] < res["C_max"]
+
+
+# ---------------------------
+# Busca tabu
+# ---------------------------
+def tabu_search(inst: Instance, res, neighbourhood: Union[str, Neighbourhood] = "insert",
+                tenure: Optional[int] = None, candidates: int = 200, max_iterations: int = 500,
+                max_stagnation: int = 100, critical: bool = False, k_neighbors: Optional[int] = None,
+                repair: bool = False, seed: Optional[int] = None, deadline: Optional[float] = None,
+                should_stop: Optional[Callable[[], bool]] = None,
+                on_improve: Optional[Callable[[float], object]] = None) -> Tuple[List[int], md.Resultado, bool]:
+    """
+    Busca tabu: a cada iteração avalia uma lista de 'candidates' movimentos sorteados da vizinhança
+    (gerados sob demanda) e aplica o melhor não tabu, mesmo que piore. Jobs movidos ficam tabu
+    (não podem ser movidos de novo) por 'tenure' iterações (padrão: ~sqrt(n)); aspiração: um
+    movimento tabu é aceito se bate a melhor solução. Cada avaliação usa como limite o melhor
+    candidato da iteração até então, o que mantém a poda por limite inferior.
+    Para após 'max_iterations', 'max_stagnation' iterações sem nova melhor solução, no
+    'deadline' ou quando should_stop() devolver True.
+    """
+    rng = random.Random(random.randrange(1 << 30) if seed is None else seed)
+    print("\nIniciando Busca Tabu...")
+    st = SearchState(inst, res, critical, repair, on_improve)
+    nb = make_neighbourhood(neighbourhood, inst, k_neighbors)
+    best_seq, best_res = st.seq, st.res
+    tenure = tenure if tenure is not None else max(3, int(math.sqrt(len(st))))
+    tabu_until = [0] * (max(st.seq) + 1 if len(st) else 0)
+    stop = _stopper(deadline, should_stop)
+    stagnation = 0
+    it = 0
+
+    while it < max_iterations and stagnation < max_stagnation and not stop():
+        it += 1
+        best_C = best_res["C_max"]
+        chosen = None
+        chosen_val = float("inf")
+        for move in filter(None, (nb.random_move(st, rng) for _ in range(candidates))):
+            tabu = any(tabu_until[j] >= it for j in nb.moved_jobs(st, move))
+            limit = min(chosen_val, best_C) if tabu else chosen_val
+            val, repaired = st.evaluate(move, limit)
+            if val is not None and val < limit:
+                chosen, chosen_val = (move, repaired), val
+        if chosen is None:
+            break
+
+        move, repaired = chosen
+        for j in nb.moved_jobs(st, move):
+            tabu_until[j] = it + tenure  # tabu nas iterações it+1 .. it+tenure
+        st.accept(move, repaired)
+        if st.C_max < best_C:
+            best_seq, best_res = st.seq, st.res
+            stagnation = 0
+        else:
+            stagnation += 1
+
+    print(f"Busca Tabu finalizada: {it} iterações, melhor C_max = {best_res['C_max']}")
+    return best_seq, best_res, best_res["C_max"] < res["C_max"]